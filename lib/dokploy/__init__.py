@@ -6,18 +6,90 @@ This library provides reusable functions for:
 - Port detection
 - GitHub Actions output handling
 - Dokploy API client with consistent error handling
+- Cross-process rate limiting and circuit breaking for the Dokploy API
+- Streaming JSON extraction for large API responses
+- Docker Swarm access over a multiplexed SSH connection
+- Event-driven waiting for Swarm updates and rollbacks
+- Concurrent infrastructure health probes
+- Adaptive waits and readiness checks for provisioning gates
+- Dependency-graph execution of provisioning stages
+- Application settings diffed and applied in a single update
+- Bulk domain reconciliation (primary domain plus aliases)
+- Concurrent multi-service (monorepo) deploys
+- Cloudflare DNS records with a shared zone cache
+- Build-context fingerprints and registry retags to skip unchanged builds
+- Layered, workspace-aware dependency cache keys
+- Affected-only quality checks with a content-hash pass cache
+- Slack deploy notifications updated in place across jobs
+- Deployment build logs followed into the Actions log
+- A per-job API broker sharing pooled connections and lookup caches across steps
+- Cloudflare zone settings, transform rules and redirects reconciled in one pass
+- Targeted cache purges from build output manifest diffs
+- Concurrent TLS certificate probes and certificate-based SSL strategy
+- Deploy timeline tracing across jobs with waterfall, Prometheus and OTLP exports
+- Capacity-aware placement of new apps on the best-fitting worker
+- Post-deploy cache warming from the sitemap with cold/warm latency and edge hit ratio
+- Resource right-sizing from observed Swarm usage (dokploy.toml suggestions)
+- Sablier scale-to-zero labels and middlewares for dev and preview deployments
 - Constants and enums for Dokploy operations
 """
 
+from .affected import (
+    CheckPlan,
+    ImpactReport,
+    Workspace,
+    changed_files,
+    load_workspace,
+    package_slug,
+    passed_keys,
+    plan_checks,
+)
+from .appspec import (
+    ApplicationSpec,
+    SyncResult,
+    build_application_spec,
+    health_spec,
+    nano_cpus,
+    parse_memory,
+    resolve_resources,
+    resources_spec,
+    source_spec,
+    sync_application,
+)
+from .breaker import CircuitBreaker, CircuitOpenError
+from .broker import (
+    ApiBroker,
+    BrokerError,
+    BrokerStats,
+    api_request,
+    broker_socket,
+    ping_broker,
+    start_broker,
+    stop_broker,
+)
+from .cachekey import (
+    CacheKeys,
+    WorkspacePackage,
+    compute_cache_keys,
+    discover_packages,
+    workspace_patterns,
+)
 from .client import (
     DokployAuthError,
     DokployClient,
     DokployError,
     DokployNotFoundError,
+    DokployPermanentError,
+    DokployRateLimitError,
+    DokployTransientError,
+    DokployUnavailableError,
     ServerUpdatePayload,
+    parse_retry_after,
 )
+from .cloudflare import CloudflareClient, CloudflareError
 from .config import (
     deep_merge,
+    get_domain_aliases,
     get_environment_config,
     get_project_name,
     load_merged_config,
@@ -29,18 +101,24 @@ from .constants import (
     CertificateType,
     ComposeType,
     Environment,
+    RequestPriority,
     SourceType,
     # API
     Endpoints,
     # Infrastructure
+    CLOUDFLARE_API_URL,
+    SLACK_API_URL,
     DEFAULT_APP_PORT,
     DEFAULT_SSH_PORT,
     DEFAULT_SSH_USER,
+    AUTO_SERVER,
     DEV_SERVER,
     PROD_SERVER,
     REGISTRY_HOST,
     REGISTRY_INTERNAL_HOST,
     REGISTRY_PORT,
+    TAILSCALE_API_URL,
+    TAILSCALE_IP_PREFIX,
     TRAEFIK_SERVER,
     # Files
     APP_PORT_VAR,
@@ -56,20 +134,36 @@ from .constants import (
     URL_SCHEME_HTTPS,
     # Timeouts
     ADMIN_SETUP_TIMEOUT,
+    CONNECT_TIMEOUT,
     DEFAULT_MAX_ATTEMPTS,
     DEFAULT_RETRY_INTERVAL,
     DEFAULT_TIMEOUT,
     DEPLOY_TIMEOUT,
     DNS_TIMEOUT,
+    LOOKUP_CACHE_TTL,
+    PROBE_BUDGET,
+    ROLLOUT_TIMEOUT,
+    SSH_COMMAND_TIMEOUT,
+    SSH_CONNECT_TIMEOUT,
+    SSH_CONTROL_PERSIST,
     TAILSCALE_TOKEN_TIMEOUT,
     TAILSCALE_WAIT_TIMEOUT,
+    TLS_CACHE_TTL,
+    TLS_PROBE_TIMEOUT,
     VPS_PROVISION_TIMEOUT,
+    WAIT_BACKOFF_FACTOR,
+    WAIT_INITIAL_INTERVAL,
+    WAIT_JITTER,
+    WAIT_MAX_INTERVAL,
+    WARM_BUDGET,
+    ZONE_CACHE_TTL,
     # Health check
     DEFAULT_HEALTH_INTERVAL,
     DEFAULT_HEALTH_PATH,
     DEFAULT_HEALTH_RETRIES,
     DEFAULT_HEALTH_START_PERIOD,
     DEFAULT_HEALTH_TIMEOUT,
+    DEFAULT_UPDATE_DELAY,
     HEALTH_SUCCESS_CODES,
     # Resources
     DEFAULT_CPU,
@@ -84,13 +178,30 @@ from .constants import (
     # Sablier
     SABLIER_DEFAULT_THEME,
     SABLIER_IDLE_TIMEOUT,
+    SABLIER_REFRESH_FREQUENCY,
     SABLIER_SESSION_DURATION,
     SABLIER_STARTUP_TIMEOUT,
+    SABLIER_STRATEGY,
+    SABLIER_URL,
+    # Rate limiting
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RETRY_AFTER,
+    MAX_RATE_LIMIT_RETRIES,
+    RATE_LIMIT_MAX_WAIT,
+    # Circuit breaker
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    TRANSIENT_RETRIES,
     # HTTP
     CONTENT_TYPE_JSON,
     HEADER_API_KEY,
     HEADER_AUTHORIZATION,
     HEADER_CONTENT_TYPE,
+    HEADER_RETRY_AFTER,
+    HEADER_ACCEPT,
+    HEADER_CONTENT_DIGEST,
     HTTP_BAD_REQUEST,
     HTTP_CREATED,
     HTTP_FORBIDDEN,
@@ -100,8 +211,17 @@ from .constants import (
     HTTP_NO_CONTENT,
     HTTP_NOT_FOUND,
     HTTP_OK,
+    HTTP_SERVICE_UNAVAILABLE,
+    HTTP_TOO_MANY_REQUESTS,
     HTTP_UNAUTHORIZED,
 )
+from .deploylogs import (
+    FollowResult,
+    LogFollower,
+    RemoteLogFile,
+    deployment_status,
+    find_deployment,
+)
 from .domain import (
     compute_app_name,
     compute_domain,
@@ -110,22 +230,231 @@ from .domain import (
     is_preview_domain,
     is_sub_subdomain,
 )
-from .output import output
+from .domainsync import (
+    DomainChange,
+    DomainPlan,
+    DomainReconciler,
+    DomainSpec,
+    ReconcileResult,
+    desired_domains,
+    plan_domains,
+)
+from .fingerprint import (
+    BuildFingerprint,
+    context_files,
+    fingerprint_build,
+    is_ignored,
+    parse_dockerignore,
+)
+from .output import output, stop_commands
 from .port import (
     detect_port,
     get_port,
     read_env_file,
 )
+from .probe import (
+    InfraProbe,
+    Outcome,
+    ProbeReport,
+    ProbeResult,
+    add_http_check,
+    add_swarm_checks,
+    registry_url,
+)
+from .provision import (
+    Registration,
+    label_node,
+    register_server,
+    resolve_ssh_key_id,
+    terraform_apply,
+)
+from .placement import (
+    NodeCapacity,
+    Placement,
+    candidate_servers,
+    cluster_capacity,
+    place,
+    placement_markdown,
+    requested_resources,
+)
+from .purge import (
+    ManifestDiff,
+    PurgePlan,
+    PurgeResult,
+    build_manifest,
+    diff_manifests,
+    execute_purge,
+    load_manifest,
+    plan_purge,
+    save_manifest,
+)
+from .ratelimit import RateLimiter, RateLimitTimeout
+from .readiness import (
+    ReadinessError,
+    docker_info,
+    http_ready,
+    tailscale_device,
+    tailscale_ip,
+)
+from .registry import RegistryClient, RegistryError
+from .rightsizing import (
+    Recommendation,
+    Resources,
+    RightsizingReport,
+    ServiceUsage,
+    UsageCollector,
+    UsageHistogram,
+    UsageStore,
+    current_resources,
+    recommend,
+    recommend_all,
+    split_app_name,
+)
+from .rollout import (
+    ROLLBACK_TERMINAL_STATES,
+    UPDATE_TERMINAL_STATES,
+    RolloutResult,
+    RolloutWatcher,
+    TaskTiming,
+)
+from .sablier import (
+    ScaleToZero,
+    attach_middleware,
+    parse_duration,
+    sablier_fields,
+    scale_to_zero_settings,
+)
+from .services import (
+    ServiceDeployer,
+    ServiceReport,
+    ServiceResult,
+    ServiceTarget,
+    resolve_services,
+    service_config,
+)
+from .slack import (
+    DeployMessage,
+    SlackError,
+    SlackNotifier,
+    SlackResult,
+)
+from .stages import StageGraph, StageGraphError, StageReport, StageResult
+from .state import SharedState, state_dir
+from .swarm import (
+    CommandResult,
+    ContainerStats,
+    ContainerStatus,
+    LocalRunner,
+    ServiceDetail,
+    SSHRunner,
+    SwarmClient,
+    SwarmError,
+    SwarmNode,
+    SwarmService,
+)
+from .tlsprobe import (
+    CertificateState,
+    SSLStrategy,
+    TLSProbe,
+    add_tls_checks,
+    host_matches,
+    probe_certificate,
+    ssl_strategy,
+    tls_report,
+)
+from .tracing import (
+    Span,
+    close_stage,
+    finish_job,
+    load_spans,
+    open_stage,
+    otlp_json,
+    prometheus_textfile,
+    record,
+    span,
+    start_job,
+    waterfall,
+)
+from .wait import WaitResult, WaitTimeout, wait_all, wait_until
+from .warm import (
+    CacheWarmer,
+    Discovery,
+    WarmReport,
+    WarmResult,
+    discover_urls,
+    parse_sitemap,
+)
+from .zoneconfig import (
+    PHASE_RESPONSE_HEADERS,
+    PageRule,
+    PhaseChange,
+    ZonePlan,
+    ZoneReconciler,
+    ZoneResult,
+    ZoneRule,
+    headers_rule,
+    merge_rules,
+    optimization_settings,
+    robots_rule,
+    www_redirect,
+)
 
 __all__ = [
+    # affected
+    "CheckPlan",
+    "ImpactReport",
+    "Workspace",
+    "changed_files",
+    "load_workspace",
+    "package_slug",
+    "passed_keys",
+    "plan_checks",
+    # appspec
+    "ApplicationSpec",
+    "SyncResult",
+    "build_application_spec",
+    "health_spec",
+    "resources_spec",
+    "source_spec",
+    "sync_application",
+    "parse_memory",
+    "resolve_resources",
+    "nano_cpus",
+    # breaker
+    "CircuitBreaker",
+    "CircuitOpenError",
+    # broker
+    "ApiBroker",
+    "BrokerError",
+    "BrokerStats",
+    "api_request",
+    "broker_socket",
+    "ping_broker",
+    "start_broker",
+    "stop_broker",
+    # cachekey
+    "CacheKeys",
+    "WorkspacePackage",
+    "compute_cache_keys",
+    "discover_packages",
+    "workspace_patterns",
     # client
     "DokployClient",
     "DokployError",
     "DokployAuthError",
     "DokployNotFoundError",
+    "DokployTransientError",
+    "DokployPermanentError",
+    "DokployUnavailableError",
+    "DokployRateLimitError",
     "ServerUpdatePayload",
+    "parse_retry_after",
+    # cloudflare
+    "CloudflareClient",
+    "CloudflareError",
     # config
     "deep_merge",
+    "get_domain_aliases",
     "get_environment_config",
     "get_project_name",
     "load_merged_config",
@@ -136,13 +465,19 @@ __all__ = [
     "BuildType",
     "ComposeType",
     "CertificateType",
+    "RequestPriority",
     "Endpoints",
     # constants - Infrastructure
     "TRAEFIK_SERVER",
     "DEV_SERVER",
+    "AUTO_SERVER",
     "PROD_SERVER",
     "REGISTRY_HOST",
     "REGISTRY_PORT",
+    "TAILSCALE_API_URL",
+    "TAILSCALE_IP_PREFIX",
+    "CLOUDFLARE_API_URL",
+    "SLACK_API_URL",
     "REGISTRY_INTERNAL_HOST",
     "DEFAULT_APP_PORT",
     "DEFAULT_SSH_PORT",
@@ -163,18 +498,34 @@ __all__ = [
     "DEFAULT_TIMEOUT",
     "DEPLOY_TIMEOUT",
     "DNS_TIMEOUT",
+    "CONNECT_TIMEOUT",
     "VPS_PROVISION_TIMEOUT",
     "ADMIN_SETUP_TIMEOUT",
     "DEFAULT_RETRY_INTERVAL",
     "DEFAULT_MAX_ATTEMPTS",
+    "WAIT_INITIAL_INTERVAL",
+    "WAIT_MAX_INTERVAL",
+    "WAIT_BACKOFF_FACTOR",
+    "WAIT_JITTER",
+    "SSH_CONNECT_TIMEOUT",
+    "SSH_CONTROL_PERSIST",
+    "SSH_COMMAND_TIMEOUT",
+    "ROLLOUT_TIMEOUT",
+    "PROBE_BUDGET",
+    "WARM_BUDGET",
+    "TLS_PROBE_TIMEOUT",
+    "TLS_CACHE_TTL",
     "TAILSCALE_WAIT_TIMEOUT",
     "TAILSCALE_TOKEN_TIMEOUT",
+    "LOOKUP_CACHE_TTL",
+    "ZONE_CACHE_TTL",
     # constants - Health check
     "DEFAULT_HEALTH_PATH",
     "DEFAULT_HEALTH_INTERVAL",
     "DEFAULT_HEALTH_TIMEOUT",
     "DEFAULT_HEALTH_RETRIES",
     "DEFAULT_HEALTH_START_PERIOD",
+    "DEFAULT_UPDATE_DELAY",
     "HEALTH_SUCCESS_CODES",
     # constants - Resources
     "DEFAULT_MEMORY",
@@ -191,10 +542,27 @@ __all__ = [
     "SABLIER_SESSION_DURATION",
     "SABLIER_STARTUP_TIMEOUT",
     "SABLIER_DEFAULT_THEME",
+    "SABLIER_URL",
+    "SABLIER_STRATEGY",
+    "SABLIER_REFRESH_FREQUENCY",
+    # constants - Rate limiting
+    "DEFAULT_RATE_LIMIT",
+    "DEFAULT_RATE_BURST",
+    "DEFAULT_MAX_CONCURRENCY",
+    "RATE_LIMIT_MAX_WAIT",
+    "DEFAULT_RETRY_AFTER",
+    "MAX_RATE_LIMIT_RETRIES",
+    # constants - Circuit breaker
+    "BREAKER_FAILURE_THRESHOLD",
+    "BREAKER_COOLDOWN",
+    "TRANSIENT_RETRIES",
     # constants - HTTP
     "HEADER_API_KEY",
     "HEADER_CONTENT_TYPE",
     "HEADER_AUTHORIZATION",
+    "HEADER_RETRY_AFTER",
+    "HEADER_ACCEPT",
+    "HEADER_CONTENT_DIGEST",
     "CONTENT_TYPE_JSON",
     "HTTP_OK",
     "HTTP_CREATED",
@@ -205,7 +573,15 @@ __all__ = [
     "HTTP_UNAUTHORIZED",
     "HTTP_FORBIDDEN",
     "HTTP_NOT_FOUND",
+    "HTTP_TOO_MANY_REQUESTS",
     "HTTP_INTERNAL_ERROR",
+    "HTTP_SERVICE_UNAVAILABLE",
+    # deploylogs
+    "FollowResult",
+    "LogFollower",
+    "RemoteLogFile",
+    "deployment_status",
+    "find_deployment",
     # domain
     "compute_app_name",
     "compute_domain",
@@ -213,10 +589,170 @@ __all__ = [
     "get_root_domain",
     "is_preview_domain",
     "is_sub_subdomain",
+    # domainsync
+    "DomainReconciler",
+    "DomainSpec",
+    "DomainPlan",
+    "DomainChange",
+    "ReconcileResult",
+    "desired_domains",
+    "plan_domains",
+    # fingerprint
+    "BuildFingerprint",
+    "context_files",
+    "fingerprint_build",
+    "is_ignored",
+    "parse_dockerignore",
     # output
     "output",
+    "stop_commands",
     # port
     "detect_port",
     "get_port",
     "read_env_file",
+    # probe
+    "InfraProbe",
+    "Outcome",
+    "ProbeReport",
+    "ProbeResult",
+    "add_http_check",
+    "add_swarm_checks",
+    "registry_url",
+    # provision
+    "Registration",
+    "label_node",
+    "register_server",
+    "resolve_ssh_key_id",
+    "terraform_apply",
+    # placement
+    "NodeCapacity",
+    "Placement",
+    "candidate_servers",
+    "cluster_capacity",
+    "place",
+    "placement_markdown",
+    "requested_resources",
+    # purge
+    "ManifestDiff",
+    "PurgePlan",
+    "PurgeResult",
+    "build_manifest",
+    "diff_manifests",
+    "execute_purge",
+    "load_manifest",
+    "plan_purge",
+    "save_manifest",
+    # ratelimit
+    "RateLimiter",
+    "RateLimitTimeout",
+    # readiness
+    "ReadinessError",
+    "docker_info",
+    "http_ready",
+    "tailscale_device",
+    "tailscale_ip",
+    # registry
+    "RegistryClient",
+    "RegistryError",
+    # rightsizing
+    "UsageCollector",
+    "UsageHistogram",
+    "UsageStore",
+    "ServiceUsage",
+    "Resources",
+    "Recommendation",
+    "RightsizingReport",
+    "current_resources",
+    "recommend",
+    "recommend_all",
+    "split_app_name",
+    # rollout
+    "RolloutWatcher",
+    "RolloutResult",
+    "TaskTiming",
+    "UPDATE_TERMINAL_STATES",
+    "ROLLBACK_TERMINAL_STATES",
+    # sablier
+    "ScaleToZero",
+    "attach_middleware",
+    "parse_duration",
+    "sablier_fields",
+    "scale_to_zero_settings",
+    # services
+    "ServiceDeployer",
+    "ServiceReport",
+    "ServiceResult",
+    "ServiceTarget",
+    "resolve_services",
+    "service_config",
+    # slack
+    "DeployMessage",
+    "SlackError",
+    "SlackNotifier",
+    "SlackResult",
+    # stages
+    "StageGraph",
+    "StageGraphError",
+    "StageReport",
+    "StageResult",
+    # state
+    "SharedState",
+    "state_dir",
+    # swarm
+    "SwarmClient",
+    "SwarmError",
+    "SSHRunner",
+    "LocalRunner",
+    "CommandResult",
+    "SwarmNode",
+    "SwarmService",
+    "ServiceDetail",
+    "ContainerStatus",
+    "ContainerStats",
+    # tlsprobe
+    "CertificateState",
+    "SSLStrategy",
+    "TLSProbe",
+    "add_tls_checks",
+    "host_matches",
+    "probe_certificate",
+    "ssl_strategy",
+    "tls_report",
+    # tracing
+    "Span",
+    "close_stage",
+    "finish_job",
+    "load_spans",
+    "open_stage",
+    "otlp_json",
+    "prometheus_textfile",
+    "record",
+    "span",
+    "start_job",
+    "waterfall",
+    # wait
+    "WaitResult",
+    "WaitTimeout",
+    "wait_all",
+    "wait_until",
+    # warm
+    "CacheWarmer",
+    "Discovery",
+    "WarmReport",
+    "WarmResult",
+    "discover_urls",
+    "parse_sitemap",
+    # zoneconfig
+    "PHASE_RESPONSE_HEADERS",
+    "PageRule",
+    "PhaseChange",
+    "ZonePlan",
+    "ZoneReconciler",
+    "ZoneResult",
+    "ZoneRule",
+    "headers_rule",
+    "merge_rules",
+    "optimization_settings",
+    "robots_rule",
+    "www_redirect",
 ]
@@ -0,0 +1,403 @@
+"""Affected-only quality checks with a content-hash pass cache.
+
+quality-checks.yml ran lint, typecheck, test and build over the whole
+repository, so in a large workspace a one-package change paid for every
+package. plan_checks() narrows each check down to the packages that need
+it:
+
+- change impact: files changed since the base ref are mapped to their
+  workspace package, then to every package that depends on it (workspace
+  dependencies from package.json); a change outside any package (root
+  config, lockfile, toolchain) affects all packages
+- pass cache: every package gets an input hash - the git blob hashes of
+  its files, the input hashes of its workspace dependencies and the hash
+  of the root files - and a check that passed records a marker under a
+  key derived from that hash and the check's settings (fail-on-warning,
+  coverage threshold, ...). A package whose key already has a marker
+  passed with exactly these inputs and settings and is skipped
+
+Only packages that define the check's script are considered. Without
+workspace packages the repository root is the single package.
+
+    workspace = load_workspace(".")
+    report = plan_checks(workspace, {"lint": "lint", "test": "test"}, changed_files(".", "origin/main"), passed_keys())
+    print(report.to_markdown())
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from .cachekey import DEPENDENCY_FIELDS, PACKAGE_JSON, discover_packages
+from .constants import DEFAULT_TIMEOUT
+
+QUALITY_PASS_PREFIX = "quality-pass-"
+INPUT_HASH_LENGTH = 24
+
+# Bump when the hashed inputs change, so old pass markers stop matching
+INPUT_HASH_VERSION = "2"
+
+# Root files that never change a check's outcome (fnmatch against the whole
+# path from the workspace root; * spans /, so only the directories use it).
+# Package files are never ignored: markdown may be content a build renders
+IGNORED_FILES = ("README.md", "CHANGELOG.md", "CONTRIBUTING.md", "LICENSE*", ".changeset/*", ".github/*", ".gitignore")
+
+# Default pnpm script of each check (actions/quality/*, actions/test, build-project)
+CHECK_SCRIPTS = {
+    "lint": "lint",
+    "typecheck": "type-check",
+    "test": "test",
+    "build": "build",
+}
+
+GITHUB_API_URL = "https://api.github.com"
+CACHE_LIST_PAGE_SIZE = 100
+CACHE_LIST_MAX_PAGES = 20
+
+ROOT_PACKAGE = "."
+
+
+@dataclass
+class Package:
+    """A workspace package and what its checks depend on."""
+
+    path: str  # relative to the workspace root ("." for a single-package repo)
+    name: str
+    scripts: dict[str, str] = field(default_factory=dict)
+    dependencies: list[str] = field(default_factory=list)  # workspace package paths
+    files_hash: str = ""
+    input_hash: str = ""
+
+    @property
+    def label(self) -> str:
+        return self.name or self.path
+
+
+@dataclass
+class Workspace:
+    """Workspace packages, their dependency graph and input hashes."""
+
+    root: Path
+    packages: dict[str, Package]  # path -> package
+    global_hash: str
+    global_files: list[str] = field(default_factory=list)
+    ignored: tuple[str, ...] = IGNORED_FILES
+
+    def owner(self, path: str) -> str | None:
+        """Package path a file belongs to (deepest package), None for root files."""
+        if ROOT_PACKAGE in self.packages:
+            return ROOT_PACKAGE
+        parts = path.split("/")
+        for i in range(len(parts) - 1, 0, -1):
+            prefix = "/".join(parts[:i])
+            if prefix in self.packages:
+                return prefix
+        return None
+
+    def dependents(self, paths: set[str]) -> set[str]:
+        """The packages plus every package depending on them, transitively."""
+        reverse: dict[str, set[str]] = {}
+        for package in self.packages.values():
+            for dependency in package.dependencies:
+                reverse.setdefault(dependency, set()).add(package.path)
+        result = set(paths)
+        queue = list(paths)
+        while queue:
+            for dependent in reverse.get(queue.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    queue.append(dependent)
+        return result
+
+    def affected(self, changed: list[str] | None) -> tuple[set[str], str]:
+        """(affected package paths, reason) for a list of changed files.
+
+        None (unknown base) and root file changes affect every package.
+        """
+        if changed is None:
+            return set(self.packages), "no base ref to diff against"
+        owners: set[str] = set()
+        for path in changed:
+            if any(fnmatch(path, pattern) for pattern in self.ignored):
+                continue
+            owner = self.owner(path)
+            if owner is None:
+                return set(self.packages), f"root file changed: {path}"
+            owners.add(owner)
+        return self.dependents(owners), f"{len(changed)} changed file(s)"
+
+    def check_key(self, check: str, command: str, path: str, options: str = "") -> str:
+        """Pass-marker key of one check of one package.
+
+        options holds the check's settings that decide pass or fail (e.g.
+        "fail-on-warning=true"), so a pass never stands in for a stricter run.
+        """
+        package = self.packages[path]
+        digest = hashlib.sha256(f"{check}\0{command}\0{options}\0{package.input_hash}".encode()).hexdigest()
+        slug = re.sub(r"[^A-Za-z0-9._]+", "_", package.label).strip("_") or "root"
+        return f"{QUALITY_PASS_PREFIX}{check}-{slug}-{digest[:INPUT_HASH_LENGTH]}"
+
+
+# =============================================================================
+# Git
+# =============================================================================
+
+
+def _git(root: str | Path, *args: str) -> str:
+    """Run git in root; raises subprocess.CalledProcessError on failure."""
+    return subprocess.run(
+        ["git", *args], cwd=root, capture_output=True, text=True, check=True, timeout=DEFAULT_TIMEOUT
+    ).stdout
+
+
+def git_files(root: str | Path) -> dict[str, str]:
+    """Tracked files under root (relative paths) -> git blob hash.
+
+    Blob hashes come from the index, so no file is read.
+    """
+    files: dict[str, str] = {}
+    for entry in _git(root, "ls-files", "-s", "-z").split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        files[path] = meta.split()[1]
+    return files
+
+
+def changed_files(root: str | Path, base_ref: str) -> list[str] | None:
+    """Files under root changed between the merge base with base_ref and HEAD.
+
+    Returns:
+        Relative paths, or None when there is no usable base ref
+    """
+    if not base_ref or set(base_ref) == {"0"}:
+        return None
+    try:
+        output = _git(root, "diff", "--name-only", "--relative", "-z", f"{base_ref}...HEAD")
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        return None
+    return [path for path in output.split("\0") if path]
+
+
+# =============================================================================
+# Workspace
+# =============================================================================
+
+
+def _read_manifest(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _digest(lines: list[str]) -> str:
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def load_workspace(root: str | Path = ".", ignored: tuple[str, ...] = IGNORED_FILES) -> Workspace:
+    """Discover packages, their workspace dependencies and input hashes.
+
+    Raises:
+        subprocess.CalledProcessError: If root is not inside a git work tree
+    """
+    root = Path(root)
+    paths = discover_packages(root) or [ROOT_PACKAGE]
+    manifests = {path: _read_manifest(root / path / PACKAGE_JSON) for path in paths}
+    by_name = {str(m.get("name")): path for path, m in manifests.items() if m.get("name")}
+
+    packages: dict[str, Package] = {}
+    for path, manifest in manifests.items():
+        declared = {name for f in DEPENDENCY_FIELDS for name in (manifest.get(f) or {})}
+        packages[path] = Package(
+            path=path,
+            name=str(manifest.get("name", "")),
+            scripts=manifest.get("scripts") or {},
+            dependencies=sorted(by_name[name] for name in declared if name in by_name and by_name[name] != path),
+        )
+    workspace = Workspace(root, packages, "", ignored=ignored)
+
+    owned: dict[str, list[str]] = {path: [] for path in packages}
+    for path, blob in sorted(git_files(root).items()):
+        if any(fnmatch(path, pattern) for pattern in ignored):
+            continue
+        owner = workspace.owner(path)
+        if owner is None:
+            workspace.global_files.append(path)
+            owned.setdefault("", []).append(f"{path}\0{blob}")
+        else:
+            owned[owner].append(f"{path}\0{blob}")
+    workspace.global_hash = _digest([INPUT_HASH_VERSION, *owned.get("", [])])
+    for path, package in packages.items():
+        package.files_hash = _digest(owned[path])
+
+    def input_hash(path: str, visiting: frozenset[str]) -> str:
+        package = packages[path]
+        if not package.input_hash:
+            # Dependency cycles are cut at the back-edge
+            deps = [input_hash(d, visiting | {path}) for d in package.dependencies if d not in visiting]
+            package.input_hash = _digest([workspace.global_hash, package.files_hash, *deps])
+        return package.input_hash
+
+    for path in packages:
+        input_hash(path, frozenset())
+    return workspace
+
+
+# =============================================================================
+# Pass cache
+# =============================================================================
+
+
+def passed_keys(
+    prefix: str = QUALITY_PASS_PREFIX,
+    repository: str | None = None,
+    token: str | None = None,
+    api_url: str | None = None,
+) -> set[str]:
+    """Keys of the pass markers saved in the repository's Actions cache.
+
+    One paginated listing instead of a lookup per package. Markers saved on
+    other branches count too: the key is a hash of the inputs, so a pass
+    anywhere is a pass here.
+
+    Raises:
+        requests.RequestException: If the cache listing fails
+    """
+    repository = repository or os.environ["GITHUB_REPOSITORY"]
+    token = token or os.environ.get("GITHUB_TOKEN", "")
+    api_url = (api_url or os.environ.get("GITHUB_API_URL") or GITHUB_API_URL).rstrip("/")
+    headers = {"Accept": "application/vnd.github+json", "Authorization": f"Bearer {token}"}
+
+    keys: set[str] = set()
+    for page in range(1, CACHE_LIST_MAX_PAGES + 1):
+        resp = requests.get(
+            f"{api_url}/repos/{repository}/actions/caches",
+            headers=headers,
+            params={"key": prefix, "per_page": CACHE_LIST_PAGE_SIZE, "page": page},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        caches = resp.json().get("actions_caches", [])
+        keys.update(str(c.get("key", "")) for c in caches)
+        if len(caches) < CACHE_LIST_PAGE_SIZE:
+            break
+    return keys
+
+
+# =============================================================================
+# Plan
+# =============================================================================
+
+
+@dataclass
+class CheckPlan:
+    """Which packages one check runs on, and why the others are skipped."""
+
+    check: str
+    command: str
+    run: list[dict[str, str]] = field(default_factory=list)  # matrix entries
+    cached: list[str] = field(default_factory=list)  # passed with the same inputs
+    unaffected: list[str] = field(default_factory=list)
+    no_script: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ImpactReport:
+    """Check plans for a workspace."""
+
+    plans: dict[str, CheckPlan]
+    affected: list[str]
+    reason: str
+    packages: int
+
+    def matrix(self, check: str) -> list[dict[str, str]]:
+        plan = self.plans.get(check)
+        return plan.run if plan else []
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "packages": self.packages,
+            "affected": self.affected,
+            "reason": self.reason,
+            "checks": {
+                check: {
+                    "command": plan.command,
+                    "run": plan.run,
+                    "cached": plan.cached,
+                    "unaffected": plan.unaffected,
+                    "no_script": plan.no_script,
+                }
+                for check, plan in self.plans.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_markdown(self) -> str:
+        lines = [
+            f"{len(self.affected)} of {self.packages} package(s) affected ({self.reason})",
+            "",
+            "| Check | Run | Cached pass | Unaffected | No script |",
+            "|-------|-----|-------------|------------|-----------|",
+        ]
+        for check, plan in self.plans.items():
+            run = ", ".join(entry["name"] for entry in plan.run) or "—"
+            lines.append(
+                f"| {check} (`pnpm {plan.command}`) | {run} | {len(plan.cached)} | "
+                f"{len(plan.unaffected)} | {len(plan.no_script)} |"
+            )
+        return "\n".join(lines)
+
+
+def package_slug(path: str) -> str:
+    """Artifact-safe name of a package path (packages/web -> packages-web)."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", path).strip("-.") or "root"
+
+
+def plan_checks(
+    workspace: Workspace,
+    commands: dict[str, str],
+    changed: list[str] | None,
+    passed: set[str],
+    options: dict[str, str] | None = None,
+) -> ImpactReport:
+    """Plan each check: affected packages defining the script, minus cached passes.
+
+    Args:
+        workspace: load_workspace() result
+        commands: Check name -> pnpm script (e.g. {"lint": "lint"})
+        changed: changed_files() result (None: everything is affected)
+        passed: passed_keys() result
+        options: Check name -> settings that decide pass or fail (part of the pass key)
+
+    Returns:
+        ImpactReport; matrix entries are {"package", "name", "slug", "key"}
+    """
+    affected, reason = workspace.affected(changed)
+    plans: dict[str, CheckPlan] = {}
+    for check, command in commands.items():
+        plan = CheckPlan(check, command)
+        for path, package in sorted(workspace.packages.items()):
+            if command not in package.scripts:
+                plan.no_script.append(path)
+            elif path not in affected:
+                plan.unaffected.append(path)
+            else:
+                key = workspace.check_key(check, command, path, (options or {}).get(check, ""))
+                if key in passed:
+                    plan.cached.append(path)
+                else:
+                    plan.run.append({"package": path, "name": package.label, "slug": package_slug(path), "key": key})
+        plans[check] = plan
+    return ImpactReport(plans, sorted(affected), reason, len(workspace.packages))
@@ -0,0 +1,354 @@
+"""Desired application settings, diffed against Dokploy in one update.
+
+Source, Swarm health check, update policy and resources used to be set by
+separate actions, each posting its own application.update on every deploy
+even when nothing changed. ApplicationSpec holds all of them, built from the
+merged config plus action inputs; sync_application() fetches the current
+application once and posts a single update with only the fields that
+differ, or nothing at all.
+
+    spec = build_application_spec(config, "production", port=3000, docker_image=image)
+    result = sync_application(client, app_id, spec)
+    print(result.changed)  # e.g. ["dockerImage"]
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any
+
+from .client import DokployClient
+from .config import get_environment_config
+from .constants import (
+    DEFAULT_APP_PORT,
+    DEFAULT_CPU,
+    DEFAULT_CPU_LIMIT,
+    DEFAULT_DOCKERFILE,
+    DEFAULT_HEALTH_INTERVAL,
+    DEFAULT_HEALTH_PATH,
+    DEFAULT_HEALTH_RETRIES,
+    DEFAULT_HEALTH_START_PERIOD,
+    DEFAULT_HEALTH_TIMEOUT,
+    DEFAULT_MEMORY,
+    DEFAULT_MEMORY_LIMIT,
+    DEFAULT_REPLICAS,
+    DEFAULT_UPDATE_DELAY,
+    Environment,
+    SourceType,
+)
+from .sablier import sablier_fields, scale_to_zero_settings
+
+# Docker Swarm durations and CPU quotas are expressed in nano-units
+NANOSECONDS = 1_000_000_000
+NANO_CPUS = 1_000_000_000
+
+# Kubernetes-style memory suffixes used in dokploy.toml ("512Mi", "1Gi")
+MEMORY_UNITS = {
+    "": 1,
+    "k": 1000,
+    "ki": 1024,
+    "m": 1000**2,
+    "mi": 1024**2,
+    "g": 1000**3,
+    "gi": 1024**3,
+}
+
+
+@dataclass
+class ApplicationSpec:
+    """Desired Dokploy application fields.
+
+    Attributes:
+        fields: application.update fields this spec manages (others are left alone)
+    """
+
+    fields: dict[str, Any] = field(default_factory=dict)
+
+    def merge(self, other: "ApplicationSpec") -> "ApplicationSpec":
+        """Return a spec with both specs' fields (other wins on conflicts)."""
+        return ApplicationSpec({**self.fields, **other.fields})
+
+    def diff(self, current: dict[str, Any]) -> dict[str, Any]:
+        """Fields whose desired value differs from the current application."""
+        return {
+            name: value
+            for name, value in self.fields.items()
+            if _canonical(value) != _canonical(current.get(name))
+        }
+
+
+@dataclass
+class SyncResult:
+    """Outcome of sync_application()."""
+
+    changed: list[str]
+    updated: bool
+
+
+# =============================================================================
+# Unit conversion
+# =============================================================================
+
+
+def parse_memory(value: str | int | float) -> int:
+    """Convert a memory size ("512Mi", "1Gi", "256M" or bytes) to bytes.
+
+    Raises:
+        ValueError: If the value is not a valid size
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = value.strip()
+    number = text.rstrip("KMGkmgIi")
+    unit = text[len(number) :].lower()
+    if unit not in MEMORY_UNITS or not number:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    return int(float(number) * MEMORY_UNITS[unit])
+
+
+def nano_cpus(cores: str | int | float) -> int:
+    """Convert CPU cores (0.5) to Docker nano-CPUs."""
+    return int(round(float(cores) * NANO_CPUS))
+
+
+# =============================================================================
+# Spec builders
+# =============================================================================
+
+
+def source_spec(
+    docker_image: str = "",
+    github_url: str = "",
+    github_branch: str = "main",
+    dockerfile_path: str = f"./{DEFAULT_DOCKERFILE}",
+) -> ApplicationSpec:
+    """Source fields: a Docker image, or a Git repository built by Dokploy.
+
+    The image wins when both are given.
+
+    Raises:
+        ValueError: If neither an image nor a repository is given
+    """
+    if docker_image:
+        return ApplicationSpec({"sourceType": SourceType.DOCKER.value, "dockerImage": docker_image})
+    if github_url:
+        return ApplicationSpec(
+            {
+                "sourceType": SourceType.GITHUB.value,
+                "customGitUrl": github_url,
+                "customGitBranch": github_branch,
+                "dockerfilePath": dockerfile_path,
+            }
+        )
+    raise ValueError("A Docker image or a GitHub URL is required")
+
+
+def health_spec(
+    port: int = DEFAULT_APP_PORT,
+    path: str = DEFAULT_HEALTH_PATH,
+    interval: int = DEFAULT_HEALTH_INTERVAL,
+    timeout: int = DEFAULT_HEALTH_TIMEOUT,
+    retries: int = DEFAULT_HEALTH_RETRIES,
+    start_period: int = DEFAULT_HEALTH_START_PERIOD,
+    rollback: bool = True,
+    update_delay: int = DEFAULT_UPDATE_DELAY,
+    enabled: bool = True,
+) -> ApplicationSpec:
+    """Swarm health check and rolling-update policy (durations in seconds).
+
+    A disabled health check is cleared (healthCheckSwarm: null).
+    """
+    # Use wget instead of curl - more commonly available in Alpine-based images
+    # Use 127.0.0.1 instead of localhost - some Alpine images have DNS resolution issues
+    health_check = {
+        "Test": ["CMD", "wget", "-q", "-O", "/dev/null", f"http://127.0.0.1:{port}{path}"],
+        "Interval": interval * NANOSECONDS,
+        "Timeout": timeout * NANOSECONDS,
+        "StartPeriod": start_period * NANOSECONDS,
+        "Retries": retries,
+    }
+    update_config = {
+        "Parallelism": 1,
+        "Delay": update_delay * NANOSECONDS,
+        "FailureAction": "rollback" if rollback else "pause",
+        "Order": "start-first",
+    }
+    return ApplicationSpec(
+        {
+            "healthCheckSwarm": health_check if enabled else None,
+            "updateConfigSwarm": update_config,
+        }
+    )
+
+
+def resources_spec(
+    memory: str | int = DEFAULT_MEMORY,
+    memory_limit: str | int = DEFAULT_MEMORY_LIMIT,
+    cpu: float = DEFAULT_CPU,
+    cpu_limit: float = DEFAULT_CPU_LIMIT,
+    replicas: int | None = DEFAULT_REPLICAS,
+) -> ApplicationSpec:
+    """Resource reservations/limits (Dokploy stores bytes and nano-CPUs as strings)."""
+    fields: dict[str, Any] = {
+        "memoryReservation": str(parse_memory(memory)),
+        "memoryLimit": str(parse_memory(memory_limit)),
+        "cpuReservation": str(nano_cpus(cpu)),
+        "cpuLimit": str(nano_cpus(cpu_limit)),
+    }
+    if replicas is not None:
+        fields["replicas"] = int(replicas)
+    return ApplicationSpec(fields)
+
+
+def build_application_spec(
+    config: dict[str, Any],
+    environment: str,
+    port: int = DEFAULT_APP_PORT,
+    docker_image: str = "",
+    github_url: str = "",
+    github_branch: str = "main",
+    health_overrides: dict[str, Any] | None = None,
+    app_name: str = "",
+) -> ApplicationSpec:
+    """Assemble the full desired application state from the merged config.
+
+    Resources come from [resources], overridden per environment by
+    [environments.<env>] (memory, cpu, memory_limit, cpu_limit, replicas);
+    they are not managed when the config sets none of them.
+    The health check comes from [healthcheck]; non-empty health_overrides
+    (keys as in [healthcheck]) win over it. Outside production, the Sablier
+    labels follow [scale_to_zero] (grouped by app_name).
+
+    Args:
+        config: Merged configuration (defaults + project dokploy.toml)
+        environment: Target environment name
+        port: Application port the health check targets
+        docker_image: Image to deploy (docker source)
+        github_url: Repository URL (github source, used when there is no image;
+            the source is left alone when neither is given)
+        github_branch: Branch for the github source
+        health_overrides: Health check values set explicitly by the caller
+        app_name: Application name (Sablier group; labels are not managed without it)
+
+    Returns:
+        ApplicationSpec with source, health check, update policy, resources
+        and scale-to-zero labels
+
+    Raises:
+        ValueError: On invalid resource or scale-to-zero values
+    """
+    spec = ApplicationSpec()
+    if docker_image or github_url:
+        dockerfile = config.get("build", {}).get("dockerfile", DEFAULT_DOCKERFILE)
+        spec = source_spec(docker_image, github_url, github_branch, f"./{dockerfile.removeprefix('./')}")
+
+    health = {**config.get("healthcheck", {})}
+    health.update({k: v for k, v in (health_overrides or {}).items() if v not in (None, "")})
+    spec = spec.merge(
+        health_spec(
+            port=int(health.get("port") or port),
+            path=health.get("path", DEFAULT_HEALTH_PATH),
+            interval=int(health.get("interval", DEFAULT_HEALTH_INTERVAL)),
+            timeout=int(health.get("timeout", DEFAULT_HEALTH_TIMEOUT)),
+            retries=int(health.get("retries", DEFAULT_HEALTH_RETRIES)),
+            start_period=int(health.get("start_period", DEFAULT_HEALTH_START_PERIOD)),
+            rollback=_as_bool(health.get("rollback", True)),
+            update_delay=int(health.get("update_delay", DEFAULT_UPDATE_DELAY)),
+            enabled=_as_bool(health.get("enabled", True)),
+        )
+    )
+
+    if app_name and environment and environment != Environment.PRODUCTION.value:
+        spec = spec.merge(ApplicationSpec(sablier_fields(scale_to_zero_settings(config, environment, app_name))))
+
+    resources = resolve_resources(config, environment)
+    if resources is None:
+        # No resource settings at all: leave whatever is set in Dokploy alone
+        return spec
+    return spec.merge(resources_spec(**resources))
+
+
+def resolve_resources(config: dict[str, Any], environment: str) -> dict[str, Any] | None:
+    """Resources of an environment: [resources] overridden by [environments.<env>].
+
+    Returns:
+        resources_spec() keyword arguments (defaults filled in), or None
+        when the config sets no resources at all
+    """
+    resources = {**config.get("resources", {})}
+    env_config = get_environment_config(config, environment)
+    for key in ("memory", "memory_limit", "cpu", "cpu_limit"):
+        if key in env_config:
+            resources[key] = env_config[key]
+    if not resources and "replicas" not in env_config:
+        return None
+    return {
+        "memory": resources.get("memory", DEFAULT_MEMORY),
+        "memory_limit": resources.get("memory_limit", DEFAULT_MEMORY_LIMIT),
+        "cpu": resources.get("cpu", DEFAULT_CPU),
+        "cpu_limit": resources.get("cpu_limit", DEFAULT_CPU_LIMIT),
+        "replicas": env_config.get("replicas", DEFAULT_REPLICAS),
+    }
+
+
+# =============================================================================
+# Sync
+# =============================================================================
+
+
+def sync_application(
+    client: DokployClient,
+    application_id: str,
+    spec: ApplicationSpec,
+    current: dict[str, Any] | None = None,
+) -> SyncResult:
+    """Bring the application in line with the spec using at most one update.
+
+    Args:
+        client: Dokploy client
+        application_id: Dokploy application ID
+        spec: Desired fields
+        current: Current application (fetched if None)
+
+    Returns:
+        SyncResult with the changed field names and whether an update was sent
+
+    Raises:
+        DokployError: On API errors
+    """
+    if current is None:
+        current = client.get_application(application_id)
+    changes = spec.diff(current)
+    if changes:
+        client.update_application(application_id, changes)
+    return SyncResult(changed=list(changes), updated=bool(changes))
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def _canonical(value: Any) -> str:
+    """Comparable form: numbers and numeric strings compare by value, key order is ignored."""
+
+    def normalize(item: Any) -> Any:
+        if isinstance(item, dict):
+            return {k: normalize(v) for k, v in item.items()}
+        if isinstance(item, list):
+            return [normalize(v) for v in item]
+        if isinstance(item, bool) or item is None:
+            return item
+        if isinstance(item, (int, float)):
+            number = float(item)
+            return str(int(number)) if number.is_integer() else repr(number)
+        if isinstance(item, str):
+            try:
+                number = float(item)
+            except ValueError:
+                return item
+            return normalize(number) if math.isfinite(number) else item
+        return item
+
+    return json.dumps(normalize(value), sort_keys=True)
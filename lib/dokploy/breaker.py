@@ -0,0 +1,147 @@
+"""Cross-process circuit breaker for the Dokploy API.
+
+When the admin server is down, every step would otherwise spend its full
+request timeout before failing. The breaker counts consecutive connection
+and 5xx failures in a SharedState file (see state.py), so once it opens all
+later steps on the runner fail immediately until the cooldown expires. One
+probe call is then let through (half-open); its outcome closes or re-opens
+the circuit.
+"""
+
+import hashlib
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .constants import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_PROBE_TTL,
+    BREAKER_STATE_FILE,
+)
+from .state import SharedState, state_dir
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open; the call was rejected without being sent."""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared through a lock file.
+
+    Usage:
+        breaker = CircuitBreaker.for_url("https://dokploy.example.com")
+        breaker.before_call()       # raises CircuitOpenError when open
+        try:
+            response = send()
+        except ConnectionError:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+    """
+
+    def __init__(
+        self,
+        state_path: str | Path,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        """Initialize circuit breaker.
+
+        Args:
+            state_path: JSON state file shared by all processes
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds to reject calls before allowing a probe
+        """
+        self.shared = SharedState(state_path)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+    @classmethod
+    def for_url(cls, url: str) -> "CircuitBreaker | None":
+        """Create breaker for one Dokploy instance from environment variables.
+
+        Optional env vars:
+            DOKPLOY_BREAKER_THRESHOLD: Consecutive failures before opening (default: 3, 0 disables)
+            DOKPLOY_BREAKER_COOLDOWN: Seconds the circuit stays open (default: 30)
+
+        Returns:
+            CircuitBreaker instance, or None if disabled
+        """
+        threshold = int(os.environ.get("DOKPLOY_BREAKER_THRESHOLD", str(BREAKER_FAILURE_THRESHOLD)))
+        if threshold <= 0:
+            return None
+
+        key = hashlib.sha256(url.encode()).hexdigest()[:12]
+        return cls(
+            state_path=state_dir() / BREAKER_STATE_FILE.format(key=key),
+            failure_threshold=threshold,
+            cooldown=float(os.environ.get("DOKPLOY_BREAKER_COOLDOWN", str(BREAKER_COOLDOWN))),
+        )
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, Any]]:
+        """Shared state with defaults filled in (closed on first use)."""
+        with self.shared.locked() as state:
+            state.setdefault("state", STATE_CLOSED)
+            state.setdefault("failures", 0)
+            state.setdefault("opened_at", 0.0)
+            state.setdefault("probe_started", 0.0)
+            yield state
+
+    def before_call(self) -> None:
+        """Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight
+        """
+        with self._locked_state() as state:
+            now = time.time()
+
+            if state["state"] == STATE_OPEN:
+                retry_in = state["opened_at"] + self.cooldown - now
+                if retry_in > 0:
+                    raise CircuitOpenError(
+                        f"Circuit open after {state['failures']} consecutive failures",
+                        retry_in=retry_in,
+                    )
+                state["state"] = STATE_HALF_OPEN
+                state["probe_started"] = now
+                return
+
+            if state["state"] == STATE_HALF_OPEN:
+                if now - state["probe_started"] < BREAKER_PROBE_TTL:
+                    raise CircuitOpenError("Circuit half-open, probe in progress", retry_in=self.cooldown)
+                # Previous probe never reported back (process killed) - take over
+                state["probe_started"] = now
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._locked_state() as state:
+            state["state"] = STATE_CLOSED
+            state["failures"] = 0
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold or on a failed probe."""
+        with self._locked_state() as state:
+            state["failures"] += 1
+            if state["state"] == STATE_HALF_OPEN or state["failures"] >= self.failure_threshold:
+                state["state"] = STATE_OPEN
+                state["opened_at"] = time.time()
+
+    @property
+    def state(self) -> str:
+        """Current circuit state (closed, open or half_open)."""
+        with self._locked_state() as state:
+            return state["state"]
@@ -0,0 +1,533 @@
+"""Per-job API broker: one long-lived process owning the HTTP sessions.
+
+Each composite action step is a fresh Python process, so every step used
+to open new TLS connections to Dokploy, Cloudflare, Tailscale and Slack
+and started with empty lookup caches. The first step of a job can start
+an ApiBroker, which listens on a Unix socket under the runner state dir
+(see state.py) and serves every later step:
+
+- one pooled requests.Session per origin, so connections and TLS
+  sessions are reused across steps
+- a job-wide cache for GETs that ask for it (cache_ttl > 0), keyed on the
+  full request including its credentials; any other method sent to an
+  origin drops that origin's cached responses
+- no cookies are kept, so clients with different tokens never share state
+
+api_request() is a drop-in for requests.request(): it goes through the
+broker when its socket is there and answers, and falls back to a direct
+request otherwise. Streamed requests (stream=True) always go straight to
+the origin: the broker reads bodies whole, which would undo the bounded
+memory of streaming readers (see jsonstream.py). Upstream failures are re-raised client-side as the
+same requests exception classes, so callers' retry logic is unchanged.
+
+    start_broker()                        # first step of the job
+    api_request("GET", url, headers=headers, cache_ttl=60)
+    stop_broker()                         # last step (if: always())
+
+The broker also exits on its own after BROKER_IDLE_TIMEOUT seconds
+without a request, so a cancelled job never leaves it running.
+"""
+
+import hashlib
+import http.cookiejar
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .state import SharedState, state_dir
+from .tracing import count_api_call
+from .wait import WaitTimeout, wait_until
+
+BROKER_SOCKET_NAME = "api-broker.sock"
+BROKER_STATE_NAME = "api-broker.json"
+BROKER_LOG_NAME = "api-broker.log"
+BROKER_IDLE_TIMEOUT = 900
+BROKER_START_TIMEOUT = 10
+BROKER_POOL_SIZE = 16  # connections kept per origin
+BROKER_CACHE_MAX_ENTRIES = 256
+BROKER_CONTROL_TIMEOUT = 5  # ping/stop round trip
+BROKER_TIMEOUT_MARGIN = 5  # added to the upstream timeout for the socket read
+
+OP_REQUEST = "request"
+OP_PING = "ping"
+OP_STOP = "stop"
+
+# Upstream exception classes re-raised client-side, most specific first
+_FORWARDED_ERRORS = (
+    requests.ConnectTimeout,
+    requests.ReadTimeout,
+    requests.Timeout,
+    requests.exceptions.SSLError,
+    requests.ConnectionError,
+    requests.RequestException,
+)
+
+# Describe the body as sent over the socket (already decoded by requests)
+_DROPPED_RESPONSE_HEADERS = ("content-encoding", "transfer-encoding", "content-length", "connection")
+
+# Socket paths that refused a connection in this process (stale socket file)
+_unavailable: set[str] = set()
+
+
+class BrokerError(Exception):
+    """The broker could not be reached or gave an invalid reply."""
+
+
+@dataclass
+class BrokerStats:
+    """Counters reported when the broker stops."""
+
+    requests: int = 0
+    upstream: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+    origins: int = 0
+    uptime: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def broker_socket() -> Path:
+    """Socket path of this job's broker."""
+    return state_dir() / BROKER_SOCKET_NAME
+
+
+def broker_enabled() -> bool:
+    """Whether clients may use a running broker (DOKPLOY_BROKER=false opts out)."""
+    return os.environ.get("DOKPLOY_BROKER", "true").lower() != "false"
+
+
+# =============================================================================
+# Wire format: one JSON header line, then exactly header["length"] body bytes
+# =============================================================================
+
+
+def _send_frame(sock_file: Any, header: dict[str, Any], body: bytes = b"") -> None:
+    sock_file.write(json.dumps({**header, "length": len(body)}).encode() + b"\n")
+    if body:
+        sock_file.write(body)
+    sock_file.flush()
+
+
+def _read_frame(sock_file: Any) -> tuple[dict[str, Any], bytes]:
+    line = sock_file.readline()
+    if not line:
+        raise BrokerError("Connection closed before a reply")
+    try:
+        header = json.loads(line)
+    except ValueError as e:
+        raise BrokerError(f"Invalid broker frame: {e}") from e
+    length = int(header.get("length", 0))
+    body = sock_file.read(length) if length else b""
+    if len(body) != length:
+        raise BrokerError(f"Truncated broker frame ({len(body)}/{length} bytes)")
+    return header, body
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    broker: "ApiBroker"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One request per connection (connecting to a Unix socket is cheap)."""
+
+    server: _Server
+
+    def handle(self) -> None:
+        try:
+            header, body = _read_frame(self.rfile)
+        except BrokerError:
+            return
+        reply, payload = self.server.broker.dispatch(header, body)
+        try:
+            _send_frame(self.wfile, reply, payload)
+        except OSError:
+            pass  # client went away (e.g. its step was cancelled)
+
+
+class ApiBroker:
+    """Serve HTTP requests for the job's steps over a Unix socket.
+
+    Usage:
+        stats = ApiBroker(broker_socket()).serve()  # blocks until stopped or idle
+    """
+
+    def __init__(
+        self,
+        socket_path: str | Path,
+        idle_timeout: float = BROKER_IDLE_TIMEOUT,
+        pool_size: int = BROKER_POOL_SIZE,
+        cache_entries: int = BROKER_CACHE_MAX_ENTRIES,
+    ):
+        """Initialize broker.
+
+        Args:
+            socket_path: Unix socket to listen on (a stale file is replaced)
+            idle_timeout: Seconds without a request before the broker exits
+            pool_size: Connections kept per origin
+            cache_entries: Cached responses kept (least recently used dropped first)
+        """
+        self.socket_path = Path(socket_path)
+        self.idle_timeout = idle_timeout
+        self.pool_size = pool_size
+        self.cache_entries = cache_entries
+        self.stats = BrokerStats()
+        self._sessions: dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        # key -> (origin, expires_at, reply header, body)
+        self._cache: OrderedDict[str, tuple[str, float, dict[str, Any], bytes]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._started = self._last_activity = time.monotonic()
+
+    def serve(self) -> BrokerStats:
+        """Listen until stopped (OP_STOP) or idle, then remove the socket.
+
+        Returns:
+            Counters for the broker's lifetime
+        """
+        self.socket_path.unlink(missing_ok=True)
+        previous_umask = os.umask(0o077)  # socket readable by the runner user only
+        try:
+            server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(previous_umask)
+        server.broker = self
+
+        thread = threading.Thread(target=server.serve_forever, name="api-broker", daemon=True)
+        thread.start()
+        try:
+            while not self._stopped.wait(timeout=1.0):
+                if time.monotonic() - self._last_activity > self.idle_timeout:
+                    print(f"API broker idle for {self.idle_timeout:.0f}s, stopping")
+                    break
+        finally:
+            server.shutdown()
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            for session in self._sessions.values():
+                session.close()
+
+        self.stats.origins = len(self._sessions)
+        self.stats.uptime = time.monotonic() - self._started
+        return self.stats
+
+    def dispatch(self, header: dict[str, Any], body: bytes) -> tuple[dict[str, Any], bytes]:
+        """Handle one frame; never raises (errors are returned to the client)."""
+        self._last_activity = time.monotonic()
+        op = header.get("op", OP_REQUEST)
+        if op == OP_PING:
+            return {"ok": True, "pid": os.getpid()}, b""
+        if op == OP_STOP:
+            self.stats.origins = len(self._sessions)
+            self.stats.uptime = time.monotonic() - self._started
+            self._stopped.set()
+            return {"ok": True, "stats": self.stats.to_dict()}, b""
+
+        self.stats.requests += 1
+        try:
+            return self._forward(header, body)
+        except Exception as e:  # noqa: BLE001 - reported to the client, the broker keeps serving
+            self.stats.errors += 1
+            kind = next((cls.__name__ for cls in _FORWARDED_ERRORS if isinstance(e, cls)), "RequestException")
+            return {"error": str(e), "kind": kind}, b""
+
+    def _session(self, origin: str) -> requests.Session:
+        with self._sessions_lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[origin] = session
+            return session
+
+    def _forward(self, header: dict[str, Any], body: bytes) -> tuple[dict[str, Any], bytes]:
+        method = str(header["method"]).upper()
+        url = str(header["url"])
+        headers = header.get("headers") or {}
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        cache_ttl = float(header.get("cache_ttl") or 0)
+
+        key = ""
+        if method == "GET" and cache_ttl > 0:
+            key = _cache_key(method, url, headers)
+            cached = self._cache_get(key)
+            if cached:
+                self.stats.cache_hits += 1
+                return {**cached[0], "cached": True}, cached[1]
+        elif method not in ("GET", "HEAD", "OPTIONS"):
+            self._invalidate(origin)
+
+        timeout = header.get("timeout")
+        self.stats.upstream += 1
+        response = self._session(origin).request(
+            method,
+            url,
+            headers=headers,
+            data=body or None,
+            timeout=tuple(timeout) if isinstance(timeout, list) else timeout,
+        )
+        content = response.content
+        response_headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_RESPONSE_HEADERS
+        }
+        reply = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "url": response.url,
+            "headers": response_headers,
+        }
+        if key and response.ok:
+            self._cache_put(key, origin, cache_ttl, reply, content)
+        return reply, content
+
+    def _cache_get(self, key: str) -> tuple[dict[str, Any], bytes] | None:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            _, expires_at, reply, content = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return reply, content
+
+    def _cache_put(self, key: str, origin: str, ttl: float, reply: dict[str, Any], content: bytes) -> None:
+        with self._cache_lock:
+            self._cache[key] = (origin, time.monotonic() + ttl, reply, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def _invalidate(self, origin: str) -> None:
+        with self._cache_lock:
+            for key in [k for k, entry in self._cache.items() if entry[0] == origin]:
+                del self._cache[key]
+
+
+def _cache_key(method: str, url: str, headers: dict[str, str]) -> str:
+    """Key covering the credentials, so tokens never share cached responses."""
+    normalized = sorted((name.lower(), value) for name, value in headers.items())
+    return hashlib.sha256(json.dumps([method, url, normalized]).encode()).hexdigest()
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+
+def _exchange(
+    path: Path,
+    header: dict[str, Any],
+    body: bytes = b"",
+    timeout: float = BROKER_CONTROL_TIMEOUT,
+) -> tuple[dict[str, Any], bytes]:
+    """Send one frame and read the reply.
+
+    Raises:
+        FileNotFoundError, ConnectionRefusedError: If nothing listens on the socket (nothing was sent)
+        BrokerError: If the exchange fails after connecting
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        try:
+            with sock.makefile("rwb") as sock_file:
+                _send_frame(sock_file, header, body)
+                return _read_frame(sock_file)
+        except OSError as e:
+            raise BrokerError(f"API broker exchange failed: {e}") from e
+
+
+def _read_timeout(timeout: Any) -> float:
+    if isinstance(timeout, (tuple, list)):
+        return float(sum(t or 0 for t in timeout))
+    return float(timeout or 0)
+
+
+def api_request(
+    method: str,
+    url: str,
+    headers: dict[str, str] | None = None,
+    params: dict[str, Any] | None = None,
+    json: Any = None,
+    data: Any = None,
+    timeout: Any = None,
+    stream: bool = False,
+    cache_ttl: float = 0,
+) -> requests.Response:
+    """requests.request() through the job's broker when one is running.
+
+    Args:
+        method, url, headers, params, json, data, timeout, stream: As for requests.request()
+        cache_ttl: Seconds a successful GET may be served from the broker's cache (0: never;
+            ignored with stream=True, which bypasses the broker)
+
+    Returns:
+        The response (fully read when it came from the broker)
+
+    Raises:
+        requests.RequestException: On network errors, as with requests.request()
+    """
+    count_api_call()
+    path = broker_socket()
+    if not stream and broker_enabled() and str(path) not in _unavailable and path.exists():
+        prepared = requests.Request(method, url, headers=headers, params=params, json=json, data=data).prepare()
+        header = {
+            "op": OP_REQUEST,
+            "method": prepared.method,
+            "url": prepared.url,
+            "headers": dict(prepared.headers),
+            "timeout": list(timeout) if isinstance(timeout, tuple) else timeout,
+            "cache_ttl": cache_ttl,
+        }
+        body = prepared.body.encode() if isinstance(prepared.body, str) else prepared.body or b""
+        try:
+            reply, content = _exchange(path, header, body, timeout=_read_timeout(timeout) + BROKER_TIMEOUT_MARGIN)
+        except (FileNotFoundError, ConnectionRefusedError):
+            _unavailable.add(str(path))  # stale socket: the request was never sent
+        except BrokerError as e:
+            # The upstream call may have been made; surface it like a dropped connection
+            raise requests.ConnectionError(str(e), request=prepared) from e
+        else:
+            return _response(reply, content, prepared)
+
+    return requests.request(
+        method, url, headers=headers, params=params, json=json, data=data, timeout=timeout, stream=stream
+    )
+
+
+def _response(reply: dict[str, Any], content: bytes, prepared: requests.PreparedRequest) -> requests.Response:
+    """Rebuild a requests.Response from a broker reply (or raise its upstream error)."""
+    if "error" in reply:
+        error_cls = next(
+            (cls for cls in _FORWARDED_ERRORS if cls.__name__ == reply.get("kind")), requests.RequestException
+        )
+        raise error_cls(reply["error"], request=prepared)
+
+    response = requests.Response()
+    response.status_code = int(reply["status"])
+    response.reason = reply.get("reason", "")
+    response.url = reply.get("url", prepared.url)
+    response.headers = CaseInsensitiveDict(reply.get("headers") or {})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.request = prepared
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+def ping_broker(path: Path | None = None) -> int | None:
+    """PID of the broker listening on path (default: this job's socket), or None."""
+    try:
+        reply, _ = _exchange(path or broker_socket(), {"op": OP_PING})
+    except (OSError, BrokerError):
+        return None
+    return reply.get("pid")
+
+
+def start_broker(
+    idle_timeout: float = BROKER_IDLE_TIMEOUT,
+    timeout: float = BROKER_START_TIMEOUT,
+) -> int:
+    """Start this job's broker unless one is already answering.
+
+    Safe to call from concurrent steps: starting is serialized by the
+    broker's state file lock. The broker is detached from the calling step
+    and logs to BROKER_LOG_NAME in the state dir.
+
+    Returns:
+        PID of the running broker
+
+    Raises:
+        BrokerError: If the broker does not answer within timeout
+    """
+    path = broker_socket()
+    with SharedState(state_dir() / BROKER_STATE_NAME).locked() as state:
+        pid = ping_broker(path)
+        if pid:
+            return pid
+
+        with open(state_dir() / BROKER_LOG_NAME, "ab") as log:
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    f"import sys; from {__name__} import main; sys.exit(main(sys.argv[1:]))",
+                    "--socket",
+                    str(path),
+                    "--idle-timeout",
+                    str(idle_timeout),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,  # outlives the step that started it
+            )
+        try:
+            pid = wait_until(lambda: ping_broker(path), timeout=timeout, name="API broker").value
+        except WaitTimeout as e:
+            process.kill()
+            raise BrokerError(f"API broker did not start within {timeout:.0f}s (see {BROKER_LOG_NAME})") from e
+
+        state.update({"pid": pid, "socket": str(path), "started_at": time.time()})
+        _unavailable.discard(str(path))
+        return pid
+
+
+def stop_broker() -> BrokerStats | None:
+    """Stop this job's broker.
+
+    Returns:
+        The broker's counters, or None if no broker was running
+    """
+    try:
+        reply, _ = _exchange(broker_socket(), {"op": OP_STOP})
+    except (OSError, BrokerError):
+        return None
+    return BrokerStats(**reply.get("stats", {}))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a broker in the foreground (what start_broker() spawns)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve API requests for the steps of one job")
+    parser.add_argument("--socket", default=str(broker_socket()))
+    parser.add_argument("--idle-timeout", type=float, default=BROKER_IDLE_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    print(f"API broker {os.getpid()} listening on {args.socket}", flush=True)
+    stats = ApiBroker(args.socket, idle_timeout=args.idle_timeout).serve()
+    print(f"API broker stopped: {json.dumps(stats.to_dict())}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Layered dependency cache keys for JavaScript/Rust workspaces.
+
+smart-cache used to key on the root lockfiles only, so in a pnpm/npm/yarn
+workspace any lockfile change was a full miss. compute_cache_keys()
+discovers the workspace packages, hashes each package's declared
+dependencies in parallel and builds a key from three layers:
+
+    {base}-{global}-{workspace}-{lock}
+
+- global: toolchain files (.nvmrc, .npmrc, pnpm-workspace.yaml, ...) and
+  the root package.json's dependency/override fields
+- workspace: the dependency set of every workspace package
+- lock: the lockfile contents (exact resolution)
+
+The restore keys drop layers from the right, so a lockfile-only change
+restores the cache of the same dependency sets, and a change in one
+package still restores a cache built with the same toolchain. Package
+granularity lives in the workspace layer (one hash over every package's
+dependency set): the cache holds the whole install, so there is no
+per-package cache to restore.
+
+    keys = compute_cache_keys("deps-Linux", ".")
+    print(keys.key, keys.restore_keys)
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+CACHE_KEY_MAX_WORKERS = 8
+KEY_HASH_LENGTH = 16
+
+LOCKFILES = ("pnpm-lock.yaml", "package-lock.json", "yarn.lock", "bun.lockb", "Cargo.lock")
+
+# Root files that change what an install produces
+TOOLCHAIN_FILES = (
+    ".nvmrc",
+    ".node-version",
+    ".npmrc",
+    ".yarnrc.yml",
+    "pnpm-workspace.yaml",
+    "rust-toolchain",
+    "rust-toolchain.toml",
+)
+
+PACKAGE_JSON = "package.json"
+PNPM_WORKSPACE = "pnpm-workspace.yaml"
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+ROOT_FIELDS = (*DEPENDENCY_FIELDS, "packageManager", "engines", "overrides", "resolutions", "pnpm")
+
+# Never treated as workspace packages
+SKIPPED_DIRS = ("node_modules", ".git")
+
+
+@dataclass
+class WorkspacePackage:
+    """A workspace package and the hash of its declared dependencies."""
+
+    path: str  # relative to the workspace root
+    name: str
+    dependency_hash: str
+
+
+@dataclass
+class CacheKeys:
+    """Primary key, restore-key fallbacks and the layers they were built from."""
+
+    base: str
+    layers: dict[str, str]  # global / workspace / lock -> short hash
+    packages: list[WorkspacePackage] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return "-".join([self.base, *self.layers.values()])
+
+    @property
+    def restore_keys(self) -> list[str]:
+        """Most to least specific: all layers but the last, ..., the base alone."""
+        values = list(self.layers.values())
+        prefixes = ["-".join([self.base, *values[:i]]) + "-" for i in range(len(values) - 1, 0, -1)]
+        return [*prefixes, self.base]
+
+
+def _short(digest: Any) -> str:
+    return digest.hexdigest()[:KEY_HASH_LENGTH]
+
+
+def _read_json(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# =============================================================================
+# Workspace discovery
+# =============================================================================
+
+
+def _pnpm_patterns(text: str) -> list[str]:
+    """The `packages:` list of pnpm-workspace.yaml (block or flow style)."""
+    patterns: list[str] = []
+    in_packages = False
+    for line in text.splitlines():
+        stripped = line.split("#", 1)[0].rstrip()
+        if not stripped:
+            continue
+        if not line[0].isspace():
+            in_packages = stripped.startswith("packages:")
+            inline = stripped[len("packages:") :].strip() if in_packages else ""
+            if inline.startswith("["):
+                patterns += [p.strip().strip("'\"") for p in inline.strip("[]").split(",") if p.strip()]
+                in_packages = False
+            continue
+        item = stripped.strip()
+        if in_packages and item.startswith("-"):
+            patterns.append(item[1:].strip().strip("'\""))
+    return patterns
+
+
+def workspace_patterns(root: str | Path) -> list[str]:
+    """Workspace globs from pnpm-workspace.yaml or package.json "workspaces"."""
+    root = Path(root)
+    pnpm_file = root / PNPM_WORKSPACE
+    if pnpm_file.is_file():
+        return _pnpm_patterns(pnpm_file.read_text())
+
+    workspaces = _read_json(root / PACKAGE_JSON).get("workspaces", [])
+    if isinstance(workspaces, dict):  # yarn: {"packages": [...], "nohoist": [...]}
+        workspaces = workspaces.get("packages", [])
+    return [p for p in workspaces if isinstance(p, str)]
+
+
+def discover_packages(root: str | Path) -> list[str]:
+    """Relative paths of workspace packages (directories with a package.json), sorted.
+
+    "!pattern" entries exclude matching packages; the root is not included.
+    """
+    root = Path(root)
+    patterns = workspace_patterns(root)
+    includes = [p.rstrip("/") for p in patterns if not p.startswith("!")]
+    excludes = [p[1:].rstrip("/") for p in patterns if p.startswith("!")]
+
+    found = set()
+    for pattern in includes:
+        for path in root.glob(pattern):
+            rel = path.relative_to(root).as_posix()
+            if (
+                path.is_dir()
+                and (path / PACKAGE_JSON).is_file()
+                and not any(part in SKIPPED_DIRS for part in Path(rel).parts)
+                and not any(fnmatch(rel, exclude) for exclude in excludes)
+            ):
+                found.add(rel)
+    found.discard(".")
+    return sorted(found)
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+
+def _package(root: Path, rel: str) -> WorkspacePackage:
+    manifest = _read_json(root / rel / PACKAGE_JSON)
+    dependencies = {name: manifest.get(name, {}) for name in DEPENDENCY_FIELDS}
+    digest = hashlib.sha256(json.dumps(dependencies, sort_keys=True).encode())
+    return WorkspacePackage(rel, str(manifest.get("name", "")), _short(digest))
+
+
+def compute_cache_keys(
+    base: str,
+    root: str | Path = ".",
+    max_workers: int = CACHE_KEY_MAX_WORKERS,
+) -> CacheKeys:
+    """Build layered cache keys for the workspace at root.
+
+    Args:
+        base: Key prefix (e.g. "deps-Linux")
+        root: Workspace root (where the lockfile lives)
+        max_workers: Files hashed at once
+
+    Returns:
+        CacheKeys with global, workspace and lock layers
+    """
+    root = Path(root)
+    toolchain = [root / name for name in TOOLCHAIN_FILES if (root / name).is_file()]
+    lockfiles = [root / name for name in LOCKFILES if (root / name).is_file()]
+    package_paths = discover_packages(root)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cachekey") as executor:
+        file_hashes = dict(zip(toolchain + lockfiles, executor.map(_file_hash, toolchain + lockfiles)))
+        packages = list(executor.map(lambda rel: _package(root, rel), package_paths))
+
+    root_manifest = _read_json(root / PACKAGE_JSON)
+    global_digest = hashlib.sha256()
+    for path in toolchain:
+        global_digest.update(f"{path.name}:{file_hashes[path]}\n".encode())
+    root_fields = {name: root_manifest[name] for name in ROOT_FIELDS if name in root_manifest}
+    global_digest.update(json.dumps(root_fields, sort_keys=True).encode())
+
+    workspace_digest = hashlib.sha256()
+    for package in packages:
+        workspace_digest.update(f"{package.path}:{package.name}:{package.dependency_hash}\n".encode())
+
+    lock_digest = hashlib.sha256()
+    for path in lockfiles:
+        lock_digest.update(f"{path.name}:{file_hashes[path]}\n".encode())
+
+    return CacheKeys(
+        base=base,
+        layers={
+            "global": _short(global_digest),
+            "workspace": _short(workspace_digest),
+            "lock": _short(lock_digest),
+        },
+        packages=packages,
+    )
@@ -1,11 +1,33 @@
 """Dokploy API client with consistent error handling and request patterns."""
 
 import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+from email.utils import parsedate_to_datetime
 from typing import Any, Literal, TypedDict
 
 import requests
 from requests.exceptions import RequestException
 
+from . import jsonstream
+from .breaker import CircuitBreaker, CircuitOpenError
+from .broker import api_request
+from .constants import (
+    CONNECT_TIMEOUT,
+    DEFAULT_RETRY_AFTER,
+    Endpoints,
+    HEADER_RETRY_AFTER,
+    HTTP_INTERNAL_ERROR,
+    HTTP_SERVICE_UNAVAILABLE,
+    HTTP_TOO_MANY_REQUESTS,
+    LOOKUP_CACHE_TTL,
+    MAX_RATE_LIMIT_RETRIES,
+    TRANSIENT_RETRIES,
+    TRANSIENT_RETRY_DELAY,
+    RequestPriority,
+)
+from .ratelimit import RateLimiter, RateLimitTimeout
+
 
 class ServerUpdatePayload(TypedDict):
     """Required payload for Dokploy server.update API.
@@ -33,14 +55,62 @@ class DokployError(Exception):
         self.response_text = response_text
 
 
-class DokployAuthError(DokployError):
+class DokployTransientError(DokployError):
+    """Failure that may succeed on retry (network error, timeout, 5xx, 429)."""
+
+
+class DokployPermanentError(DokployError):
+    """Failure that will not go away on retry (4xx, invalid response)."""
+
+
+class DokployUnavailableError(DokployTransientError):
+    """Dokploy is considered down; the call was rejected by the circuit breaker."""
+
+    def __init__(self, message: str, retry_in: float | None = None):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class DokployAuthError(DokployPermanentError):
     """Authentication failed."""
 
 
-class DokployNotFoundError(DokployError):
+class DokployNotFoundError(DokployPermanentError):
     """Resource not found."""
 
 
+class DokployRateLimitError(DokployTransientError):
+    """Rate limited by Dokploy (429) or no local request slot available."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        response_text: str | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message, status_code=status_code, response_text=response_text)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date).
+
+    Returns:
+        Seconds to wait (never negative), or None if absent/unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class DokployClient:
     """HTTP client for Dokploy API with consistent error handling.
 
@@ -54,22 +124,53 @@ class DokployClient:
 
         # POST request
         result = client.post("/api/project.create", json={"name": "my-project"})
+
+    Requests go through a runner-wide RateLimiter (see ratelimit.py) when one
+    is configured, tagged with the client's priority so production calls are
+    served ahead of development and preview calls.
+
+    For large list responses, iter_items()/find_first() parse the body
+    incrementally and build only the selected items and fields.
+
+    Failures are classified as DokployTransientError or DokployPermanentError.
+    Connection errors and 5xx feed a runner-wide CircuitBreaker (see
+    breaker.py): once open, calls fail immediately with DokployUnavailableError
+    instead of waiting for their timeout.
+
+    When the job runs an API broker (see broker.py), calls go through its
+    pooled connections, and the server, SSH key and domain listings are
+    answered from its job-wide cache (LOOKUP_CACHE_TTL; any POST through the
+    broker drops the cached responses). Streamed reads (iter_items) bypass it.
     """
 
     DEFAULT_TIMEOUT = 30
     DEPLOY_TIMEOUT = 60
 
-    def __init__(self, url: str, token: str, timeout: int | None = None):
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        timeout: int | None = None,
+        priority: RequestPriority = RequestPriority.PREVIEW,
+        limiter: RateLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         """Initialize Dokploy client.
 
         Args:
             url: Dokploy instance URL (trailing slash will be stripped)
             token: Bearer token for authentication
             timeout: Request timeout in seconds (default: 30, configurable via DOKPLOY_TIMEOUT env var)
+            priority: Priority of this client's calls in the shared rate limiter
+            limiter: Shared rate limiter (None disables client-side limiting)
+            breaker: Shared circuit breaker (None disables fail-fast)
         """
         self.url = url.rstrip("/")
         self.token = token
         self.timeout = timeout or int(os.environ.get("DOKPLOY_TIMEOUT", str(self.DEFAULT_TIMEOUT)))
+        self.priority = priority
+        self.limiter = limiter
+        self.breaker = breaker
 
     @classmethod
     def from_env(cls) -> "DokployClient":
@@ -81,6 +182,9 @@ class DokployClient:
 
         Optional env vars:
             DOKPLOY_TIMEOUT: Request timeout in seconds (default: 30)
+            DOKPLOY_PRIORITY: Environment name used as call priority (default: lowest)
+            DOKPLOY_RATE_LIMIT, DOKPLOY_RATE_BURST, DOKPLOY_MAX_CONCURRENCY: see RateLimiter.from_env()
+            DOKPLOY_BREAKER_THRESHOLD, DOKPLOY_BREAKER_COOLDOWN: see CircuitBreaker.for_url()
         """
         url = os.environ.get("DOKPLOY_URL")
         token = os.environ.get("DOKPLOY_TOKEN")
@@ -90,7 +194,13 @@ class DokployClient:
         if not token:
             raise ValueError("DOKPLOY_TOKEN environment variable is required")
 
-        return cls(url=url, token=token)
+        return cls(
+            url=url,
+            token=token,
+            priority=RequestPriority.from_environment(os.environ.get("DOKPLOY_PRIORITY", "")),
+            limiter=RateLimiter.from_env(),
+            breaker=CircuitBreaker.for_url(url),
+        )
 
     @property
     def _headers(self) -> dict[str, str]:
@@ -113,7 +223,9 @@ class DokployClient:
         Raises:
             DokployAuthError: On 401 status
             DokployNotFoundError: On 404 status
-            DokployError: On other non-2xx status codes (if raise_for_status=True)
+            DokployRateLimitError: On 429 status
+            DokployTransientError: On 5xx status codes (if raise_for_status=True)
+            DokployPermanentError: On other non-2xx status codes (if raise_for_status=True)
         """
         if response.status_code == 401:
             raise DokployAuthError(
@@ -129,8 +241,17 @@ class DokployClient:
                 response_text=response.text,
             )
 
+        if response.status_code == HTTP_TOO_MANY_REQUESTS:
+            raise DokployRateLimitError(
+                "Rate limited by Dokploy",
+                status_code=HTTP_TOO_MANY_REQUESTS,
+                response_text=response.text,
+                retry_after=parse_retry_after(response.headers.get(HEADER_RETRY_AFTER)),
+            )
+
         if raise_for_status and not response.ok:
-            raise DokployError(
+            error_cls = DokployTransientError if response.status_code >= HTTP_INTERNAL_ERROR else DokployPermanentError
+            raise error_cls(
                 f"API request failed: {response.status_code}",
                 status_code=response.status_code,
                 response_text=response.text,
@@ -138,12 +259,151 @@ class DokployClient:
 
         return response
 
+    @staticmethod
+    def _json(response: requests.Response) -> dict[str, Any] | list[Any]:
+        """Decode a JSON body, treating an empty body as an empty object."""
+        if not response.text:
+            return {}
+        try:
+            return jsonstream.loads(response.content)
+        except ValueError as e:
+            raise DokployPermanentError(
+                f"Invalid JSON response: {e}",
+                status_code=response.status_code,
+                response_text=response.text,
+            ) from e
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        timeout: int | None = None,
+        raise_for_status: bool = True,
+        stream: bool = False,
+        cache_ttl: float = 0,
+    ) -> requests.Response:
+        """Send a request with rate limiting, circuit breaking and retries.
+
+        - 429 (or 503 carrying Retry-After) blocks every process sharing the
+          limiter for the advertised delay, then retries up to
+          MAX_RATE_LIMIT_RETRIES times.
+        - Connection errors are retried up to TRANSIENT_RETRIES times with
+          exponential backoff. Read timeouts and 5xx are only retried for GET,
+          since a POST may already have been applied.
+
+        Raises:
+            DokployUnavailableError: If the circuit breaker is open
+            DokployRateLimitError: If still rate limited after all retries
+            DokployTransientError: On network errors, timeouts and 5xx
+            DokployPermanentError: On other API errors
+        """
+        throttled_attempts = 0
+        transient_attempts = 0
+        while True:
+            try:
+                response = self._send(
+                    method, endpoint, params=params, json=json, timeout=timeout, stream=stream, cache_ttl=cache_ttl
+                )
+            except CircuitOpenError as e:
+                raise DokployUnavailableError(
+                    f"Dokploy unavailable, failing fast ({e}; retry in {e.retry_in:.0f}s)",
+                    retry_in=e.retry_in,
+                ) from e
+            except RateLimitTimeout as e:
+                raise DokployRateLimitError(str(e)) from e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # ConnectTimeout is a ConnectionError: the request never reached the server
+                retryable = isinstance(e, requests.ConnectionError) or method == "GET"
+                if retryable and transient_attempts < TRANSIENT_RETRIES:
+                    self._backoff(endpoint, transient_attempts, type(e).__name__)
+                    transient_attempts += 1
+                    continue
+                raise DokployTransientError(f"Request failed: {e}") from e
+            except RequestException as e:
+                raise DokployPermanentError(f"Request failed: {e}") from e
+
+            retry_after = parse_retry_after(response.headers.get(HEADER_RETRY_AFTER))
+            throttled = response.status_code == HTTP_TOO_MANY_REQUESTS or (
+                response.status_code == HTTP_SERVICE_UNAVAILABLE and retry_after is not None
+            )
+            if throttled and throttled_attempts < MAX_RATE_LIMIT_RETRIES:
+                delay = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER * (2**throttled_attempts)
+                print(f"Dokploy throttled {endpoint} ({response.status_code}), retrying in {delay:.1f}s")
+                if self.limiter:
+                    self.limiter.block_for(delay)
+                else:
+                    time.sleep(delay)
+                throttled_attempts += 1
+                continue
+
+            server_error = response.status_code >= HTTP_INTERNAL_ERROR and not throttled
+            if server_error and method == "GET" and transient_attempts < TRANSIENT_RETRIES:
+                self._backoff(endpoint, transient_attempts, f"HTTP {response.status_code}")
+                transient_attempts += 1
+                continue
+
+            return self._handle_response(response, raise_for_status=raise_for_status)
+
+    @staticmethod
+    def _backoff(endpoint: str, attempt: int, reason: str) -> None:
+        """Sleep before retrying a transient failure."""
+        delay = TRANSIENT_RETRY_DELAY * (2**attempt)
+        print(f"Transient failure on {endpoint} ({reason}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        timeout: int | None = None,
+        stream: bool = False,
+        cache_ttl: float = 0,
+    ) -> requests.Response:
+        """Perform one HTTP call through the breaker, holding a limiter slot.
+
+        Connection errors, timeouts and 5xx count as breaker failures; any
+        other response proves the server is alive and closes the circuit.
+        """
+        if self.breaker:
+            self.breaker.before_call()
+
+        kwargs: dict[str, Any] = {
+            "headers": self._headers,
+            "params": params,
+            "json": json,
+            "timeout": (CONNECT_TIMEOUT, timeout or self.timeout),
+            "stream": stream,
+            "cache_ttl": cache_ttl,
+        }
+        try:
+            if self.limiter:
+                with self.limiter.slot(self.priority):
+                    response = api_request(method, f"{self.url}{endpoint}", **kwargs)
+            else:
+                response = api_request(method, f"{self.url}{endpoint}", **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if self.breaker:
+                self.breaker.record_failure()
+            raise
+
+        if self.breaker:
+            if response.status_code >= HTTP_INTERNAL_ERROR:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        return response
+
     def get(
         self,
         endpoint: str,
         params: dict[str, Any] | None = None,
         timeout: int | None = None,
         raise_for_status: bool = True,
+        cache_ttl: float = 0,
     ) -> dict[str, Any] | list[Any]:
         """Make GET request to Dokploy API.
 
@@ -152,6 +412,7 @@ class DokployClient:
             params: Query parameters
             timeout: Override default timeout
             raise_for_status: Whether to raise on non-2xx status codes
+            cache_ttl: Seconds the API broker may answer from its cache (0: always fetch)
 
         Returns:
             JSON response data
@@ -160,17 +421,10 @@ class DokployClient:
             DokployError: On API errors
             RequestException: On network errors
         """
-        try:
-            response = requests.get(
-                f"{self.url}{endpoint}",
-                headers=self._headers,
-                params=params,
-                timeout=timeout or self.timeout,
-            )
-            self._handle_response(response, raise_for_status=raise_for_status)
-            return response.json() if response.text else {}
-        except RequestException as e:
-            raise DokployError(f"Request failed: {e}") from e
+        response = self._request(
+            "GET", endpoint, params=params, timeout=timeout, raise_for_status=raise_for_status, cache_ttl=cache_ttl
+        )
+        return self._json(response)
 
     def post(
         self,
@@ -194,17 +448,58 @@ class DokployClient:
             DokployError: On API errors
             RequestException: On network errors
         """
+        response = self._request("POST", endpoint, json=json, timeout=timeout, raise_for_status=raise_for_status)
+        return self._json(response)
+
+    def iter_items(
+        self,
+        endpoint: str,
+        prefixes: str | tuple[str, ...] = jsonstream.ROOT_ITEMS,
+        fields: Iterable[str] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout: int | None = None,
+    ) -> Iterator[Any]:
+        """Stream items from a GET response without materializing the body.
+
+        Args:
+            endpoint: API endpoint (e.g., "/api/project.all")
+            prefixes: ijson-style prefix(es) of the items to yield (see jsonstream)
+            fields: Top-level keys to keep from each item (None keeps all)
+            params: Query parameters
+            timeout: Override default timeout
+
+        Returns:
+            Iterator over matching items; the connection is closed when it is exhausted or discarded
+
+        Raises:
+            DokployError: On API errors
+        """
+        response = self._request("GET", endpoint, params=params, timeout=timeout, stream=True)
         try:
-            response = requests.post(
-                f"{self.url}{endpoint}",
-                headers=self._headers,
-                json=json,
-                timeout=timeout or self.timeout,
-            )
-            self._handle_response(response, raise_for_status=raise_for_status)
-            return response.json() if response.text else {}
-        except RequestException as e:
-            raise DokployError(f"Request failed: {e}") from e
+            if response.headers.get("Content-Length") == "0":
+                return
+            yield from jsonstream.iter_items(response.iter_content(jsonstream.CHUNK_SIZE), prefixes, fields)
+        except ValueError as e:
+            raise DokployPermanentError(f"Invalid JSON response: {e}", status_code=response.status_code) from e
+        finally:
+            response.close()
+
+    def find_first(
+        self,
+        endpoint: str,
+        predicate: Callable[[Any], bool],
+        prefixes: str | tuple[str, ...] = jsonstream.ROOT_ITEMS,
+        fields: Iterable[str] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> Any | None:
+        """Return the first streamed item matching the predicate, or None.
+
+        Reading stops at the match, so the rest of the body is never downloaded.
+        """
+        for item in self.iter_items(endpoint, prefixes, fields=fields, params=params):
+            if predicate(item):
+                return item
+        return None
 
     def verify_token(self) -> bool:
         """Verify the current token is valid.
@@ -218,6 +513,166 @@ class DokployClient:
         self.get("/api/project.all")
         return True
 
+    # =========================================================================
+    # Project Lookups (streamed - only ids and names are materialized)
+    # =========================================================================
+
+    def find_project_by_name(self, name: str) -> dict[str, Any] | None:
+        """Find a project by name.
+
+        Args:
+            name: Project name to find
+
+        Returns:
+            Dict with projectId and name if found, None otherwise
+        """
+        return self.find_first(
+            Endpoints.PROJECT_ALL,
+            lambda p: p.get("name") == name,
+            fields=("projectId", "name"),
+        )
+
+    def find_environment_by_name(self, project_id: str, name: str) -> dict[str, Any] | None:
+        """Find an environment of a project by name.
+
+        Returns:
+            Dict with environmentId and name if found, None otherwise
+        """
+        return self.find_first(
+            Endpoints.PROJECT_ONE,
+            lambda e: e.get("name") == name,
+            prefixes="environments.item",
+            fields=("environmentId", "name"),
+            params={"projectId": project_id},
+        )
+
+    def find_application_by_name(self, project_id: str, name: str) -> dict[str, Any] | None:
+        """Find an application of a project (any environment) by name.
+
+        Returns:
+            Dict with applicationId, name and serverId if found, None otherwise
+        """
+        return self.find_first(
+            Endpoints.PROJECT_ONE,
+            lambda a: a.get("name") == name,
+            prefixes=("applications.item", "environments.item.applications.item"),
+            fields=("applicationId", "name", "serverId"),
+            params={"projectId": project_id},
+        )
+
+    def find_compose_by_name(self, project_id: str, name: str) -> dict[str, Any] | None:
+        """Find a compose stack of a project (any environment) by name.
+
+        Returns:
+            Dict with composeId, name, appName and serverId if found, None otherwise
+        """
+        return self.find_first(
+            Endpoints.PROJECT_ONE,
+            lambda c: c.get("name") == name,
+            prefixes=("compose.item", "environments.item.compose.item"),
+            fields=("composeId", "name", "appName", "serverId"),
+            params={"projectId": project_id},
+        )
+
+    # =========================================================================
+    # Application Management
+    # =========================================================================
+
+    def create_application(
+        self,
+        name: str,
+        project_id: str,
+        environment_id: str,
+        server_id: str = "",
+        build_type: str = "dockerfile",
+        description: str = "",
+    ) -> dict[str, Any]:
+        """Create an application.
+
+        Returns:
+            Created application object with applicationId
+        """
+        payload = {
+            "name": name,
+            "projectId": project_id,
+            "environmentId": environment_id,
+            "buildType": build_type,
+        }
+        if description:
+            payload["description"] = description
+        if server_id:
+            payload["serverId"] = server_id
+        result = self.post(Endpoints.APPLICATION_CREATE, json=payload)
+        return result if isinstance(result, dict) else {}
+
+    def deploy_application(self, application_id: str) -> str:
+        """Trigger a deployment.
+
+        Returns:
+            Deployment ID ("" if Dokploy did not return one)
+        """
+        result = self.post(
+            Endpoints.APPLICATION_DEPLOY,
+            json={"applicationId": application_id},
+            timeout=self.DEPLOY_TIMEOUT,
+        )
+        return result.get("deploymentId", "") if isinstance(result, dict) else ""
+
+    def deployments(self, application_id: str = "", compose_id: str = "") -> list[dict[str, Any]]:
+        """Deployments of an application or compose stack (status, logPath, ...).
+
+        Args:
+            application_id: Dokploy application ID
+            compose_id: Dokploy compose ID (instead of application_id)
+
+        Returns:
+            Deployment objects as returned by Dokploy (newest first)
+        """
+        if compose_id:
+            result = self.get(Endpoints.DEPLOYMENT_ALL_BY_COMPOSE, params={"composeId": compose_id})
+        else:
+            result = self.get(Endpoints.DEPLOYMENT_ALL, params={"applicationId": application_id})
+        return result if isinstance(result, list) else []
+
+    def get_application(self, application_id: str) -> dict[str, Any]:
+        """Get the full application object.
+
+        Args:
+            application_id: Dokploy application ID
+
+        Returns:
+            Application object (settings, source, swarm config, ...)
+        """
+        result = self.get(Endpoints.APPLICATION_ONE, params={"applicationId": application_id})
+        return result if isinstance(result, dict) else {}
+
+    def update_application(self, application_id: str, fields: dict[str, Any]) -> None:
+        """Update application settings.
+
+        Only the given fields are changed; Dokploy keeps the others.
+
+        Args:
+            application_id: Dokploy application ID
+            fields: Application fields to set (e.g., {"dockerImage": "..."})
+        """
+        self.post(Endpoints.APPLICATION_UPDATE, json={"applicationId": application_id, **fields})
+
+    def read_traefik_config(self, application_id: str) -> str:
+        """Traefik dynamic config Dokploy generated for the application (YAML, "" if none)."""
+        result = self.get(Endpoints.APPLICATION_READ_TRAEFIK_CONFIG, params={"applicationId": application_id})
+        return result if isinstance(result, str) else ""
+
+    def update_traefik_config(self, application_id: str, traefik_config: str) -> None:
+        """Replace the application's Traefik dynamic config.
+
+        Dokploy rewrites this file when domains change, so callers re-apply
+        their edits after reconciling domains.
+        """
+        self.post(
+            Endpoints.APPLICATION_UPDATE_TRAEFIK_CONFIG,
+            json={"applicationId": application_id, "traefikConfig": traefik_config},
+        )
+
     # =========================================================================
     # Server Management
     # =========================================================================
@@ -228,7 +683,7 @@ class DokployClient:
         Returns:
             List of server objects with serverId, name, ipAddress, etc.
         """
-        result = self.get("/api/server.all")
+        result = self.get("/api/server.all", cache_ttl=LOOKUP_CACHE_TTL)
         return result if isinstance(result, list) else []
 
     def get_server_by_name(self, name: str) -> dict[str, Any] | None:
@@ -322,8 +777,6 @@ class DokployClient:
         Raises:
             ValueError: If existing_server is missing required fields
         """
-        from .constants import Endpoints
-
         # Build complete payload from existing server + overrides
         # Dokploy API requires ALL 8 fields in every update request (apiUpdateServer schema)
         payload: ServerUpdatePayload = {
@@ -359,7 +812,7 @@ class DokployClient:
         Returns:
             List of SSH key objects with sshKeyId, name, etc.
         """
-        result = self.get("/api/sshKey.all")
+        result = self.get("/api/sshKey.all", cache_ttl=LOOKUP_CACHE_TTL)
         return result if isinstance(result, list) else []
 
     def get_ssh_key_by_name(self, name: str) -> dict[str, Any] | None:
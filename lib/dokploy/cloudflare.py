@@ -0,0 +1,193 @@
+"""Cloudflare API client for DNS records.
+
+The bash DNS actions look up the zone and list records with a fresh curl
+per domain. CloudflareClient caches zone IDs per root domain, so a process
+updating many hosts (multi-service deploys, aliases) looks each zone up
+once, and reads all records of a name in one call to resolve type
+conflicts (a CNAME cannot coexist with A/AAAA records).
+
+    cloudflare = CloudflareClient.from_env()
+    cloudflare.upsert_record("app.example.com", "203.0.113.10", proxied=True)
+"""
+
+import os
+import threading
+from typing import Any
+
+import requests
+
+from .broker import api_request
+from .constants import (
+    CLOUDFLARE_API_URL,
+    CONNECT_TIMEOUT,
+    CONTENT_TYPE_JSON,
+    DEFAULT_TIMEOUT,
+    HEADER_AUTHORIZATION,
+    HEADER_CONTENT_TYPE,
+    ZONE_CACHE_TTL,
+)
+from .domain import get_root_domain
+
+# Record types that cannot share a name with a CNAME
+ADDRESS_RECORD_TYPES = ("A", "AAAA")
+
+RECORD_CREATED = "created"
+RECORD_UPDATED = "updated"
+RECORD_UNCHANGED = "unchanged"
+
+
+class CloudflareError(Exception):
+    """Cloudflare API request failed or returned success: false."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CloudflareClient:
+    """Minimal Cloudflare v4 client with a per-process zone cache.
+
+    Thread-safe: several hosts can be upserted concurrently with one client.
+    """
+
+    def __init__(self, token: str, api_url: str = CLOUDFLARE_API_URL, timeout: float = DEFAULT_TIMEOUT):
+        """Initialize client.
+
+        Args:
+            token: API token with Zone:Read and DNS:Edit permissions
+            api_url: API base URL
+            timeout: Read timeout per request in seconds
+        """
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self._zones: dict[str, str] = {}
+        self._zones_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CloudflareClient":
+        """Create client from CLOUDFLARE_API_TOKEN (and optional CLOUDFLARE_API_URL)."""
+        token = os.environ.get("CLOUDFLARE_API_TOKEN")
+        if not token:
+            raise ValueError("CLOUDFLARE_API_TOKEN environment variable is required")
+        return cls(token, os.environ.get("CLOUDFLARE_API_URL") or CLOUDFLARE_API_URL)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        cache_ttl: float = 0,
+    ) -> Any:
+        """Send a request and return the response's "result".
+
+        GETs with a cache_ttl may be answered from the API broker's job-wide cache.
+
+        Raises:
+            CloudflareError: On network errors, HTTP errors or success: false
+        """
+        try:
+            response = api_request(
+                method,
+                f"{self.api_url}{path}",
+                headers={
+                    HEADER_AUTHORIZATION: f"Bearer {self.token}",
+                    HEADER_CONTENT_TYPE: CONTENT_TYPE_JSON,
+                },
+                params=params,
+                json=json,
+                timeout=(CONNECT_TIMEOUT, self.timeout),
+                cache_ttl=cache_ttl,
+            )
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise CloudflareError(f"{method} {path} failed: {e}") from e
+
+        if not response.ok or not body.get("success", False):
+            errors = "; ".join(e.get("message", "") for e in body.get("errors", [])) or f"HTTP {response.status_code}"
+            raise CloudflareError(f"{method} {path} failed: {errors}", status_code=response.status_code)
+        return body.get("result")
+
+    # =========================================================================
+    # Zones
+    # =========================================================================
+
+    def zone_id(self, domain: str) -> str:
+        """Zone ID of the domain's root (cached per root domain, and job-wide by the API broker).
+
+        Raises:
+            CloudflareError: If no zone exists for the root domain
+        """
+        root = get_root_domain(domain.lower())
+        with self._zones_lock:
+            if root in self._zones:
+                return self._zones[root]
+
+        zones = self.request("GET", "/zones", params={"name": root}, cache_ttl=ZONE_CACHE_TTL)
+        if not zones:
+            raise CloudflareError(f"No Cloudflare zone found for {root}")
+
+        with self._zones_lock:
+            self._zones[root] = zones[0]["id"]
+        return zones[0]["id"]
+
+    # =========================================================================
+    # DNS records
+    # =========================================================================
+
+    def dns_records(self, zone_id: str, name: str) -> list[dict[str, Any]]:
+        """All records (any type) with the given name."""
+        result = self.request("GET", f"/zones/{zone_id}/dns_records", params={"name": name, "per_page": 100})
+        return result if isinstance(result, list) else []
+
+    def upsert_record(
+        self,
+        name: str,
+        content: str,
+        record_type: str = "A",
+        proxied: bool = False,
+        ttl: int = 1,
+    ) -> str:
+        """Create or update a record, removing records of a conflicting type.
+
+        Returns:
+            RECORD_CREATED, RECORD_UPDATED or RECORD_UNCHANGED
+
+        Raises:
+            CloudflareError: On API errors
+        """
+        zone_id = self.zone_id(name)
+        records = self.dns_records(zone_id, name)
+
+        if record_type == "CNAME":
+            conflicting = [r for r in records if r.get("type") in ADDRESS_RECORD_TYPES]
+        elif record_type in ADDRESS_RECORD_TYPES:
+            conflicting = [r for r in records if r.get("type") == "CNAME"]
+        else:
+            conflicting = []
+        for record in conflicting:
+            self.request("DELETE", f"/zones/{zone_id}/dns_records/{record['id']}")
+
+        payload = {"type": record_type, "name": name, "content": content, "ttl": ttl, "proxied": proxied}
+        existing = next((r for r in records if r.get("type") == record_type), None)
+        if existing is None:
+            self.request("POST", f"/zones/{zone_id}/dns_records", json=payload)
+            return RECORD_CREATED
+        if all(existing.get(key) == payload[key] for key in ("content", "ttl", "proxied")):
+            return RECORD_UNCHANGED
+        self.request("PUT", f"/zones/{zone_id}/dns_records/{existing['id']}", json=payload)
+        return RECORD_UPDATED
+
+    # =========================================================================
+    # Cache
+    # =========================================================================
+
+    def purge_cache(self, zone_id: str, files: list[str] | None = None, everything: bool = False) -> None:
+        """Purge cached URLs (at most the plan's per-request limit) or everything.
+
+        Raises:
+            CloudflareError: On API errors
+        """
+        payload: dict[str, Any] = {"purge_everything": True} if everything else {"files": files or []}
+        self.request("POST", f"/zones/{zone_id}/purge_cache", json=payload)
@@ -96,3 +96,31 @@ def get_environment_config(
         return environments.get("preview", environments.get("development", {}))
 
     return environments.get(environment, {})
+
+
+def get_domain_aliases(
+    config: dict[str, Any],
+    environment: str,
+) -> list[str]:
+    """Get extra hostnames served alongside the computed domain.
+
+    [environments.<env>] aliases win; otherwise [project] aliases apply to
+    production only (www, apex or legacy domains). Preview environments
+    never inherit aliases.
+
+    Args:
+        config: Merged configuration dict
+        environment: Target environment name
+
+    Returns:
+        Alias hostnames (lowercased, without duplicates)
+    """
+    env_config = config.get("environments", {}).get(environment, {})
+    if "aliases" in env_config:
+        aliases = env_config["aliases"]
+    elif environment == "production":
+        aliases = config.get("project", {}).get("aliases", [])
+    else:
+        aliases = []
+
+    return list(dict.fromkeys(alias.strip().lower() for alias in aliases if alias.strip()))
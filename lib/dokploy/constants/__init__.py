@@ -9,11 +9,21 @@ This package provides centralized constants organized by domain:
 - healthcheck: Health check configuration
 - resources: Memory, CPU limits
 - sablier: Scale-to-zero settings
+- ratelimit: Client-side API rate limiting
+- breaker: Circuit breaker and transient retries
 - http: Headers, status codes
 - api: Dokploy API endpoints
 """
 
 from .api import Endpoints
+from .breaker import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_PROBE_TTL,
+    BREAKER_STATE_FILE,
+    TRANSIENT_RETRIES,
+    TRANSIENT_RETRY_DELAY,
+)
 from .domains import (
     DEV_DOMAIN_PREFIX,
     PREVIEW_DOMAIN_PREFIX,
@@ -24,6 +34,7 @@ from .enums import (
     CertificateType,
     ComposeType,
     Environment,
+    RequestPriority,
     SourceType,
 )
 from .files import (
@@ -41,6 +52,7 @@ from .healthcheck import (
     DEFAULT_HEALTH_RETRIES,
     DEFAULT_HEALTH_START_PERIOD,
     DEFAULT_HEALTH_TIMEOUT,
+    DEFAULT_UPDATE_DELAY,
     HEALTH_SUCCESS_CODES,
 )
 from .http import (
@@ -48,6 +60,9 @@ from .http import (
     HEADER_API_KEY,
     HEADER_AUTHORIZATION,
     HEADER_CONTENT_TYPE,
+    HEADER_RETRY_AFTER,
+    HEADER_ACCEPT,
+    HEADER_CONTENT_DIGEST,
     HTTP_BAD_REQUEST,
     HTTP_CREATED,
     HTTP_FORBIDDEN,
@@ -57,20 +72,39 @@ from .http import (
     HTTP_NO_CONTENT,
     HTTP_NOT_FOUND,
     HTTP_OK,
+    HTTP_SERVICE_UNAVAILABLE,
+    HTTP_TOO_MANY_REQUESTS,
     HTTP_UNAUTHORIZED,
 )
 from .infrastructure import (
+    CLOUDFLARE_API_URL,
+    SLACK_API_URL,
     DEFAULT_APP_PORT,
     DEFAULT_SSH_KEY_NAME,
     DEFAULT_SSH_PORT,
     DEFAULT_SSH_USER,
+    AUTO_SERVER,
     DEV_SERVER,
     PROD_SERVER,
     REGISTRY_HOST,
     REGISTRY_INTERNAL_HOST,
     REGISTRY_PORT,
+    TAILSCALE_API_URL,
+    TAILSCALE_IP_PREFIX,
     TRAEFIK_SERVER,
 )
+from .ratelimit import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RETRY_AFTER,
+    MAX_RATE_LIMIT_RETRIES,
+    RATE_LIMIT_LEASE_TTL,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_POLL_INTERVAL,
+    RATE_LIMIT_STATE_FILE,
+    RATE_LIMIT_WAITER_TTL,
+)
 from .resources import (
     DEFAULT_CPU,
     DEFAULT_CPU_LIMIT,
@@ -85,19 +119,38 @@ from .resources import (
 from .sablier import (
     SABLIER_DEFAULT_THEME,
     SABLIER_IDLE_TIMEOUT,
+    SABLIER_REFRESH_FREQUENCY,
     SABLIER_SESSION_DURATION,
     SABLIER_STARTUP_TIMEOUT,
+    SABLIER_STRATEGY,
+    SABLIER_URL,
 )
 from .timeouts import (
     ADMIN_SETUP_TIMEOUT,
+    CONNECT_TIMEOUT,
     DEFAULT_MAX_ATTEMPTS,
     DEFAULT_RETRY_INTERVAL,
     DEFAULT_TIMEOUT,
     DEPLOY_TIMEOUT,
     DNS_TIMEOUT,
+    LOOKUP_CACHE_TTL,
+    PROBE_BUDGET,
+    ROLLOUT_TIMEOUT,
+    SSH_COMMAND_TIMEOUT,
+    SSH_CONNECT_TIMEOUT,
+    SSH_CONTROL_PERSIST,
     TAILSCALE_TOKEN_TIMEOUT,
     TAILSCALE_WAIT_TIMEOUT,
+    TLS_CACHE_TTL,
+    TLS_PROBE_TIMEOUT,
     VPS_PROVISION_TIMEOUT,
+    WAIT_BACKOFF_FACTOR,
+    WAIT_INITIAL_INTERVAL,
+    WAIT_JITTER,
+    WAIT_MAX_INTERVAL,
+    WARM_BUDGET,
+    WARM_TIMEOUT,
+    ZONE_CACHE_TTL,
 )
 
 __all__ = [
@@ -107,14 +160,20 @@ __all__ = [
     "BuildType",
     "ComposeType",
     "CertificateType",
+    "RequestPriority",
     # API
     "Endpoints",
     # Infrastructure
     "TRAEFIK_SERVER",
     "DEV_SERVER",
+    "AUTO_SERVER",
     "PROD_SERVER",
     "REGISTRY_HOST",
     "REGISTRY_PORT",
+    "TAILSCALE_API_URL",
+    "TAILSCALE_IP_PREFIX",
+    "CLOUDFLARE_API_URL",
+    "SLACK_API_URL",
     "REGISTRY_INTERNAL_HOST",
     "DEFAULT_APP_PORT",
     "DEFAULT_SSH_PORT",
@@ -136,18 +195,35 @@ __all__ = [
     "DEFAULT_TIMEOUT",
     "DEPLOY_TIMEOUT",
     "DNS_TIMEOUT",
+    "CONNECT_TIMEOUT",
     "VPS_PROVISION_TIMEOUT",
     "ADMIN_SETUP_TIMEOUT",
     "DEFAULT_RETRY_INTERVAL",
     "DEFAULT_MAX_ATTEMPTS",
+    "WAIT_INITIAL_INTERVAL",
+    "WAIT_MAX_INTERVAL",
+    "WAIT_BACKOFF_FACTOR",
+    "WAIT_JITTER",
+    "SSH_CONNECT_TIMEOUT",
+    "SSH_CONTROL_PERSIST",
+    "SSH_COMMAND_TIMEOUT",
+    "ROLLOUT_TIMEOUT",
+    "PROBE_BUDGET",
+    "TLS_PROBE_TIMEOUT",
+    "TLS_CACHE_TTL",
+    "WARM_BUDGET",
+    "WARM_TIMEOUT",
     "TAILSCALE_WAIT_TIMEOUT",
     "TAILSCALE_TOKEN_TIMEOUT",
+    "LOOKUP_CACHE_TTL",
+    "ZONE_CACHE_TTL",
     # Health check
     "DEFAULT_HEALTH_PATH",
     "DEFAULT_HEALTH_INTERVAL",
     "DEFAULT_HEALTH_TIMEOUT",
     "DEFAULT_HEALTH_RETRIES",
     "DEFAULT_HEALTH_START_PERIOD",
+    "DEFAULT_UPDATE_DELAY",
     "HEALTH_SUCCESS_CODES",
     # Resources
     "DEFAULT_MEMORY",
@@ -164,10 +240,34 @@ __all__ = [
     "SABLIER_SESSION_DURATION",
     "SABLIER_STARTUP_TIMEOUT",
     "SABLIER_DEFAULT_THEME",
+    "SABLIER_URL",
+    "SABLIER_STRATEGY",
+    "SABLIER_REFRESH_FREQUENCY",
+    # Rate limiting
+    "DEFAULT_RATE_LIMIT",
+    "DEFAULT_RATE_BURST",
+    "DEFAULT_MAX_CONCURRENCY",
+    "RATE_LIMIT_POLL_INTERVAL",
+    "RATE_LIMIT_MAX_WAIT",
+    "RATE_LIMIT_LEASE_TTL",
+    "RATE_LIMIT_WAITER_TTL",
+    "DEFAULT_RETRY_AFTER",
+    "MAX_RATE_LIMIT_RETRIES",
+    "RATE_LIMIT_STATE_FILE",
+    # Circuit breaker
+    "BREAKER_FAILURE_THRESHOLD",
+    "BREAKER_COOLDOWN",
+    "BREAKER_PROBE_TTL",
+    "BREAKER_STATE_FILE",
+    "TRANSIENT_RETRIES",
+    "TRANSIENT_RETRY_DELAY",
     # HTTP
     "HEADER_API_KEY",
     "HEADER_CONTENT_TYPE",
     "HEADER_AUTHORIZATION",
+    "HEADER_RETRY_AFTER",
+    "HEADER_ACCEPT",
+    "HEADER_CONTENT_DIGEST",
     "CONTENT_TYPE_JSON",
     "HTTP_OK",
     "HTTP_CREATED",
@@ -178,5 +278,7 @@ __all__ = [
     "HTTP_UNAUTHORIZED",
     "HTTP_FORBIDDEN",
     "HTTP_NOT_FOUND",
+    "HTTP_TOO_MANY_REQUESTS",
     "HTTP_INTERNAL_ERROR",
+    "HTTP_SERVICE_UNAVAILABLE",
 ]
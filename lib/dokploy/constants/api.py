@@ -16,10 +16,13 @@ class Endpoints:
     ENVIRONMENT_CREATE = "/api/environment.create"
 
     # Applications
+    APPLICATION_ONE = "/api/application.one"
     APPLICATION_CREATE = "/api/application.create"
     APPLICATION_UPDATE = "/api/application.update"
     APPLICATION_DELETE = "/api/application.delete"
     APPLICATION_DEPLOY = "/api/application.deploy"
+    APPLICATION_READ_TRAEFIK_CONFIG = "/api/application.readTraefikConfig"
+    APPLICATION_UPDATE_TRAEFIK_CONFIG = "/api/application.updateTraefikConfig"
 
     # Compose
     COMPOSE_CREATE = "/api/compose.create"
@@ -27,8 +30,14 @@ class Endpoints:
     COMPOSE_DELETE = "/api/compose.delete"
     COMPOSE_DEPLOY = "/api/compose.deploy"
 
+    # Deployments
+    DEPLOYMENT_ALL = "/api/deployment.all"
+    DEPLOYMENT_ALL_BY_COMPOSE = "/api/deployment.allByCompose"
+
     # Domains
     DOMAIN_CREATE = "/api/domain.create"
+    DOMAIN_UPDATE = "/api/domain.update"
+    DOMAIN_DELETE = "/api/domain.delete"
     DOMAIN_BY_COMPOSE_ID = "/api/domain.byComposeId"
     DOMAIN_BY_APPLICATION_ID = "/api/domain.byApplicationId"
 
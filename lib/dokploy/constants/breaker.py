@@ -0,0 +1,11 @@
+"""Circuit breaker and transient-failure retry constants for the Dokploy API."""
+
+# Circuit breaker (shared by every process on a runner)
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive connection/5xx failures before opening
+BREAKER_COOLDOWN = 30  # seconds the circuit stays open before a probe is allowed
+BREAKER_PROBE_TTL = 60  # seconds before a stuck half-open probe is abandoned
+BREAKER_STATE_FILE = "dokploy-breaker-{key}.json"
+
+# Retries for transient failures within a single call
+TRANSIENT_RETRIES = 2
+TRANSIENT_RETRY_DELAY = 1.0  # seconds, doubled on each retry
@@ -1,6 +1,6 @@
 """Enums for Dokploy operations."""
 
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class Environment(str, Enum):
@@ -63,3 +63,31 @@ class CertificateType(str, Enum):
 
     LETSENCRYPT = "letsencrypt"
     NONE = "none"
+
+
+class RequestPriority(IntEnum):
+    """Dokploy API call priority (lower value is served first)."""
+
+    PRODUCTION = 0
+    DEVELOPMENT = 1
+    PREVIEW = 2
+
+    @classmethod
+    def from_environment(cls, value: str) -> "RequestPriority":
+        """Get priority from an environment name, case-insensitive.
+
+        Staging shares the development tier. Unknown or empty values get
+        the lowest priority so they never delay production traffic.
+
+        Args:
+            value: Environment name string (e.g., "production")
+
+        Returns:
+            Matching RequestPriority value
+        """
+        value_lower = value.lower()
+        if value_lower == Environment.PRODUCTION.value:
+            return cls.PRODUCTION
+        if value_lower in (Environment.DEVELOPMENT.value, Environment.STAGING.value):
+            return cls.DEVELOPMENT
+        return cls.PREVIEW
@@ -4,6 +4,9 @@
 HEADER_API_KEY = "x-api-key"
 HEADER_CONTENT_TYPE = "Content-Type"
 HEADER_AUTHORIZATION = "Authorization"
+HEADER_RETRY_AFTER = "Retry-After"
+HEADER_ACCEPT = "Accept"
+HEADER_CONTENT_DIGEST = "Docker-Content-Digest"
 
 # Content types
 CONTENT_TYPE_JSON = "application/json"
@@ -18,4 +21,6 @@ HTTP_BAD_REQUEST = 400
 HTTP_UNAUTHORIZED = 401
 HTTP_FORBIDDEN = 403
 HTTP_NOT_FOUND = 404
+HTTP_TOO_MANY_REQUESTS = 429
 HTTP_INTERNAL_ERROR = 500
+HTTP_SERVICE_UNAVAILABLE = 503
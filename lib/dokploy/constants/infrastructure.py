@@ -4,6 +4,8 @@
 TRAEFIK_SERVER = "admin-dokploy"
 DEV_SERVER = "dev-worker"
 PROD_SERVER = "prod-worker"
+# server = "auto": placed by capacity on [cluster] dev-servers / prod-servers
+AUTO_SERVER = "auto"
 
 # Registry
 REGISTRY_HOST = "registry.nextnode.fr"
@@ -17,3 +19,11 @@ DEFAULT_SSH_PORT = 22
 # SSH
 DEFAULT_SSH_USER = "root"
 DEFAULT_SSH_KEY_NAME = "nextnode-dokploy-ci"
+
+# Tailscale
+TAILSCALE_API_URL = "https://api.tailscale.com/api/v2"
+TAILSCALE_IP_PREFIX = "100."
+
+# Cloudflare
+CLOUDFLARE_API_URL = "https://api.cloudflare.com/client/v4"
+SLACK_API_URL = "https://slack.com/api"
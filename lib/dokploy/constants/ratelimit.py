@@ -0,0 +1,19 @@
+"""Client-side rate limiting constants for the Dokploy API."""
+
+# Token bucket (shared by every process on a runner)
+DEFAULT_RATE_LIMIT = 5.0  # requests per second
+DEFAULT_RATE_BURST = 10  # bucket capacity
+DEFAULT_MAX_CONCURRENCY = 4  # in-flight requests per runner
+
+# Waiting (seconds)
+RATE_LIMIT_POLL_INTERVAL = 0.05
+RATE_LIMIT_MAX_WAIT = 300
+RATE_LIMIT_LEASE_TTL = 120  # in-flight slot reclaimed after this (crashed process)
+RATE_LIMIT_WAITER_TTL = 5  # queued waiter dropped if it stops polling
+
+# 429 / Retry-After handling
+DEFAULT_RETRY_AFTER = 5
+MAX_RATE_LIMIT_RETRIES = 3
+
+# State file shared between processes (placed under RUNNER_TEMP or the system temp dir)
+RATE_LIMIT_STATE_FILE = "dokploy-ratelimit.json"
@@ -4,3 +4,9 @@ SABLIER_IDLE_TIMEOUT = "30m"
 SABLIER_SESSION_DURATION = "30m"
 SABLIER_STARTUP_TIMEOUT = "2m"
 SABLIER_DEFAULT_THEME = "hacker-terminal"
+
+# Sablier server as reached by the Traefik plugin (container on the proxy network)
+SABLIER_URL = "http://sablier:10000"
+# "dynamic" shows the themed loading page, "blocking" holds requests until ready
+SABLIER_STRATEGY = "dynamic"
+SABLIER_REFRESH_FREQUENCY = "5s"
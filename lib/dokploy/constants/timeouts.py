@@ -4,6 +4,7 @@
 DEFAULT_TIMEOUT = 30
 DEPLOY_TIMEOUT = 60
 DNS_TIMEOUT = 30
+CONNECT_TIMEOUT = 5  # TCP/TLS connect; fail fast when a host is unreachable
 
 # Long operations
 VPS_PROVISION_TIMEOUT = 300
@@ -13,6 +14,31 @@ ADMIN_SETUP_TIMEOUT = 600
 DEFAULT_RETRY_INTERVAL = 10
 DEFAULT_MAX_ATTEMPTS = 30
 
+# Adaptive waits (readiness gates)
+WAIT_INITIAL_INTERVAL = 1.0  # first delay; grows by WAIT_BACKOFF_FACTOR up to WAIT_MAX_INTERVAL
+WAIT_MAX_INTERVAL = 15.0
+WAIT_BACKOFF_FACTOR = 2.0
+WAIT_JITTER = 0.2  # ±20% randomization so parallel waiters don't poll in lockstep
+
+# SSH (Swarm manager access)
+SSH_CONNECT_TIMEOUT = 10
+SSH_CONTROL_PERSIST = 300  # seconds the multiplexed master connection stays open when idle
+SSH_COMMAND_TIMEOUT = 120
+ROLLOUT_TIMEOUT = 300  # max wait for a Swarm update/rollback to settle
+PROBE_BUDGET = 30  # total time for a concurrent infrastructure health probe
+
+# Post-deploy cache warming (see warm.py)
+WARM_BUDGET = 120  # total time for warming; URLs not reached are skipped
+WARM_TIMEOUT = 15  # read timeout per request (cold ISR renders can be slow)
+
+# TLS certificate probes (see tlsprobe.py)
+TLS_PROBE_TIMEOUT = 5  # connect + handshake per host
+TLS_CACHE_TTL = 300  # probed certificates are reused by later steps of the job
+
+# API broker response cache (see broker.py)
+LOOKUP_CACHE_TTL = 60  # Dokploy listings; any write through the broker drops them early
+ZONE_CACHE_TTL = 3600  # Cloudflare zone IDs never change during a job
+
 # Tailscale
 TAILSCALE_WAIT_TIMEOUT = 30
 TAILSCALE_TOKEN_TIMEOUT = 3600
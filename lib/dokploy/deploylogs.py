@@ -0,0 +1,240 @@
+"""Follow a Dokploy deployment's build log into the Actions log.
+
+dokploy-deploy-trigger only returns a deploymentId, so a failed build had
+to be investigated in the Dokploy UI. Dokploy writes each deployment's
+log to a file (the deployment's logPath) on the server that runs the
+build. LogFollower tails that file by byte offset over the shared SSH
+connection while the deployment runs:
+
+- each poll reads at most LOG_CHUNK_SIZE bytes from the current offset
+  and writes them out before the next read, so a slow consumer slows the
+  reads down instead of piling data up in memory
+- a full chunk is followed by an immediate read; idle polls back off up
+  to LOG_POLL_MAX_INTERVAL
+- only the last LOG_EXCERPT_LINES lines are kept, for the failure excerpt
+
+    follower = LogFollower(RemoteLogFile(runner, deployment["logPath"]))
+    result = follower.follow(lambda: deployment_status(client, app_id, deployment_id))
+"""
+
+import base64
+import binascii
+import shlex
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from .client import DokployClient
+from .swarm import CommandRunner, SwarmError
+
+LOG_CHUNK_SIZE = 64 * 1024
+LOG_EXCERPT_LINES = 200
+LOG_MAX_LINE_LENGTH = 4096  # longer lines are split (bounds the partial-line buffer)
+LOG_POLL_INTERVAL = 1.0
+LOG_POLL_MAX_INTERVAL = 5.0
+LOG_FOLLOW_TIMEOUT = 1800
+
+DEPLOYMENT_RUNNING = "running"
+DEPLOYMENT_DONE = "done"
+DEPLOYMENT_ERROR = "error"
+DEPLOYMENT_TERMINAL_STATES = (DEPLOYMENT_DONE, DEPLOYMENT_ERROR)
+
+
+class LogSource(Protocol):
+    """Random access to a growing log."""
+
+    def read(self, offset: int, limit: int) -> bytes: ...
+
+
+class RemoteLogFile:
+    """A log file on a remote host, read by byte offset over a CommandRunner.
+
+    The bytes are base64-encoded on the remote side so offsets stay exact
+    regardless of encoding; a missing file reads as empty (not written yet).
+    """
+
+    def __init__(self, runner: CommandRunner, path: str):
+        self.runner = runner
+        self.path = path
+
+    def read(self, offset: int, limit: int) -> bytes:
+        command = f"tail -c +{offset + 1} {shlex.quote(self.path)} 2>/dev/null | head -c {limit} | base64 -w0"
+        result = self.runner.run(command)
+        if not result.ok:
+            raise SwarmError(f"Reading {self.path} failed: {result.stderr.strip()}", result)
+        try:
+            return base64.b64decode(result.stdout.strip())
+        except (binascii.Error, ValueError) as e:
+            raise SwarmError(f"Reading {self.path} returned invalid data: {e}", result) from e
+
+
+@dataclass
+class FollowResult:
+    """Outcome of following a deployment log."""
+
+    status: str
+    bytes_read: int = 0
+    lines: int = 0
+    excerpt: list[str] = field(default_factory=list)
+    timed_out: bool = False
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == DEPLOYMENT_DONE
+
+
+class LogFollower:
+    """Stream a growing log line by line with bounded memory.
+
+    Usage:
+        follower = LogFollower(RemoteLogFile(runner, log_path), write=print)
+        result = follower.follow(lambda: current_status())
+        if not result.ok:
+            print("\\n".join(result.excerpt))
+    """
+
+    def __init__(
+        self,
+        source: LogSource,
+        write: Callable[[str], None] = print,
+        excerpt_lines: int = LOG_EXCERPT_LINES,
+        chunk_size: int = LOG_CHUNK_SIZE,
+        poll_interval: float = LOG_POLL_INTERVAL,
+        max_poll_interval: float = LOG_POLL_MAX_INTERVAL,
+    ):
+        """Initialize follower.
+
+        Args:
+            source: Log to read
+            write: Called once per complete line (blocking writes throttle reading)
+            excerpt_lines: Trailing lines kept for the failure excerpt
+            chunk_size: Maximum bytes read per poll
+            poll_interval: First delay after an empty read
+            max_poll_interval: Upper bound for the delay between empty reads
+        """
+        self.source = source
+        self.write = write
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.offset = 0
+        self.lines = 0
+        self.excerpt: deque[str] = deque(maxlen=excerpt_lines)
+        self._partial = b""
+
+    def poll(self) -> int:
+        """Read and emit everything available, one chunk at a time.
+
+        Returns:
+            Number of bytes read
+        """
+        total = 0
+        while True:
+            data = self.source.read(self.offset, self.chunk_size)
+            self.offset += len(data)
+            total += len(data)
+            self._feed(data)
+            if len(data) < self.chunk_size:
+                return total
+
+    def follow(
+        self,
+        status: Callable[[], str],
+        timeout: float = LOG_FOLLOW_TIMEOUT,
+    ) -> FollowResult:
+        """Follow the log until status() is terminal, then drain it.
+
+        Args:
+            status: Current deployment status (checked when the log is idle)
+            timeout: Maximum seconds to follow
+
+        Returns:
+            FollowResult with the final status and the trailing excerpt
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        delay = self.poll_interval
+        current = DEPLOYMENT_RUNNING
+        timed_out = False
+
+        while True:
+            if self.poll():
+                delay = self.poll_interval
+                continue
+
+            current = status()
+            if current in DEPLOYMENT_TERMINAL_STATES:
+                # The status can flip before the last lines are flushed to the file
+                self.poll()
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_poll_interval)
+
+        self.flush()
+        return FollowResult(
+            status=current,
+            bytes_read=self.offset,
+            lines=self.lines,
+            excerpt=list(self.excerpt),
+            timed_out=timed_out,
+            duration=time.monotonic() - started,
+        )
+
+    def flush(self) -> None:
+        """Emit a trailing line that has no newline yet."""
+        if self._partial:
+            self._emit(self._partial)
+            self._partial = b""
+
+    def _feed(self, data: bytes) -> None:
+        if not data:
+            return
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        for line in lines:
+            self._emit(line)
+        while len(self._partial) > LOG_MAX_LINE_LENGTH:
+            self._emit(self._partial[:LOG_MAX_LINE_LENGTH])
+            self._partial = self._partial[LOG_MAX_LINE_LENGTH:]
+
+    def _emit(self, raw: bytes) -> None:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        self.lines += 1
+        self.excerpt.append(line)
+        self.write(line)
+
+
+# =============================================================================
+# Deployments
+# =============================================================================
+
+
+def find_deployment(
+    client: DokployClient,
+    application_id: str = "",
+    compose_id: str = "",
+    deployment_id: str = "",
+) -> dict[str, Any] | None:
+    """A deployment by ID, or the newest one if no ID is given (one API call)."""
+    deployments = client.deployments(application_id=application_id, compose_id=compose_id)
+    if deployment_id:
+        return next((d for d in deployments if d.get("deploymentId") == deployment_id), None)
+    return max(deployments, key=lambda d: d.get("createdAt") or "", default=None)
+
+
+def deployment_status(
+    client: DokployClient,
+    application_id: str = "",
+    compose_id: str = "",
+    deployment_id: str = "",
+) -> str:
+    """Status of a deployment (running/done/error); running while not listed yet."""
+    deployment = find_deployment(client, application_id, compose_id, deployment_id)
+    return (deployment or {}).get("status") or DEPLOYMENT_RUNNING
@@ -0,0 +1,285 @@
+"""Reconcile the domains of an application or compose service.
+
+dokploy-domain-config used to handle one host per invocation: list the
+domains, look for the host, create it if missing - and never remove hosts
+that are no longer wanted. DomainReconciler lists the domains once,
+computes the creates/updates/deletes needed to reach the desired host set
+(primary domain plus aliases) and applies them concurrently, so Traefik
+sees one burst of changes instead of a reload per host.
+
+    reconciler = DomainReconciler(client, application_id=app_id)
+    result = reconciler.reconcile(desired_domains("example.com", ["www.example.com"], port=3000))
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from .client import DokployClient, DokployError
+from .constants import DEFAULT_APP_PORT, LOOKUP_CACHE_TTL, CertificateType, Endpoints
+
+DOMAIN_MAX_WORKERS = 4
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+
+
+@dataclass
+class DomainSpec:
+    """A desired domain (host + routing settings)."""
+
+    host: str
+    port: int = DEFAULT_APP_PORT
+    https: bool = True
+    certificate_type: str = CertificateType.NONE.value
+    path: str = "/"
+    strip_path: bool = False
+    service_name: str = ""
+
+    def payload(self) -> dict[str, Any]:
+        """Routing fields as sent to domain.create/domain.update."""
+        payload: dict[str, Any] = {
+            "host": self.host,
+            "port": self.port,
+            "https": self.https,
+            "certificateType": self.certificate_type if self.https else CertificateType.NONE.value,
+            "path": self.path,
+            "stripPath": self.strip_path,
+        }
+        if self.service_name:
+            payload["serviceName"] = self.service_name
+        return payload
+
+    def differs(self, existing: dict[str, Any]) -> bool:
+        """True if an existing domain's routing settings differ from this spec."""
+        return any(existing.get(key) != value for key, value in self.payload().items() if key != "host")
+
+
+@dataclass
+class DomainPlan:
+    """Changes needed to reach the desired host set."""
+
+    create: list[DomainSpec] = field(default_factory=list)
+    update: list[tuple[dict[str, Any], DomainSpec]] = field(default_factory=list)
+    delete: list[dict[str, Any]] = field(default_factory=list)
+    unchanged: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.create or self.update or self.delete)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.create)} to create, {len(self.update)} to update, "
+            f"{len(self.delete)} to delete, {len(self.unchanged)} unchanged"
+        )
+
+
+@dataclass
+class DomainChange:
+    """Outcome of one applied change."""
+
+    action: str
+    host: str
+    domain_id: str = ""
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class ReconcileResult:
+    """Plan plus the outcome of every change."""
+
+    plan: DomainPlan
+    changes: list[DomainChange]
+    domain_ids: dict[str, str]  # host -> domainId for every desired host that exists
+
+    @property
+    def ok(self) -> bool:
+        return all(change.ok for change in self.changes)
+
+    @property
+    def failed(self) -> list[DomainChange]:
+        return [change for change in self.changes if not change.ok]
+
+
+def desired_domains(
+    primary: str,
+    aliases: list[str] | None = None,
+    port: int = DEFAULT_APP_PORT,
+    https: bool = True,
+    certificate_type: str = CertificateType.NONE.value,
+    service_name: str = "",
+) -> list[DomainSpec]:
+    """Specs for the primary domain and its aliases, all routed the same way."""
+    hosts = [host.strip().lower() for host in [primary, *(aliases or [])] if host and host.strip()]
+    return [
+        DomainSpec(host, port, https, certificate_type, service_name=service_name)
+        for host in dict.fromkeys(hosts)
+    ]
+
+
+def plan_domains(existing: list[dict[str, Any]], desired: list[DomainSpec], prune: bool = True) -> DomainPlan:
+    """Compare existing domains with the desired specs (hosts match case-insensitively).
+
+    Duplicate existing entries for a desired host are deleted when pruning.
+
+    Args:
+        existing: Domains as returned by domain.byApplicationId/byComposeId
+        desired: Desired domains
+        prune: Delete existing domains whose host is not desired
+    """
+    plan = DomainPlan()
+    by_host: dict[str, list[dict[str, Any]]] = {}
+    for domain in existing:
+        by_host.setdefault((domain.get("host") or "").lower(), []).append(domain)
+
+    wanted = {spec.host.lower() for spec in desired}
+    for spec in desired:
+        matches = by_host.get(spec.host.lower(), [])
+        if not matches:
+            plan.create.append(spec)
+            continue
+        current, *duplicates = matches
+        if spec.differs(current):
+            plan.update.append((current, spec))
+        else:
+            plan.unchanged.append(current)
+        if prune:
+            plan.delete.extend(duplicates)
+
+    if prune:
+        plan.delete.extend(d for host, domains in by_host.items() if host not in wanted for d in domains)
+    return plan
+
+
+class DomainReconciler:
+    """Bring the domains of one application (or compose service) to a desired set.
+
+    Usage:
+        reconciler = DomainReconciler(client, compose_id=compose_id, service_name="web")
+        result = reconciler.reconcile(desired_domains(domain, aliases, port, service_name="web"))
+        for change in result.failed:
+            print(f"{change.action} {change.host}: {change.error}")
+    """
+
+    def __init__(
+        self,
+        client: DokployClient,
+        application_id: str = "",
+        compose_id: str = "",
+        service_name: str = "",
+        max_workers: int = DOMAIN_MAX_WORKERS,
+        on_change: Callable[[DomainChange], None] | None = None,
+    ):
+        """Initialize reconciler.
+
+        Args:
+            client: Dokploy client (shared by all worker threads)
+            application_id: Application owning the domains
+            compose_id: Compose stack owning the domains (instead of application_id)
+            service_name: Compose service whose domains are managed (others are never touched)
+            max_workers: Maximum changes applied at once
+            on_change: Called after each applied change
+
+        Raises:
+            ValueError: If neither or both owners are given
+        """
+        if bool(application_id) == bool(compose_id):
+            raise ValueError("Exactly one of application_id or compose_id is required")
+        self.client = client
+        self.application_id = application_id
+        self.compose_id = compose_id
+        self.service_name = service_name
+        self.max_workers = max_workers
+        self.on_change = on_change
+
+    def existing(self) -> list[dict[str, Any]]:
+        """Current domains of the owner (one API call, cached by the API broker until the next write)."""
+        if self.compose_id:
+            result = self.client.get(
+                Endpoints.DOMAIN_BY_COMPOSE_ID, params={"composeId": self.compose_id}, cache_ttl=LOOKUP_CACHE_TTL
+            )
+        else:
+            result = self.client.get(
+                Endpoints.DOMAIN_BY_APPLICATION_ID,
+                params={"applicationId": self.application_id},
+                cache_ttl=LOOKUP_CACHE_TTL,
+            )
+        domains = result if isinstance(result, list) else []
+        if self.service_name:
+            domains = [d for d in domains if d.get("serviceName") == self.service_name]
+        return domains
+
+    def plan(self, desired: list[DomainSpec], prune: bool = True) -> DomainPlan:
+        return plan_domains(self.existing(), desired, prune)
+
+    def reconcile(self, desired: list[DomainSpec], prune: bool = True) -> ReconcileResult:
+        """List once, plan, and apply the plan.
+
+        Raises:
+            DokployError: If the current domains cannot be listed
+        """
+        return self.apply(plan_domains(self.existing(), desired, prune))
+
+    def apply(self, plan: DomainPlan) -> ReconcileResult:
+        """Apply all changes of a plan concurrently; failures are collected, not raised."""
+        operations: list[Callable[[], DomainChange]] = []
+        operations += [lambda spec=spec: self._create(spec) for spec in plan.create]
+        operations += [lambda current=current, spec=spec: self._update(current, spec) for current, spec in plan.update]
+        operations += [lambda domain=domain: self._delete(domain) for domain in plan.delete]
+
+        changes: list[DomainChange] = []
+        if operations:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="domain") as executor:
+                changes = list(executor.map(lambda operation: operation(), operations))
+
+        domain_ids = {(d.get("host") or "").lower(): d.get("domainId", "") for d in plan.unchanged}
+        for change in changes:
+            if change.ok and change.action != ACTION_DELETE:
+                domain_ids[change.host.lower()] = change.domain_id
+        return ReconcileResult(plan, changes, domain_ids)
+
+    def _owner(self) -> dict[str, str]:
+        if self.compose_id:
+            return {"composeId": self.compose_id}
+        return {"applicationId": self.application_id}
+
+    def _run(self, action: str, host: str, call: Callable[[], str]) -> DomainChange:
+        try:
+            change = DomainChange(action, host, domain_id=call())
+        except DokployError as e:
+            change = DomainChange(action, host, error=str(e))
+        if self.on_change:
+            self.on_change(change)
+        return change
+
+    def _create(self, spec: DomainSpec) -> DomainChange:
+        def call() -> str:
+            result = self.client.post(Endpoints.DOMAIN_CREATE, json={**spec.payload(), **self._owner()})
+            return result.get("domainId", "") if isinstance(result, dict) else ""
+
+        return self._run(ACTION_CREATE, spec.host, call)
+
+    def _update(self, current: dict[str, Any], spec: DomainSpec) -> DomainChange:
+        domain_id = current.get("domainId", "")
+
+        def call() -> str:
+            self.client.post(Endpoints.DOMAIN_UPDATE, json={"domainId": domain_id, **spec.payload()})
+            return domain_id
+
+        return self._run(ACTION_UPDATE, spec.host, call)
+
+    def _delete(self, domain: dict[str, Any]) -> DomainChange:
+        domain_id = domain.get("domainId", "")
+
+        def call() -> str:
+            self.client.post(Endpoints.DOMAIN_DELETE, json={"domainId": domain_id})
+            return domain_id
+
+        return self._run(ACTION_DELETE, domain.get("host", ""), call)
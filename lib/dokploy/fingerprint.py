@@ -0,0 +1,284 @@
+"""Content fingerprint of a Docker build.
+
+docker-build-push used to rebuild and push on every run, even when nothing
+that goes into the image changed. fingerprint_build() hashes everything the
+build sees - the Dockerfile, build args, target and every context file not
+excluded by .dockerignore - into one digest. The digest names a registry
+tag, so an identical build can be found with a manifest HEAD and retagged
+instead of rebuilt.
+
+Files are hashed in parallel. A manifest of (size, mtime, mode) -> sha256
+per file is kept between runs, so on a persistent runner only files whose
+size, mtime or mode changed are read again.
+
+    fingerprint = fingerprint_build(".", "Dockerfile", build_args=["URL=https://example.com"])
+    print(fingerprint.tag)  # ctx-3f2a...
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+FINGERPRINT_MAX_WORKERS = 8
+FINGERPRINT_TAG_PREFIX = "ctx-"
+FINGERPRINT_TAG_LENGTH = 24  # hex chars of the digest used in the tag
+
+# Bump when the hashed inputs change, so old fingerprint tags stop matching
+FINGERPRINT_VERSION = "1"
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+DOCKERIGNORE = ".dockerignore"
+
+
+@dataclass
+class BuildFingerprint:
+    """Digest of a build's inputs plus hashing statistics."""
+
+    digest: str
+    files: int
+    hashed: int  # files read this run (the rest came from the manifest)
+    bytes_hashed: int
+    elapsed: float
+
+    @property
+    def tag(self) -> str:
+        return f"{FINGERPRINT_TAG_PREFIX}{self.digest[:FINGERPRINT_TAG_LENGTH]}"
+
+
+# =============================================================================
+# .dockerignore
+# =============================================================================
+
+
+@dataclass
+class IgnorePattern:
+    """One .dockerignore line compiled to a regex."""
+
+    pattern: str
+    regex: re.Pattern[str]
+    exclusion: bool  # "!pattern" re-includes matching paths
+
+    def matches(self, path: str) -> bool:
+        """Match the path or any of its parent directories (Docker semantics)."""
+        if self.regex.match(path):
+            return True
+        parts = path.split("/")
+        return any(self.regex.match("/".join(parts[:i])) for i in range(1, len(parts)))
+
+
+def _pattern_regex(pattern: str) -> re.Pattern[str]:
+    """Translate a Go filepath.Match pattern with ** support to a regex."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            if pattern[i + 1 : i + 2] == "*":
+                i += 1
+                if pattern[i + 1 : i + 2] == "/":
+                    i += 1
+                    regex += "(?:.*/)?"
+                else:
+                    regex += ".*"
+            else:
+                regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1 : end]
+                regex += "[^" + body[1:] + "]" if body.startswith("^") else "[" + body + "]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(f"^{regex}$")
+
+
+def parse_dockerignore(text: str) -> list[IgnorePattern]:
+    """Parse .dockerignore content (comments, blank lines and "!" negations)."""
+    patterns = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        exclusion = line.startswith("!")
+        if exclusion:
+            line = line[1:].strip()
+        line = os.path.normpath(line).lstrip("/") if line not in ("", "/") else ""
+        if not line or line == ".":
+            continue
+        patterns.append(IgnorePattern(line, _pattern_regex(line), exclusion))
+    return patterns
+
+
+def load_dockerignore(context: str | Path, dockerfile: str | Path = "") -> list[IgnorePattern]:
+    """Patterns for a build: <Dockerfile>.dockerignore wins over <context>/.dockerignore."""
+    candidates = [Path(f"{dockerfile}{DOCKERIGNORE}")] if dockerfile else []
+    candidates.append(Path(context) / DOCKERIGNORE)
+    for path in candidates:
+        if path.is_file():
+            return parse_dockerignore(path.read_text())
+    return []
+
+
+def is_ignored(path: str, patterns: list[IgnorePattern]) -> bool:
+    """Whether a context-relative path is excluded (the last matching pattern wins)."""
+    matched = False
+    for pattern in patterns:
+        # Only patterns that could flip the current state matter
+        if pattern.exclusion != matched:
+            continue
+        if pattern.matches(path):
+            matched = not pattern.exclusion
+    return matched
+
+
+def context_files(context: str | Path, patterns: list[IgnorePattern]) -> list[str]:
+    """Context-relative paths ("/" separated, sorted) that are sent to the builder.
+
+    Excluded directories are not descended into unless a "!" pattern could
+    re-include something below them. Symlinks are listed, never followed.
+    """
+    root = Path(context)
+    can_prune = not any(p.exclusion for p in patterns)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+
+        kept = []
+        for name in dirnames:
+            rel = f"{prefix}{name}"
+            if os.path.islink(os.path.join(dirpath, name)):
+                filenames.append(name)
+            elif not (can_prune and is_ignored(rel, patterns)):
+                kept.append(name)
+        dirnames[:] = kept
+
+        files.extend(rel for rel in (f"{prefix}{name}" for name in filenames) if not is_ignored(rel, patterns))
+    return sorted(files)
+
+
+# =============================================================================
+# Hashing
+# =============================================================================
+
+
+def default_manifest_path(context: str | Path) -> Path:
+    """Per-context manifest under FINGERPRINT_CACHE_DIR (default ~/.cache/docker-fingerprint)."""
+    cache_dir = os.environ.get("FINGERPRINT_CACHE_DIR") or Path.home() / ".cache" / "docker-fingerprint"
+    key = hashlib.sha256(str(Path(context).resolve()).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{key}.json"
+
+
+def _load_manifest(path: Path) -> dict[str, list]:
+    try:
+        manifest = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    files = manifest.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _save_manifest(path: Path, files: dict[str, list]) -> None:
+    """Atomically replace the manifest; a read-only cache dir is not an error."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "files": files}))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def hash_file(path: str | Path) -> str:
+    """sha256 of a file's content (of the link target string for symlinks)."""
+    if os.path.islink(path):
+        return hashlib.sha256(f"link:{os.readlink(path)}".encode()).hexdigest()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_build(
+    context: str | Path,
+    dockerfile: str | Path,
+    build_args: list[str] | None = None,
+    target: str = "",
+    manifest_path: str | Path | None = None,
+    max_workers: int = FINGERPRINT_MAX_WORKERS,
+) -> BuildFingerprint:
+    """Fingerprint a build: Dockerfile, build args, target and context files.
+
+    Args:
+        context: Build context directory
+        dockerfile: Dockerfile path (may be outside the context)
+        build_args: KEY=VALUE build args, in the order passed to the build
+        target: Build stage target
+        manifest_path: Per-file hash manifest (default: default_manifest_path(context))
+        max_workers: Files hashed at once
+
+    Returns:
+        BuildFingerprint whose digest changes whenever the build inputs do
+
+    Raises:
+        OSError: If the context or Dockerfile cannot be read
+    """
+    started = time.monotonic()
+    root = Path(context)
+    manifest_file = Path(manifest_path) if manifest_path else default_manifest_path(root)
+    previous = _load_manifest(manifest_file)
+
+    files = context_files(root, load_dockerignore(root, dockerfile))
+
+    def entry(rel: str) -> tuple[str, list, bool]:
+        full = root / rel
+        info = full.lstat()
+        key = [info.st_size, info.st_mtime_ns, info.st_mode]
+        cached = previous.get(rel)
+        if cached and cached[:3] == key:
+            return rel, cached, False
+        return rel, [*key, hash_file(full)], True
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fingerprint") as executor:
+        entries = list(executor.map(entry, files))
+
+    digest = hashlib.sha256()
+    digest.update(f"version:{FINGERPRINT_VERSION}\n".encode())
+    digest.update(f"dockerfile:{hash_file(dockerfile)}\n".encode())
+    for arg in build_args or []:
+        digest.update(f"arg:{arg}\n".encode())
+    digest.update(f"target:{target}\n".encode())
+    for rel, (_, _, mode, file_hash), _ in entries:
+        executable = "x" if mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH) else "-"
+        digest.update(f"file:{rel}\0{executable}{file_hash}\n".encode())
+
+    _save_manifest(manifest_file, {rel: data for rel, data, _ in entries})
+
+    rehashed = [data for _, data, hashed in entries if hashed]
+    return BuildFingerprint(
+        digest=digest.hexdigest(),
+        files=len(entries),
+        hashed=len(rehashed),
+        bytes_hashed=sum(data[0] for data in rehashed),
+        elapsed=time.monotonic() - started,
+    )
@@ -0,0 +1,265 @@
+"""Incremental JSON extraction for large Dokploy responses.
+
+``project.all`` and ``project.one`` embed every application's env, compose
+file and domains. Callers usually need one id by name, so these helpers walk
+the response as a stream of parser events and only build the selected items
+(and, optionally, only the selected fields of each item).
+
+Optional dependencies:
+- ijson: event-based parsing of the HTTP body without loading it whole.
+  Without it, top-level arrays are still streamed item by item via the
+  stdlib decoder; other prefixes fall back to a full parse.
+- orjson: faster decoding of full bodies (used by loads()).
+"""
+
+import codecs
+import json
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# ijson prefix for the items of a top-level array
+ROOT_ITEMS = "item"
+
+CHUNK_SIZE = 64 * 1024
+
+_CONTAINER_START = ("start_map", "start_array")
+_CONTAINER_END = ("end_map", "end_array")
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a complete JSON document, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def select_fields(item: Any, fields: Iterable[str] | None) -> Any:
+    """Keep only the given top-level keys of a dict item (others pass through)."""
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+def iter_items(
+    chunks: Iterable[bytes],
+    prefixes: str | tuple[str, ...] = ROOT_ITEMS,
+    fields: Iterable[str] | None = None,
+) -> Iterator[Any]:
+    """Yield the values found at the given ijson-style prefixes.
+
+    Prefixes use ijson notation: ``item`` is each element of a top-level
+    array, ``environments.item.applications.item`` each application of each
+    environment of a top-level object.
+
+    Args:
+        chunks: Body chunks (e.g., ``response.iter_content(CHUNK_SIZE)``)
+        prefixes: One prefix or a tuple of prefixes to match in a single pass
+        fields: Top-level keys to keep from each dict item (None keeps all)
+
+    Returns:
+        Iterator over matching items, in document order
+
+    Raises:
+        ValueError: On malformed JSON
+    """
+    if isinstance(prefixes, str):
+        prefixes = (prefixes,)
+    field_set = set(fields) if fields is not None else None
+
+    if ijson is not None:
+        events = ijson.parse(_ChunkReader(chunks), use_float=True)
+        try:
+            yield from _items_from_events(events, prefixes, field_set)
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+    elif prefixes == (ROOT_ITEMS,):
+        for item in _iter_array(chunks):
+            yield select_fields(item, field_set)
+    else:
+        document = loads(b"".join(chunks))
+        for prefix in prefixes:
+            for item in _walk(document, prefix.split(".")):
+                yield select_fields(item, field_set)
+
+
+def find_first(
+    chunks: Iterable[bytes],
+    predicate: Callable[[Any], bool],
+    prefixes: str | tuple[str, ...] = ROOT_ITEMS,
+    fields: Iterable[str] | None = None,
+) -> Any | None:
+    """Return the first item matching the predicate, or None.
+
+    Parsing stops at the first match; the rest of the body is never read.
+    The predicate sees the item after field selection.
+    """
+    for item in iter_items(chunks, prefixes, fields):
+        if predicate(item):
+            return item
+    return None
+
+
+# =============================================================================
+# ijson event walker
+# =============================================================================
+
+
+def _items_from_events(
+    events: Iterable[tuple[str, str, Any]],
+    prefixes: tuple[str, ...],
+    fields: set[str] | None,
+) -> Iterator[Any]:
+    """Build items at the given prefixes from (prefix, event, value) triples.
+
+    With ``fields``, only the selected keys of each map item are built; the
+    events of every other key are skipped without materializing anything.
+    Array and scalar items are kept whole, as select_fields() does.
+    """
+    item_prefix: str | None = None
+    whole: Any = None  # ObjectBuilder for a full item (no fields, or an array)
+    item: dict[str, Any] = {}
+    key: str | None = None
+    key_builder: Any = None
+
+    for prefix, event, value in events:
+        if item_prefix is None:
+            if prefix not in prefixes or event in ("map_key", *_CONTAINER_END):
+                continue
+            if event in _CONTAINER_START:
+                item_prefix = prefix
+                if fields is None or event == "start_array":
+                    whole = ijson.ObjectBuilder()
+                    whole.event(event, value)
+                else:
+                    item, key, key_builder = {}, None, None
+                continue
+            yield value  # scalar item
+            continue
+
+        if whole is not None:
+            whole.event(event, value)
+            if prefix == item_prefix and event in _CONTAINER_END:
+                yield whole.value
+                item_prefix, whole = None, None
+            continue
+
+        if prefix == item_prefix:
+            if event == "map_key":
+                key = value if value in fields else None
+            elif event == "end_map":
+                yield item
+                item_prefix = None
+            continue
+
+        if key is None:
+            continue
+
+        key_path = f"{item_prefix}.{key}"
+        if key_builder is None:
+            if prefix == key_path:
+                if event in _CONTAINER_START:
+                    key_builder = ijson.ObjectBuilder()
+                    key_builder.event(event, value)
+                else:
+                    item[key] = value
+                    key = None
+            continue
+
+        key_builder.event(event, value)
+        if prefix == key_path and event in _CONTAINER_END:
+            item[key] = key_builder.value
+            key, key_builder = None, None
+
+
+class _ChunkReader:
+    """File-like adapter over an iterable of byte chunks (for ijson)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the stream type with read(0)
+            return b""
+        for chunk in self._chunks:
+            if chunk:  # an empty read means EOF to ijson
+                return chunk
+        return b""
+
+
+# =============================================================================
+# Stdlib fallbacks
+# =============================================================================
+
+
+def _iter_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Stream the elements of a top-level JSON array with json.JSONDecoder.
+
+    Only the current element (plus one chunk) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    chunk_iter = iter(chunks)
+    exhausted = False
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not started:
+            if buffer:
+                if buffer[0] != "[":
+                    # Not an array: decode the whole document
+                    rest = buffer + text.decode(b"".join(chunk_iter), final=True)
+                    document = loads(rest)
+                    if isinstance(document, list):
+                        yield from document
+                    return
+                buffer = buffer[1:]
+                started = True
+                continue
+        elif buffer.startswith("]"):
+            return
+        elif buffer:
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # A number at the buffer end may be truncated - wait for more data
+                if end < len(buffer) or exhausted:
+                    yield value
+                    buffer = buffer[end:]
+                    continue
+
+        if exhausted:
+            return
+        chunk = next(chunk_iter, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text.decode(b"", final=True)
+        else:
+            buffer += text.decode(chunk)
+
+
+def _walk(node: Any, parts: list[str]) -> Iterator[Any]:
+    """Yield values at an ijson-style path inside a decoded document."""
+    if not parts:
+        yield node
+        return
+    head, rest = parts[0], parts[1:]
+    if head == ROOT_ITEMS and isinstance(node, list):
+        for child in node:
+            yield from _walk(child, rest)
+    elif isinstance(node, dict) and head in node:
+        yield from _walk(node[head], rest)
@@ -2,6 +2,8 @@
 
 import os
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 
 def output(key: str, value: str) -> None:
@@ -19,3 +21,18 @@ def output(key: str, value: str) -> None:
             f.write(f"{key}<<{delimiter}\n{value}\n{delimiter}\n")
         else:
             f.write(f"{key}={value}\n")
+
+
+@contextmanager
+def stop_commands() -> Iterator[None]:
+    """Disable workflow commands while untrusted text (e.g. build logs) is printed.
+
+    A log line such as "::set-output ..." or "::error::..." is shown verbatim
+    instead of being interpreted by the runner.
+    """
+    token = uuid.uuid4().hex
+    print(f"::stop-commands::{token}", flush=True)
+    try:
+        yield
+    finally:
+        print(f"::{token}::", flush=True)
@@ -0,0 +1,258 @@
+"""Capacity-aware server placement for `server = "auto"`.
+
+config-load used to pin every app to dev-worker or prod-worker, so load
+stayed lopsided as workers were added. With ``server = "auto"`` the
+server is chosen at deploy time:
+
+- an app (or compose stack) that already exists stays on its server, so a
+  redeploy never moves it (Dokploy cannot move an app between servers)
+- a new app is bin-packed best-fit: among the candidate servers that can
+  still reserve its memory and CPU, the one left with the least free memory
+  wins, keeping large gaps free for large apps; ties go to a hash of the
+  app name, so retries of a failed first deploy land on the same server
+- if nothing fits, the server with the most free memory is used (and the
+  placement is flagged as overcommitted)
+
+Capacity comes from the Swarm manager in one exec: node resources from
+``docker node inspect``, current reservations from the reservations of
+every running task on the node. Candidates are the Dokploy servers named
+in [environments.<env>] servers or [cluster] dev-servers / prod-servers.
+
+    capacity = cluster_capacity(swarm)
+    placement = place("myapp-pr-12", 128 * 1024**2, 0.1, capacity, candidates=["dev-worker", "dev-worker-2"])
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .appspec import NANO_CPUS, parse_memory, resolve_resources
+from .config import get_environment_config
+from .constants import DEV_SERVER, PROD_SERVER, Environment
+from .swarm import CommandResult, SwarmClient, SwarmError, parse_json_lines
+
+NODES_COMMAND = "docker node ls -q | xargs -r docker node inspect"
+SERVICES_COMMAND = "docker service ls -q | xargs -r docker service inspect"
+TASKS_COMMAND = (
+    "docker service ls -q | xargs -r docker service ps --no-trunc "
+    "--filter desired-state=running --format '{{json .}}'"
+)
+
+REASON_EXISTING = "existing"
+REASON_BEST_FIT = "best-fit"
+REASON_OVERCOMMIT = "overcommit"
+REASON_FALLBACK = "fallback"
+
+
+@dataclass
+class NodeCapacity:
+    """Resources of one Swarm node and what running tasks already reserve."""
+
+    hostname: str
+    cpu: float  # cores
+    memory: int  # bytes
+    reserved_cpu: float = 0.0
+    reserved_memory: int = 0
+    tasks: int = 0
+    available: bool = True  # Ready and Active
+
+    @property
+    def free_cpu(self) -> float:
+        return self.cpu - self.reserved_cpu
+
+    @property
+    def free_memory(self) -> int:
+        return self.memory - self.reserved_memory
+
+    def fits(self, memory: int, cpu: float) -> bool:
+        return self.free_memory >= memory and self.free_cpu >= cpu
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "free_cpu": round(self.free_cpu, 3), "free_memory": self.free_memory}
+
+
+@dataclass
+class Placement:
+    """The chosen server and why."""
+
+    server: str
+    reason: str
+    memory: int = 0
+    cpu: float = 0.0
+    candidates: list[NodeCapacity] = field(default_factory=list)
+
+    @property
+    def overcommitted(self) -> bool:
+        return self.reason == REASON_OVERCOMMIT
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "server": self.server,
+            "reason": self.reason,
+            "memory": self.memory,
+            "cpu": self.cpu,
+            "candidates": [c.to_dict() for c in self.candidates],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+# =============================================================================
+# Capacity
+# =============================================================================
+
+
+def _task_service(name: str, services: set[str]) -> str:
+    """Service of a ``docker service ps`` task name (svc.1 or svc.<node id>)."""
+    if name in services:
+        return name
+    service = name.rsplit(".", 1)[0]
+    return service if service in services else ""
+
+
+def parse_capacity(nodes: CommandResult, services: CommandResult, tasks: CommandResult) -> dict[str, NodeCapacity]:
+    """Node capacity keyed by hostname from the three manager commands."""
+    try:
+        node_entries = json.loads(nodes.stdout or "[]")
+        service_entries = json.loads(services.stdout or "[]")
+    except ValueError as e:
+        raise SwarmError(f"Unexpected output from: {nodes.command} / {services.command}", nodes) from e
+
+    capacity: dict[str, NodeCapacity] = {}
+    hostnames: dict[str, str] = {}
+    for entry in node_entries:
+        description = entry.get("Description", {})
+        resources = description.get("Resources", {})
+        hostname = description.get("Hostname", "")
+        hostnames[entry.get("ID", "")] = hostname
+        capacity[hostname] = NodeCapacity(
+            hostname=hostname,
+            cpu=int(resources.get("NanoCPUs") or 0) / NANO_CPUS,
+            memory=int(resources.get("MemoryBytes") or 0),
+            available=entry.get("Status", {}).get("State") == "ready"
+            and entry.get("Spec", {}).get("Availability") == "active",
+        )
+
+    reservations: dict[str, tuple[int, float]] = {}
+    for entry in service_entries:
+        spec = entry.get("Spec", {})
+        reserved = (spec.get("TaskTemplate", {}).get("Resources") or {}).get("Reservations") or {}
+        reservations[spec.get("Name", "")] = (
+            int(reserved.get("MemoryBytes") or 0),
+            int(reserved.get("NanoCPUs") or 0) / NANO_CPUS,
+        )
+
+    names = set(reservations)
+    for task in parse_json_lines(tasks):
+        node = capacity.get(hostnames.get(task.get("Node", ""), task.get("Node", "")))
+        service = _task_service(task.get("Name", ""), names)
+        if node is None or not service:
+            continue
+        memory, cpu = reservations[service]
+        node.reserved_memory += memory
+        node.reserved_cpu += cpu
+        node.tasks += 1
+    return capacity
+
+
+def cluster_capacity(swarm: SwarmClient) -> dict[str, NodeCapacity]:
+    """Capacity and reservations of every Swarm node, in one exec.
+
+    Raises:
+        SwarmError: If the manager is unreachable or returns unusable output
+    """
+    nodes, services, tasks = swarm.run_batch([NODES_COMMAND, SERVICES_COMMAND, TASKS_COMMAND])
+    for result in (nodes, services, tasks):
+        if not result.ok:
+            raise SwarmError(f"Command failed ({result.returncode}): {result.command}: {result.stderr.strip()}", result)
+    return parse_capacity(nodes, services, tasks)
+
+
+# =============================================================================
+# Placement
+# =============================================================================
+
+
+def candidate_servers(config: dict[str, Any], environment: str) -> list[str]:
+    """Servers an app of the environment may be placed on.
+
+    [environments.<env>] servers wins; otherwise [cluster] prod-servers for
+    production and dev-servers for everything else, defaulting to the
+    fixed worker of the tier.
+    """
+    servers = get_environment_config(config, environment).get("servers")
+    if not servers:
+        production = environment == Environment.PRODUCTION.value
+        key, default = ("prod-servers", PROD_SERVER) if production else ("dev-servers", DEV_SERVER)
+        servers = config.get("cluster", {}).get(key) or [default]
+    return [servers] if isinstance(servers, str) else list(servers)
+
+
+def requested_resources(config: dict[str, Any], environment: str) -> tuple[int, float]:
+    """(memory bytes, cores) one replica reserves; replicas multiply it."""
+    resources = resolve_resources(config, environment)
+    if resources is None:
+        return 0, 0.0
+    replicas = max(int(resources["replicas"] or 1), 1)
+    return parse_memory(resources["memory"]) * replicas, float(resources["cpu"]) * replicas
+
+
+def _tie_break(app_name: str, server: str) -> str:
+    # Rendezvous hashing: stable per app, spread across servers
+    return hashlib.sha256(f"{app_name}:{server}".encode()).hexdigest()
+
+
+def place(
+    app_name: str,
+    memory: int,
+    cpu: float,
+    capacity: dict[str, NodeCapacity],
+    candidates: list[str],
+    current_server: str = "",
+) -> Placement:
+    """Choose the server for an app.
+
+    Args:
+        app_name: Application name (tie-break seed)
+        memory: Bytes the app reserves in total
+        cpu: Cores the app reserves in total
+        capacity: cluster_capacity() result
+        candidates: Servers the app may go to (Dokploy server names = node hostnames)
+        current_server: Server the app already runs on ("" for a new app)
+
+    Returns:
+        Placement; the first candidate (reason "fallback") when none is an available node
+    """
+    if current_server:
+        return Placement(current_server, REASON_EXISTING, memory, cpu)
+
+    nodes = [capacity[name] for name in candidates if name in capacity and capacity[name].available]
+    if not nodes:
+        return Placement(candidates[0] if candidates else "", REASON_FALLBACK, memory, cpu)
+
+    fitting = [node for node in nodes if node.fits(memory, cpu)]
+    if fitting:
+        best = min(fitting, key=lambda n: (n.free_memory - memory, _tie_break(app_name, n.hostname)))
+        return Placement(best.hostname, REASON_BEST_FIT, memory, cpu, nodes)
+    roomiest = max(nodes, key=lambda n: (n.free_memory, _tie_break(app_name, n.hostname)))
+    return Placement(roomiest.hostname, REASON_OVERCOMMIT, memory, cpu, nodes)
+
+
+def placement_markdown(placement: Placement) -> str:
+    """Candidate table for the step summary."""
+    lines = [
+        f"Placed on **{placement.server}** ({placement.reason})",
+        "",
+        "| Server | Memory free / total | CPU free / total | Tasks |",
+        "|---|---|---|---|",
+    ]
+    for node in placement.candidates:
+        marker = " ⬅" if node.hostname == placement.server else ""
+        lines.append(
+            f"| {node.hostname}{marker} | {node.free_memory // 1024**2}Mi / {node.memory // 1024**2}Mi | "
+            f"{node.free_cpu:.2f} / {node.cpu:.2f} | {node.tasks} |"
+        )
+    return "\n".join(lines)
+
@@ -0,0 +1,310 @@
+"""Concurrent infrastructure health probes with a structured report.
+
+Each check is a small callable (Swarm nodes, services, containers, HTTP
+endpoints). InfraProbe runs them all at once on a pool of daemon threads
+under a single time budget; checks still running when the budget expires
+are reported as failed and abandoned, so they delay neither the report
+nor the interpreter's exit. The result renders as JSON (for
+outputs/artifacts) or as a markdown table (for step summaries).
+
+Swarm checks share the SwarmClient's multiplexed SSH connection, so each
+one costs an exec on an open connection, not a new session.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import requests
+
+from .constants import (
+    HTTP_OK,
+    HTTP_UNAUTHORIZED,
+    PROBE_BUDGET,
+    REGISTRY_HOST,
+    URL_SCHEME_HTTPS,
+)
+from .swarm import SwarmClient
+
+STATUS_OK = "ok"
+STATUS_WARN = "warn"
+STATUS_FAIL = "fail"
+
+STATUS_ICONS = {STATUS_OK: "✅", STATUS_WARN: "⚠️", STATUS_FAIL: "❌"}
+
+PROBE_MAX_WORKERS = 8
+
+GROUP_SWARM = "swarm"
+GROUP_SERVICES = "services"
+GROUP_CONTAINERS = "containers"
+GROUP_HTTP = "http"
+
+
+@dataclass
+class Outcome:
+    """What a check returns: status, a one-line detail and optional per-item rows."""
+
+    status: str
+    detail: str = ""
+    items: list["ProbeResult"] = field(default_factory=list)
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ProbeResult:
+    """One check in the report."""
+
+    name: str
+    group: str
+    status: str
+    latency: float
+    detail: str = ""
+    items: list["ProbeResult"] = field(default_factory=list)
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ProbeReport:
+    """All check results plus overall timing."""
+
+    results: list[ProbeResult]
+    elapsed: float
+    budget: float
+
+    @property
+    def healthy(self) -> bool:
+        return all(r.status != STATUS_FAIL for r in self.results)
+
+    def group_healthy(self, group: str) -> bool:
+        """True if no check of the group failed (a group that did not run has not failed)."""
+        return all(r.status != STATUS_FAIL for r in self.results if r.group == group)
+
+    def get(self, name: str) -> ProbeResult | None:
+        return next((r for r in self.results if r.name == name), None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "elapsed": round(self.elapsed, 3),
+            "budget": self.budget,
+            "checks": [asdict(r) for r in self.results],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_markdown(self) -> str:
+        """Markdown table with one row per check (and indented rows per item)."""
+        lines = [
+            "| Check | Status | Latency | Detail |",
+            "|-------|--------|---------|--------|",
+        ]
+        for result in self.results:
+            lines.append(_markdown_row(result.name, result))
+            for item in result.items:
+                lines.append(_markdown_row(f"↳ {item.name}", item))
+        lines.append("")
+        lines.append(f"_{len(self.results)} checks in {self.elapsed:.1f}s (budget {self.budget:.0f}s)_")
+        return "\n".join(lines)
+
+
+def _markdown_row(label: str, result: ProbeResult) -> str:
+    detail = result.detail.replace("|", "\\|").replace("\n", " ")
+    return f"| {label} | {STATUS_ICONS.get(result.status, result.status)} | {result.latency * 1000:.0f} ms | {detail} |"
+
+
+class InfraProbe:
+    """Run health checks concurrently under one time budget.
+
+    Usage:
+        probe = InfraProbe(budget=30)
+        add_swarm_checks(probe, swarm)
+        add_http_check(probe, "registry", "https://registry.example.com/v2/", ok_codes=(200, 401))
+        report = probe.run()
+        print(report.to_markdown())
+    """
+
+    def __init__(self, budget: float = PROBE_BUDGET, max_workers: int = PROBE_MAX_WORKERS):
+        """Initialize probe.
+
+        Args:
+            budget: Seconds the whole run may take; slower checks are reported as failed
+            max_workers: Maximum checks running at once
+        """
+        self.budget = budget
+        self.max_workers = max_workers
+        self.checks: list[tuple[str, str, Callable[[], Outcome]]] = []
+
+    def add(self, name: str, check: Callable[[], Outcome], group: str = "") -> None:
+        """Register a check. Exceptions it raises are reported as failures."""
+        self.checks.append((name, group, check))
+
+    def run(self) -> ProbeReport:
+        """Run all checks and return the report (in registration order)."""
+        started = time.monotonic()
+        results: dict[str, ProbeResult] = {}
+
+        def timed(name: str, group: str, check: Callable[[], Outcome]) -> None:
+            check_started = time.monotonic()
+            try:
+                outcome = check()
+            except Exception as e:  # noqa: BLE001 - a broken check is a failed check
+                outcome = Outcome(STATUS_FAIL, f"{type(e).__name__}: {e}")
+            results[name] = ProbeResult(
+                name=name,
+                group=group,
+                status=outcome.status,
+                latency=time.monotonic() - check_started,
+                detail=outcome.detail,
+                items=outcome.items,
+                data=outcome.data,
+            )
+
+        # Daemon workers: a check stuck past the budget must not hold the process open
+        pending: queue.SimpleQueue = queue.SimpleQueue()
+        for entry in self.checks:
+            pending.put(entry)
+        done = threading.Semaphore(0)
+
+        def worker() -> None:
+            while True:
+                try:
+                    entry = pending.get_nowait()
+                except queue.Empty:
+                    return
+                timed(*entry)
+                done.release()
+
+        for i in range(min(self.max_workers, len(self.checks))):
+            threading.Thread(target=worker, name=f"probe_{i}", daemon=True).start()
+
+        deadline = started + self.budget
+        for _ in self.checks:
+            if not done.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                break
+        finished = dict(results)  # stragglers may still write
+
+        ordered = [
+            finished.get(name)
+            or ProbeResult(name, group, STATUS_FAIL, self.budget, f"No result within {self.budget:.0f}s budget")
+            for name, group, _ in self.checks
+        ]
+        return ProbeReport(ordered, time.monotonic() - started, self.budget)
+
+
+# =============================================================================
+# Swarm checks
+# =============================================================================
+
+
+def check_nodes(swarm: SwarmClient) -> Outcome:
+    """All nodes Ready; drained/paused nodes are a warning."""
+    nodes = swarm.nodes()
+    items = []
+    for node in nodes:
+        if not node.ready:
+            status = STATUS_FAIL
+        elif node.availability != "Active" or node.manager_status == "Unreachable":
+            status = STATUS_WARN
+        else:
+            status = STATUS_OK
+        role = node.manager_status or "worker"
+        items.append(
+            ProbeResult(node.hostname, GROUP_SWARM, status, 0.0, f"{node.status}, {node.availability}, {role}")
+        )
+
+    managers = sum(1 for node in nodes if node.is_manager)
+    ready = sum(1 for node in nodes if node.ready)
+    data = {"node_count": len(nodes), "manager_count": managers, "ready_count": ready}
+    detail = f"{ready}/{len(nodes)} nodes ready, {managers} managers"
+
+    if not nodes or managers == 0:
+        return Outcome(STATUS_FAIL, detail or "No nodes", items, data)
+    return Outcome(_worst(item.status for item in items), detail, items, data)
+
+
+def check_services(swarm: SwarmClient) -> Outcome:
+    """No service with desired replicas but none running; partial is a warning."""
+    services = swarm.services()
+    items = []
+    for service in services:
+        if service.desired > 0 and service.running == 0:
+            status = STATUS_FAIL
+        elif service.running < service.desired:
+            status = STATUS_WARN
+        else:
+            status = STATUS_OK
+        if status != STATUS_OK:
+            items.append(ProbeResult(service.name, GROUP_SERVICES, status, 0.0, f"{service.replicas} replicas"))
+
+    healthy = sum(1 for s in services if s.healthy or s.desired == 0)
+    detail = f"{healthy}/{len(services)} services at desired replicas"
+    return Outcome(_worst(item.status for item in items), detail, items, {"service_count": len(services)})
+
+
+def check_container(swarm: SwarmClient, name_filter: str) -> Outcome:
+    """A container matching the name is running on the manager."""
+    running = [c for c in swarm.containers(name_filter) if c.running]
+    if not running:
+        return Outcome(STATUS_FAIL, f"No running container matching '{name_filter}'")
+    return Outcome(STATUS_OK, f"{running[0].name}: {running[0].status}")
+
+
+def add_swarm_checks(
+    probe: InfraProbe,
+    swarm: SwarmClient,
+    nodes: bool = True,
+    services: bool = True,
+    containers: tuple[str, ...] = ("dokploy", "registry"),
+) -> None:
+    """Register the Swarm manager checks (each runs as its own exec)."""
+    if nodes:
+        probe.add("swarm-nodes", lambda: check_nodes(swarm), GROUP_SWARM)
+    if services:
+        probe.add("swarm-services", lambda: check_services(swarm), GROUP_SERVICES)
+    for name in containers:
+        probe.add(f"container-{name}", lambda name=name: check_container(swarm, name), GROUP_CONTAINERS)
+
+
+# =============================================================================
+# HTTP checks
+# =============================================================================
+
+
+def check_http(url: str, ok_codes: tuple[int, ...] | None = None, timeout: float = PROBE_BUDGET) -> Outcome:
+    """GET the URL; any status in ok_codes (default: below 500) is healthy."""
+    response = requests.get(url, timeout=timeout, allow_redirects=False)
+    code = response.status_code
+    healthy = code in ok_codes if ok_codes else code < 500
+    return Outcome(STATUS_OK if healthy else STATUS_FAIL, f"HTTP {code}", data={"status_code": code})
+
+
+def add_http_check(
+    probe: InfraProbe,
+    name: str,
+    url: str,
+    ok_codes: tuple[int, ...] | None = None,
+) -> None:
+    """Register an HTTP check bounded by the probe budget."""
+    probe.add(name, lambda: check_http(url, ok_codes, timeout=probe.budget), GROUP_HTTP)
+
+
+def registry_url(host: str = REGISTRY_HOST) -> str:
+    """Registry API root; answers 200 (open) or 401 (auth required) when up."""
+    return f"{URL_SCHEME_HTTPS}{host}/v2/"
+
+
+REGISTRY_OK_CODES = (HTTP_OK, HTTP_UNAUTHORIZED)
+
+
+def _worst(statuses: Any) -> str:
+    statuses = set(statuses)
+    if STATUS_FAIL in statuses:
+        return STATUS_FAIL
+    if STATUS_WARN in statuses:
+        return STATUS_WARN
+    return STATUS_OK
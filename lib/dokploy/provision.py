@@ -0,0 +1,191 @@
+"""Building blocks for VPS provisioning stages.
+
+Each function is one provisioning stage (terraform apply, Dokploy
+registration, node labeling, ...) so vps-provision can run them through a
+StageGraph (see stages.py) and overlap the independent ones.
+"""
+
+import json
+import subprocess
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .client import DokployClient, DokployError
+from .constants import DEFAULT_SSH_KEY_NAME
+from .swarm import SwarmClient, SwarmError
+from .wait import wait_until
+
+# Terraform resource replaced for atomic VPS replacement
+TERRAFORM_SERVER_RESOURCE = "module.vps.hcloud_server.this"
+
+# How long Dokploy may take to list a server it just created
+SERVER_CREATE_TIMEOUT = 10
+
+# How long a new node may take to appear in `docker node ls`
+NODE_JOIN_TIMEOUT = 60
+
+Log = Callable[[str], None]
+
+
+# =============================================================================
+# Terraform
+# =============================================================================
+
+
+def run_logged(command: list[str], cwd: str | Path, prefix: str, log: Log = print) -> None:
+    """Run a command, streaming its combined output line by line with a prefix.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits non-zero
+    """
+    with subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as process:
+        for line in process.stdout:
+            log(f"[{prefix}] {line.rstrip()}")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+
+def terraform_apply(workdir: str | Path, replace: bool = False, log: Log = print) -> dict[str, Any]:
+    """Run terraform init + apply and return the outputs.
+
+    Args:
+        workdir: Terraform root module directory
+        replace: Replace the server atomically (terraform apply -replace)
+        log: Line logger
+
+    Returns:
+        Terraform outputs as {name: value}
+    """
+    run_logged(["terraform", "init", "-input=false"], workdir, "terraform", log)
+
+    command = ["terraform", "apply", "-auto-approve", "-input=false"]
+    if replace:
+        command.append(f"-replace={TERRAFORM_SERVER_RESOURCE}")
+    run_logged(command, workdir, "terraform", log)
+
+    result = subprocess.run(
+        ["terraform", "output", "-json"],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {name: item.get("value") for name, item in json.loads(result.stdout).items()}
+
+
+# =============================================================================
+# Dokploy registration
+# =============================================================================
+
+
+@dataclass
+class Registration:
+    """Outcome of register_server()."""
+
+    server_id: str
+    registered: bool = False
+    ip_updated: bool = False
+
+
+def resolve_ssh_key_id(client: DokployClient, name: str = DEFAULT_SSH_KEY_NAME) -> str | None:
+    """Find the Dokploy SSH key by name, falling back to the first available key."""
+    key = client.get_ssh_key_by_name(name)
+    if key:
+        return key.get("sshKeyId")
+    keys = client.list_ssh_keys()
+    return keys[0].get("sshKeyId") if keys else None
+
+
+def register_server(
+    client: DokployClient,
+    name: str,
+    ip_address: str,
+    ssh_key_id: str | None = None,
+    log: Log = print,
+) -> Registration:
+    """Register a server in Dokploy, or update its IP if it already exists.
+
+    New servers are created and their setup (Docker + Swarm) is triggered.
+
+    Args:
+        client: Dokploy client
+        name: Server name
+        ip_address: Server IP (Tailscale IP recommended)
+        ssh_key_id: Dokploy SSH key ID (resolved by name if None)
+        log: Line logger
+
+    Returns:
+        Registration with the server ID and what changed
+
+    Raises:
+        DokployError: On API errors, or if no SSH key or server ID is available
+    """
+    existing = client.get_server_by_name(name)
+    if existing:
+        server_id = existing.get("serverId")
+        if existing.get("ipAddress") == ip_address:
+            log(f"Server already registered with correct IP: {server_id}")
+            return Registration(server_id)
+        log(f"Server IP changed: {existing.get('ipAddress')} -> {ip_address}")
+        client.update_server(server_id, existing_server=existing, ip_address=ip_address)
+        return Registration(server_id, ip_updated=True)
+
+    ssh_key_id = ssh_key_id or resolve_ssh_key_id(client)
+    if not ssh_key_id:
+        raise DokployError("No SSH key found in Dokploy. Run dokploy-init-workers first.")
+
+    log(f"Registering server: {name} ({ip_address})")
+    server_id = client.create_server(name=name, ip_address=ip_address, ssh_key_id=ssh_key_id).get("serverId")
+    if not server_id:
+        # Some Dokploy versions don't return the new server - look it up
+        created = wait_until(lambda: client.get_server_by_name(name), SERVER_CREATE_TIMEOUT, name="server")
+        server_id = created.value.get("serverId")
+    if not server_id:
+        raise DokployError("Failed to register server - no serverId returned")
+
+    log(f"Server registered: {server_id}, setting up (Docker + Swarm)...")
+    try:
+        client.setup_server(server_id)
+    except DokployError as e:
+        # Setup may take time, don't fail on timeout
+        log(f"Setup request sent (may complete asynchronously): {e}")
+    return Registration(server_id, registered=True)
+
+
+# =============================================================================
+# Swarm node labels
+# =============================================================================
+
+
+def label_node(
+    swarm: SwarmClient,
+    node: str,
+    key: str,
+    value: str,
+    join_timeout: float = NODE_JOIN_TIMEOUT,
+) -> str:
+    """Wait for a node to join the Swarm, then apply and verify a label.
+
+    Returns:
+        The applied label ("key=value")
+
+    Raises:
+        WaitTimeout: If the node does not appear in time
+        SwarmError: If the label could not be applied or verified
+    """
+    wait_until(lambda: any(n.hostname == node for n in swarm.nodes()), join_timeout, name=f"node {node}")
+    swarm.add_node_label(node, key, value)
+
+    applied = swarm.node_labels(node).get(key)
+    if applied != value:
+        raise SwarmError(f"Label verification failed on {node}: {key}={applied!r}")
+    return f"{key}={value}"
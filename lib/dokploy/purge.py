@@ -0,0 +1,230 @@
+"""Targeted Cloudflare cache purges from build output manifests.
+
+cloudflare-cache-purge used to purge everything on every deploy, so the
+whole site cold-started against the origin (small worker nodes). A purge
+manifest maps each URL path of the build output to the hash of the file
+served there. Diffing the previous deploy's manifest against the current
+one gives the URLs whose content changed or disappeared:
+
+- only those URLs are purged, in chunks of PURGE_FILES_PER_REQUEST (the
+  per-request limit of the purge API), sent concurrently
+- everything is purged only when there is no previous manifest or more
+  than PURGE_FULL_THRESHOLD URLs changed
+- new paths (e.g. freshly hashed asset names) were never cached and are
+  skipped, unless a cached 404 for them matters (include_added)
+
+    current = build_manifest("dist")
+    plan = plan_purge(load_manifest("previous.json"), current, "https://example.com")
+    result = execute_purge(cloudflare, zone_id, plan)
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cloudflare import CloudflareClient, CloudflareError
+from .fingerprint import hash_file
+
+PURGE_FILES_PER_REQUEST = 30
+PURGE_MAX_WORKERS = 4
+PURGE_FULL_THRESHOLD = 500
+PURGE_MANIFEST_VERSION = 1
+PURGE_HASH_WORKERS = 8
+
+INDEX_FILE = "index.html"
+HTML_SUFFIX = ".html"
+
+
+@dataclass
+class ManifestDiff:
+    """URL paths whose content differs between two manifests."""
+
+    changed: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PurgePlan:
+    """What to purge and why."""
+
+    urls: list[str] = field(default_factory=list)
+    everything: bool = False
+    reason: str = ""
+    diff: ManifestDiff | None = None
+
+    @property
+    def empty(self) -> bool:
+        return not self.everything and not self.urls
+
+    def chunks(self, size: int = PURGE_FILES_PER_REQUEST) -> list[list[str]]:
+        return [self.urls[i : i + size] for i in range(0, len(self.urls), size)]
+
+
+@dataclass
+class PurgeResult:
+    """Outcome of executing a plan."""
+
+    purged: int = 0  # URLs purged (0 for a full purge)
+    requests: int = 0
+    everything: bool = False
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+# =============================================================================
+# Manifests
+# =============================================================================
+
+
+def url_paths(relative: str, clean_urls: bool = True) -> list[str]:
+    """URL paths served by a build output file.
+
+    dist/blog/index.html serves /blog/index.html, /blog/ and /blog;
+    with clean_urls, dist/about.html also serves /about.
+    """
+    path = "/" + relative.lstrip("/")
+    paths = [path]
+    if path.endswith("/" + INDEX_FILE):
+        directory = path[: -len(INDEX_FILE)]
+        paths.append(directory)
+        if directory != "/":
+            paths.append(directory.rstrip("/"))
+    elif clean_urls and path.endswith(HTML_SUFFIX):
+        paths.append(path[: -len(HTML_SUFFIX)])
+    return paths
+
+
+def build_manifest(
+    output_dir: str | Path,
+    clean_urls: bool = True,
+    max_workers: int = PURGE_HASH_WORKERS,
+) -> dict[str, str]:
+    """Map every URL path served from a build output directory to its content hash.
+
+    Args:
+        output_dir: Static build output (e.g. dist/), served at the site root
+        clean_urls: Also map page.html to /page (Astro, Next export, ...)
+        max_workers: Files hashed at once
+    """
+    root = Path(output_dir)
+    files = sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="purge-hash") as executor:
+        hashes = list(executor.map(lambda rel: hash_file(root / rel), files))
+
+    manifest: dict[str, str] = {}
+    for rel, digest in zip(files, hashes):
+        for path in url_paths(Path(rel).as_posix(), clean_urls):
+            manifest[path] = digest
+    return manifest
+
+
+def load_manifest(path: str | Path) -> dict[str, str] | None:
+    """A saved manifest, or None if it is missing or unreadable (no baseline).
+
+    Accepts the saved format ({"version", "files"}) or a plain {path: hash} object.
+    """
+    try:
+        data = json.loads(Path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    files = data.get("files", data) if "version" in data else data
+    return {str(k): str(v) for k, v in files.items()} if isinstance(files, dict) else None
+
+
+def save_manifest(path: str | Path, manifest: dict[str, str]) -> None:
+    """Write a manifest atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"version": PURGE_MANIFEST_VERSION, "files": manifest}, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def diff_manifests(previous: dict[str, str], current: dict[str, str]) -> ManifestDiff:
+    return ManifestDiff(
+        changed=sorted(p for p in current.keys() & previous.keys() if current[p] != previous[p]),
+        added=sorted(current.keys() - previous.keys()),
+        removed=sorted(previous.keys() - current.keys()),
+    )
+
+
+# =============================================================================
+# Planning and execution
+# =============================================================================
+
+
+def plan_purge(
+    previous: dict[str, str] | None,
+    current: dict[str, str],
+    base_urls: str | list[str],
+    threshold: int = PURGE_FULL_THRESHOLD,
+    include_added: bool = False,
+) -> PurgePlan:
+    """Decide which URLs to purge.
+
+    Args:
+        previous: Manifest of the deployed build (None: unknown, purge everything)
+        current: Manifest of the new build
+        base_urls: Origin(s) the paths are served under, e.g. https://example.com
+        threshold: Purge everything above this many URLs
+        include_added: Also purge new paths (only matters if their 404 may be cached)
+    """
+    if previous is None:
+        return PurgePlan(everything=True, reason="no previous manifest")
+
+    diff = diff_manifests(previous, current)
+    paths = sorted({*diff.changed, *diff.removed, *(diff.added if include_added else [])})
+    origins = [base_urls] if isinstance(base_urls, str) else base_urls
+    urls = [f"{origin.rstrip('/')}{path}" for origin in origins for path in paths]
+
+    if not urls:
+        return PurgePlan(reason="no cached URL changed", diff=diff)
+    if len(urls) > threshold:
+        return PurgePlan(everything=True, reason=f"{len(urls)} URLs changed (threshold {threshold})", diff=diff)
+    return PurgePlan(urls=urls, reason=f"{len(paths)} paths changed", diff=diff)
+
+
+def execute_purge(
+    client: CloudflareClient,
+    zone_id: str,
+    plan: PurgePlan,
+    chunk_size: int = PURGE_FILES_PER_REQUEST,
+    max_workers: int = PURGE_MAX_WORKERS,
+) -> PurgeResult:
+    """Send the plan's purge requests (URL chunks concurrently); failures are collected, not raised."""
+    if plan.everything:
+        try:
+            client.purge_cache(zone_id, everything=True)
+        except CloudflareError as e:
+            return PurgeResult(requests=1, everything=True, errors=[str(e)])
+        return PurgeResult(requests=1, everything=True)
+
+    chunks = plan.chunks(chunk_size)
+    if not chunks:
+        return PurgeResult()
+
+    def purge(chunk: list[str]) -> str:
+        try:
+            client.purge_cache(zone_id, files=chunk)
+        except CloudflareError as e:
+            return f"{len(chunk)} URLs ({chunk[0]}, ...): {e}"
+        return ""
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="purge") as executor:
+        errors = list(executor.map(purge, chunks))
+
+    failed = [error for error in errors if error]
+    purged = sum(len(chunk) for chunk, error in zip(chunks, errors) if not error)
+    return PurgeResult(purged=purged, requests=len(chunks), errors=failed)
@@ -0,0 +1,210 @@
+"""Cross-process rate limiter for the Dokploy API.
+
+Every Python step on a runner is a separate process, so the limiter keeps its
+state (token bucket, in-flight slots, queued waiters, Retry-After block) in a
+SharedState file (see state.py). Waiters register their priority in the same
+file; a slot is only granted when no higher-priority waiter is queued, so
+production calls overtake preview storms.
+"""
+
+import os
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    RATE_LIMIT_LEASE_TTL,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_POLL_INTERVAL,
+    RATE_LIMIT_STATE_FILE,
+    RATE_LIMIT_WAITER_TTL,
+    RequestPriority,
+)
+from .state import SharedState, state_dir
+
+
+class RateLimitTimeout(Exception):
+    """No slot could be acquired within the maximum wait time."""
+
+
+class RateLimiter:
+    """Token-bucket limiter with a concurrency cap, shared through a lock file.
+
+    Usage:
+        limiter = RateLimiter.from_env()
+        with limiter.slot(RequestPriority.PRODUCTION):
+            requests.get(...)
+
+        # After a 429 response
+        limiter.block_for(retry_after)
+    """
+
+    def __init__(
+        self,
+        state_path: str | Path,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_RATE_BURST,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_wait: float = RATE_LIMIT_MAX_WAIT,
+    ):
+        """Initialize rate limiter.
+
+        Args:
+            state_path: JSON state file shared by all processes
+            rate: Token refill rate in requests per second
+            burst: Bucket capacity (maximum burst of requests)
+            max_concurrency: Maximum in-flight requests across processes
+            max_wait: Maximum seconds to wait for a slot before giving up
+        """
+        self.shared = SharedState(state_path)
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter | None":
+        """Create limiter from environment variables.
+
+        Optional env vars:
+            DOKPLOY_RATE_LIMIT: Requests per second (default: 5, 0 disables the limiter)
+            DOKPLOY_RATE_BURST: Bucket capacity (default: 10)
+            DOKPLOY_MAX_CONCURRENCY: In-flight requests per runner (default: 4)
+            DOKPLOY_STATE_DIR: Directory for the state file (default: RUNNER_TEMP or system temp)
+
+        Returns:
+            RateLimiter instance, or None if disabled
+        """
+        rate = float(os.environ.get("DOKPLOY_RATE_LIMIT", str(DEFAULT_RATE_LIMIT)))
+        if rate <= 0:
+            return None
+
+        return cls(
+            state_path=state_dir() / RATE_LIMIT_STATE_FILE,
+            rate=rate,
+            burst=int(os.environ.get("DOKPLOY_RATE_BURST", str(DEFAULT_RATE_BURST))),
+            max_concurrency=int(os.environ.get("DOKPLOY_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))),
+        )
+
+    # =========================================================================
+    # Shared state
+    # =========================================================================
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, Any]]:
+        """Shared state with defaults filled in (full bucket on first use)."""
+        with self.shared.locked() as state:
+            state.setdefault("tokens", float(self.burst))
+            state.setdefault("updated", time.time())
+            state.setdefault("blocked_until", 0.0)
+            state.setdefault("inflight", {})
+            state.setdefault("waiting", {})
+            yield state
+
+    def _refresh(self, state: dict[str, Any], now: float) -> None:
+        """Refill tokens and drop leases/waiters left behind by dead processes."""
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+
+        state["inflight"] = {
+            ticket: started
+            for ticket, started in state["inflight"].items()
+            if now - started < RATE_LIMIT_LEASE_TTL
+        }
+        state["waiting"] = {
+            ticket: waiter
+            for ticket, waiter in state["waiting"].items()
+            if now - waiter["seen"] < RATE_LIMIT_WAITER_TTL
+        }
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def acquire(self, priority: RequestPriority = RequestPriority.PREVIEW) -> str:
+        """Block until a request slot is granted.
+
+        Args:
+            priority: Caller priority; queued higher-priority callers go first
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            RateLimitTimeout: If no slot was granted within max_wait seconds
+        """
+        ticket = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        deadline = time.monotonic() + self.max_wait
+        queued_at = time.time()
+
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                self._refresh(state, now)
+
+                # Lowest (priority, queue time) pair among everyone waiting, including us
+                state["waiting"][ticket] = {"priority": int(priority), "since": queued_at, "seen": now}
+                head = min(
+                    state["waiting"].items(),
+                    key=lambda item: (item[1]["priority"], item[1]["since"]),
+                )[1]
+                outranked = head["priority"] < int(priority)
+
+                blocked_for = state["blocked_until"] - now
+                if (
+                    blocked_for <= 0
+                    and not outranked
+                    and state["tokens"] >= 1
+                    and len(state["inflight"]) < self.max_concurrency
+                ):
+                    state["tokens"] -= 1
+                    state["inflight"][ticket] = now
+                    del state["waiting"][ticket]
+                    return ticket
+
+                refill_wait = (1 - state["tokens"]) / self.rate if state["tokens"] < 1 else 0.0
+                wait = max(RATE_LIMIT_POLL_INTERVAL, blocked_for, refill_wait)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._forget(ticket)
+                raise RateLimitTimeout(f"No Dokploy request slot after {self.max_wait}s")
+            time.sleep(min(wait, remaining, RATE_LIMIT_WAITER_TTL / 2))
+
+    def release(self, ticket: str) -> None:
+        """Return an in-flight slot."""
+        self._forget(ticket)
+
+    def _forget(self, ticket: str) -> None:
+        """Remove a ticket from both the in-flight and waiting sets."""
+        with self._locked_state() as state:
+            state["inflight"].pop(ticket, None)
+            state["waiting"].pop(ticket, None)
+
+    @contextmanager
+    def slot(self, priority: RequestPriority = RequestPriority.PREVIEW) -> Iterator[None]:
+        """Context manager wrapping acquire()/release()."""
+        ticket = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def block_for(self, seconds: float) -> None:
+        """Stop granting slots to every process for the given duration.
+
+        Called when Dokploy answers 429 or sends Retry-After. The bucket is
+        drained too, so traffic resumes gradually once the block expires.
+        """
+        with self._locked_state() as state:
+            now = time.time()
+            self._refresh(state, now)
+            state["blocked_until"] = max(state["blocked_until"], now + seconds)
+            state["tokens"] = 0.0
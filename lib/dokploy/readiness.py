@@ -0,0 +1,101 @@
+"""Readiness checks for newly provisioned hosts.
+
+Each function performs one attempt and returns a truthy value when the
+condition holds (or None when it does not yet), so it can be passed straight
+to wait_until() from wait.py, as the VPS, Docker and Dokploy readiness gates do:
+
+    result = wait_until(lambda: tailscale_device(api_key, "my-vps"), 300, name="tailscale", fatal=(ReadinessError,))
+    ip = tailscale_ip(result.value)
+"""
+
+from typing import Any
+
+import requests
+
+from .broker import api_request
+from .constants import (
+    CONNECT_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    HEADER_AUTHORIZATION,
+    HTTP_FORBIDDEN,
+    HTTP_UNAUTHORIZED,
+    SSH_CONNECT_TIMEOUT,
+    TAILSCALE_API_URL,
+    TAILSCALE_IP_PREFIX,
+)
+from .swarm import SSHRunner
+
+# Client errors at or above this code mean "not ready" for http_ready
+HTTP_NOT_READY = 400
+
+
+class ReadinessError(Exception):
+    """A check failed in a way waiting cannot fix (e.g., bad credentials)."""
+
+
+def tailscale_devices(api_key: str) -> list[dict[str, Any]]:
+    """List tailnet devices.
+
+    Raises:
+        ReadinessError: If the API key is rejected or the response is malformed
+        requests.RequestException: On network errors and other HTTP errors (retryable)
+    """
+    response = api_request(
+        "GET",
+        f"{TAILSCALE_API_URL}/tailnet/-/devices",
+        headers={HEADER_AUTHORIZATION: f"Bearer {api_key}"},
+        timeout=(CONNECT_TIMEOUT, DEFAULT_TIMEOUT),
+    )
+    if response.status_code in (HTTP_UNAUTHORIZED, HTTP_FORBIDDEN):
+        raise ReadinessError(
+            f"Tailscale API authentication failed (HTTP {response.status_code}) - "
+            "check that the API key is valid and has device read permissions"
+        )
+    response.raise_for_status()
+
+    devices = response.json().get("devices")
+    if not isinstance(devices, list):
+        raise ReadinessError("Invalid Tailscale API response - missing devices array")
+    return devices
+
+
+def match_tailscale_device(devices: list[dict[str, Any]], hostname: str) -> dict[str, Any] | None:
+    """Find a device by hostname (case-insensitive; also matches "<hostname>-N" renames)."""
+    name = hostname.lower()
+    for device in devices:
+        device_name = (device.get("hostname") or "").lower()
+        if device_name == name or device_name.startswith(f"{name}-"):
+            return device
+    return None
+
+
+def tailscale_ip(device: dict[str, Any]) -> str:
+    """The device's 100.x Tailscale IPv4 address ("" if none)."""
+    return next((a for a in device.get("addresses", []) if a.startswith(TAILSCALE_IP_PREFIX)), "")
+
+
+def tailscale_device(api_key: str, hostname: str) -> dict[str, Any] | None:
+    """Return the device once it has joined the tailnet with a Tailscale IP."""
+    device = match_tailscale_device(tailscale_devices(api_key), hostname)
+    if device and tailscale_ip(device):
+        return device
+    return None
+
+
+def docker_info(host: str, connect_timeout: int = SSH_CONNECT_TIMEOUT) -> dict[str, str] | None:
+    """Return Docker version and Swarm state once the daemon answers over SSH."""
+    runner = SSHRunner(host, connect_timeout=connect_timeout)
+    result = runner.run(
+        "docker info --format '{{.ServerVersion}}|{{.Swarm.LocalNodeState}}'",
+        timeout=connect_timeout * 3,
+    )
+    version, _, swarm = result.stdout.strip().partition("|")
+    if not result.ok or not version:
+        return None
+    return {"version": version, "swarm": swarm}
+
+
+def http_ready(url: str, timeout: float = DEFAULT_TIMEOUT) -> int | None:
+    """Return the HTTP status once the URL answers below 400."""
+    response = requests.get(url, timeout=(CONNECT_TIMEOUT, timeout))
+    return response.status_code if response.status_code < HTTP_NOT_READY else None
@@ -0,0 +1,144 @@
+"""Docker registry v2 client for manifest lookups and server-side retags.
+
+Used by docker-build-push to skip builds whose content fingerprint is
+already in the registry: a manifest HEAD finds the image and a retag
+copies the manifest to the new tag (GET + PUT, no layer is pulled or
+pushed).
+
+The registry is reached over Tailscale. In HTTPS mode the hostname is
+pinned to the registry's Tailscale IP (like curl --resolve), keeping SNI
+and certificate verification on the real hostname.
+
+    registry = RegistryClient.for_runner("registry.nextnode.fr", "100.64.0.1")
+    if registry.manifest_digest("app", "ctx-3f2a..."):
+        registry.retag("app", "ctx-3f2a...", "abc1234")
+"""
+
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .constants import (
+    CONNECT_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    HEADER_ACCEPT,
+    HEADER_CONTENT_DIGEST,
+    HEADER_CONTENT_TYPE,
+    HTTP_NOT_FOUND,
+    REGISTRY_PORT,
+    URL_SCHEME_HTTPS,
+)
+
+# Accepted manifest types, multi-platform indexes first (buildx pushes an
+# OCI index when attestations are enabled)
+MANIFEST_MEDIA_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+
+
+class RegistryError(Exception):
+    """Registry request failed."""
+
+
+class _PinnedHostAdapter(HTTPAdapter):
+    """Connect to an IP while presenting (SNI) and verifying a hostname."""
+
+    def __init__(self, hostname: str, **kwargs: Any):
+        self.hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["server_hostname"] = self.hostname
+        kwargs["assert_hostname"] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+class RegistryClient:
+    """Minimal registry v2 client (anonymous access, as on the Tailscale registry)."""
+
+    def __init__(self, base_url: str, host_header: str = "", timeout: float = DEFAULT_TIMEOUT):
+        """Initialize client.
+
+        Args:
+            base_url: Registry root, e.g. https://registry.example.com or http://100.64.0.1:5000
+            host_header: Hostname to present when base_url points at a pinned IP
+            timeout: Read timeout per request in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        if host_header:
+            self.session.headers["Host"] = host_header
+            self.session.mount(URL_SCHEME_HTTPS, _PinnedHostAdapter(host_header))
+
+    @classmethod
+    def for_runner(cls, registry_host: str, registry_ip: str = "", use_fallback: bool = False) -> "RegistryClient":
+        """Client matching docker-build-push's registry connection test.
+
+        Args:
+            registry_host: Registry hostname (HTTPS via Traefik)
+            registry_ip: Tailscale IP of the registry node
+            use_fallback: Plain HTTP on the IP's registry port instead of HTTPS
+        """
+        if use_fallback:
+            return cls(f"http://{registry_ip}:{REGISTRY_PORT}")
+        if registry_ip:
+            return cls(f"{URL_SCHEME_HTTPS}{registry_ip}", host_header=registry_host)
+        return cls(f"{URL_SCHEME_HTTPS}{registry_host}")
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        try:
+            return self.session.request(
+                method, f"{self.base_url}/v2/{path}", timeout=(CONNECT_TIMEOUT, self.timeout), **kwargs
+            )
+        except requests.RequestException as e:
+            raise RegistryError(f"{method} /v2/{path} failed: {e}") from e
+
+    def manifest_digest(self, repository: str, reference: str) -> str | None:
+        """Digest of a tag's manifest, or None if the tag doesn't exist (one HEAD).
+
+        Raises:
+            RegistryError: On network errors or unexpected statuses
+        """
+        response = self._request(
+            "HEAD",
+            f"{repository}/manifests/{reference}",
+            headers={HEADER_ACCEPT: ", ".join(MANIFEST_MEDIA_TYPES)},
+        )
+        if response.status_code == HTTP_NOT_FOUND:
+            return None
+        if not response.ok:
+            raise RegistryError(f"HEAD {repository}:{reference} failed: HTTP {response.status_code}")
+        return response.headers.get(HEADER_CONTENT_DIGEST) or reference
+
+    def retag(self, repository: str, source: str, tag: str) -> str:
+        """Point tag at the manifest of source (same repository, blobs are shared).
+
+        Returns:
+            Digest of the retagged manifest
+
+        Raises:
+            RegistryError: If the source is missing or the PUT is rejected
+        """
+        response = self._request(
+            "GET",
+            f"{repository}/manifests/{source}",
+            headers={HEADER_ACCEPT: ", ".join(MANIFEST_MEDIA_TYPES)},
+        )
+        if not response.ok:
+            raise RegistryError(f"GET {repository}:{source} failed: HTTP {response.status_code}")
+
+        media_type = response.headers.get(HEADER_CONTENT_TYPE, MANIFEST_MEDIA_TYPES[-1])
+        put = self._request(
+            "PUT",
+            f"{repository}/manifests/{tag}",
+            data=response.content,
+            headers={HEADER_CONTENT_TYPE: media_type},
+        )
+        if not put.ok:
+            raise RegistryError(f"PUT {repository}:{tag} failed: HTTP {put.status_code} {put.text[:200]}")
+        return put.headers.get(HEADER_CONTENT_DIGEST) or response.headers.get(HEADER_CONTENT_DIGEST, "")
@@ -0,0 +1,549 @@
+"""Resource right-sizing from observed Swarm service usage.
+
+[resources] hands every app the same reservation (512Mi / 0.5 CPU, 128Mi
+for dev), whatever it actually uses, and reservations decide how many
+services fit on a worker. The collector samples ``docker stats`` on every
+Swarm node over a window; each service's CPU and memory samples go into a
+compact log-bucketed histogram (a few dozen buckets, ~5% resolution), so
+history from previous runs can be merged in and percentiles read back
+without keeping raw samples. Older history decays with a half-life.
+
+The recommender turns the percentiles into memory/cpu reservations and
+limits with headroom, and groups them per project and environment as
+``dokploy.toml`` suggestions. Nothing is applied: Dokploy re-applies
+[resources] on every deploy, so dokploy.toml is where the values stick.
+
+    with UsageCollector(["dev-worker", "prod-worker"]) as collector:
+        store = UsageStore.load("usage.json")
+        store.add(collector.collect(window=600, interval=30))
+    report = recommend_all(store, current_resources(swarm, list(store.services)))
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .appspec import NANO_CPUS
+from .swarm import ContainerStats, SwarmClient, SwarmError
+
+RIGHTSIZE_WINDOW = 600
+RIGHTSIZE_INTERVAL = 30
+RIGHTSIZE_MAX_WORKERS = 8
+RIGHTSIZE_MIN_SAMPLES = 20
+RIGHTSIZE_HEADROOM = 0.2
+RIGHTSIZE_HALF_LIFE = 7 * 24 * 3600
+RIGHTSIZE_STORE_VERSION = 1
+
+# Histogram resolution: bucket i holds values up to BUCKET_BASE ** i
+BUCKET_BASE = 1.05
+# Weight below which decayed buckets are dropped
+MIN_BUCKET_WEIGHT = 0.01
+
+# Percentiles the recommendation is based on
+MEMORY_PERCENTILE = 95
+MEMORY_PEAK_PERCENTILE = 99
+CPU_PERCENTILE = 90
+CPU_PEAK_PERCENTILE = 99
+
+MEMORY_STEP = 16 * 1024**2
+MIN_MEMORY = 32 * 1024**2
+CPU_STEP = 0.05
+MIN_CPU = 0.05
+MIN_CPU_LIMIT = 0.25
+# Limits sit above the observed peak so spikes are not OOM-killed or throttled
+LIMIT_FACTOR = 1.5
+# Proposals within this fraction of the current value are reported as unchanged
+UNCHANGED_TOLERANCE = 0.1
+
+STATUS_SHRINK = "shrink"
+STATUS_GROW = "grow"
+STATUS_UNCHANGED = "unchanged"
+STATUS_INSUFFICIENT = "insufficient-data"
+
+# Dokploy appends a random 6-letter suffix to application names
+DOKPLOY_SUFFIX = re.compile(r"-[a-z]{6}$")
+PREVIEW_SUFFIX = re.compile(r"-pr-\d+$")
+ENVIRONMENT_SUFFIXES = ("development", "staging")
+
+
+# =============================================================================
+# Compact usage histograms
+# =============================================================================
+
+
+@dataclass
+class UsageHistogram:
+    """Log-bucketed sample weights (bucket index -> weight)."""
+
+    buckets: dict[int, float] = field(default_factory=dict)
+
+    @property
+    def count(self) -> float:
+        return sum(self.buckets.values())
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        index = math.ceil(math.log(value, BUCKET_BASE)) if value > 1 else 0
+        self.buckets[index] = self.buckets.get(index, 0.0) + weight
+
+    def merge(self, other: "UsageHistogram") -> None:
+        for index, weight in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0.0) + weight
+
+    def decay(self, factor: float) -> None:
+        self.buckets = {
+            index: weight * factor for index, weight in self.buckets.items() if weight * factor >= MIN_BUCKET_WEIGHT
+        }
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 if empty)."""
+        total = self.count
+        if not total:
+            return 0.0
+        threshold = total * q / 100
+        running = 0.0
+        for index in sorted(self.buckets):
+            running += self.buckets[index]
+            if running >= threshold:
+                return BUCKET_BASE**index
+        return BUCKET_BASE ** max(self.buckets)
+
+    def to_dict(self) -> dict[str, float]:
+        return {str(index): round(weight, 3) for index, weight in sorted(self.buckets.items())}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, float]) -> "UsageHistogram":
+        return cls({int(index): float(weight) for index, weight in data.items()})
+
+
+@dataclass
+class ServiceUsage:
+    """Observed usage of one Swarm service (all its tasks, on all nodes)."""
+
+    service: str
+    cpu: UsageHistogram = field(default_factory=UsageHistogram)  # millicores
+    memory: UsageHistogram = field(default_factory=UsageHistogram)  # bytes
+    nodes: list[str] = field(default_factory=list)
+    last_seen: float = 0.0
+
+    @property
+    def samples(self) -> float:
+        return self.memory.count
+
+    def add(self, stats: ContainerStats, node: str, at: float) -> None:
+        self.cpu.add(stats.cpu * 1000)
+        self.memory.add(stats.memory)
+        if node not in self.nodes:
+            self.nodes.append(node)
+        self.last_seen = max(self.last_seen, at)
+
+    def merge(self, other: "ServiceUsage") -> None:
+        self.cpu.merge(other.cpu)
+        self.memory.merge(other.memory)
+        self.nodes = sorted({*self.nodes, *other.nodes})
+        self.last_seen = max(self.last_seen, other.last_seen)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "cpu": self.cpu.to_dict(),
+            "memory": self.memory.to_dict(),
+            "nodes": self.nodes,
+            "last_seen": round(self.last_seen),
+        }
+
+    @classmethod
+    def from_dict(cls, service: str, data: dict[str, Any]) -> "ServiceUsage":
+        return cls(
+            service=service,
+            cpu=UsageHistogram.from_dict(data.get("cpu", {})),
+            memory=UsageHistogram.from_dict(data.get("memory", {})),
+            nodes=list(data.get("nodes", [])),
+            last_seen=float(data.get("last_seen", 0)),
+        )
+
+
+@dataclass
+class UsageStore:
+    """Usage history of all services, persisted between runs as compact JSON."""
+
+    services: dict[str, ServiceUsage] = field(default_factory=dict)
+    updated: float = 0.0
+
+    def add(self, usage: dict[str, ServiceUsage], now: float | None = None) -> None:
+        """Merge a collection window in, after decaying the existing history."""
+        now = time.time() if now is None else now
+        if self.updated:
+            factor = 0.5 ** (max(now - self.updated, 0) / RIGHTSIZE_HALF_LIFE)
+            for existing in self.services.values():
+                existing.cpu.decay(factor)
+                existing.memory.decay(factor)
+        for name, observed in usage.items():
+            self.services.setdefault(name, ServiceUsage(name)).merge(observed)
+        # Services that decayed away (removed previews) are dropped
+        self.services = {name: s for name, s in self.services.items() if s.memory.buckets}
+        self.updated = now
+
+    @classmethod
+    def load(cls, path: str | Path) -> "UsageStore":
+        """A saved store, or an empty one if it is missing or unreadable."""
+        try:
+            data = json.loads(Path(path).read_text())
+        except (FileNotFoundError, ValueError):
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != RIGHTSIZE_STORE_VERSION:
+            return cls()
+        services = {name: ServiceUsage.from_dict(name, entry) for name, entry in data.get("services", {}).items()}
+        return cls(services, float(data.get("updated", 0)))
+
+    def save(self, path: str | Path) -> None:
+        """Write the store atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        data = {
+            "version": RIGHTSIZE_STORE_VERSION,
+            "updated": round(self.updated),
+            "services": {name: usage.to_dict() for name, usage in sorted(self.services.items())},
+        }
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+
+# =============================================================================
+# Collection
+# =============================================================================
+
+
+class UsageCollector:
+    """Sample ``docker stats`` on several Swarm nodes at once.
+
+    Each node gets its own multiplexed SSH connection (docker stats only
+    sees local containers); plain containers (Dokploy, Traefik, ...) are
+    ignored, task containers are attributed to their service.
+    """
+
+    def __init__(
+        self,
+        hosts: list[str],
+        connect: Callable[[str], SwarmClient] = SwarmClient.over_ssh,
+        max_workers: int = RIGHTSIZE_MAX_WORKERS,
+    ):
+        self.hosts = hosts
+        self.connect = connect
+        self.max_workers = max_workers
+        self.errors: dict[str, str] = {}
+        self._clients: dict[str, SwarmClient] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "UsageCollector":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+    def collect(self, window: float = RIGHTSIZE_WINDOW, interval: float = RIGHTSIZE_INTERVAL) -> dict[str, ServiceUsage]:
+        """Sample every node each interval until the window has elapsed.
+
+        Unreachable nodes are recorded in errors and skipped; a failed
+        sample on a reachable node is skipped too.
+        """
+        usage: dict[str, ServiceUsage] = {}
+        deadline = time.monotonic() + window
+
+        def sample_node(host: str) -> None:
+            try:
+                client = self.connect(host)
+                with self._lock:
+                    self._clients[host] = client
+                client.connect()
+            except SwarmError as e:
+                self.errors[host] = str(e)
+                return
+            while True:
+                started = time.monotonic()
+                try:
+                    stats = client.stats()
+                except SwarmError as e:
+                    self.errors[host] = str(e)
+                else:
+                    self._record(usage, host, stats)
+                if started + interval >= deadline:
+                    return
+                time.sleep(max(0.0, started + interval - time.monotonic()))
+
+        if self.hosts:
+            workers = min(self.max_workers, len(self.hosts))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rightsize") as executor:
+                list(executor.map(sample_node, self.hosts))
+        return usage
+
+    def _record(self, usage: dict[str, ServiceUsage], host: str, stats: list[ContainerStats]) -> None:
+        now = time.time()
+        with self._lock:
+            for row in stats:
+                if row.service:
+                    usage.setdefault(row.service, ServiceUsage(row.service)).add(row, host, now)
+
+
+# =============================================================================
+# Recommendations
+# =============================================================================
+
+
+@dataclass
+class Resources:
+    """Reservations and limits in dokploy.toml units (bytes, cores; 0: unset)."""
+
+    memory: int = 0
+    memory_limit: int = 0
+    cpu: float = 0.0
+    cpu_limit: float = 0.0
+
+    @classmethod
+    def from_service(cls, spec: dict[str, Any]) -> "Resources":
+        """From a ``docker service inspect`` entry."""
+        resources = spec.get("Spec", {}).get("TaskTemplate", {}).get("Resources") or {}
+        reservations = resources.get("Reservations") or {}
+        limits = resources.get("Limits") or {}
+        return cls(
+            memory=int(reservations.get("MemoryBytes") or 0),
+            memory_limit=int(limits.get("MemoryBytes") or 0),
+            cpu=int(reservations.get("NanoCPUs") or 0) / NANO_CPUS,
+            cpu_limit=int(limits.get("NanoCPUs") or 0) / NANO_CPUS,
+        )
+
+    def to_toml(self) -> dict[str, str | float]:
+        return {
+            "memory": format_memory(self.memory),
+            "memory_limit": format_memory(self.memory_limit),
+            "cpu": round(self.cpu, 2),
+            "cpu_limit": round(self.cpu_limit, 2),
+        }
+
+
+@dataclass
+class Recommendation:
+    """Proposed resources for one service."""
+
+    service: str
+    app: str
+    project: str
+    environment: str
+    samples: float
+    memory_p95: int
+    cpu_p90: float
+    current: Resources
+    proposed: Resources | None = None
+    status: str = STATUS_INSUFFICIENT
+
+    @property
+    def memory_saved(self) -> int:
+        """Reserved bytes freed per replica (negative when it has to grow)."""
+        if self.proposed is None or not self.current.memory:
+            return 0
+        return self.current.memory - self.proposed.memory
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["current"] = self.current.to_toml()
+        data["proposed"] = self.proposed.to_toml() if self.proposed else None
+        data["samples"] = round(self.samples)
+        return data
+
+
+def round_up(value: float, step: float) -> float:
+    return math.ceil(value / step - 1e-9) * step
+
+
+def format_memory(value: int) -> str:
+    """Bytes as a dokploy.toml size ("96Mi", "1Gi")."""
+    if value and value % 1024**3 == 0:
+        return f"{value // 1024**3}Gi"
+    return f"{math.ceil(value / 1024**2)}Mi"
+
+
+def split_app_name(service: str) -> tuple[str, str, str]:
+    """(app, project, environment) of a Dokploy service name.
+
+    Inverse of compute_app_name() once Dokploy's random suffix is removed:
+    myapp-pr-12-abcdef -> ("myapp-pr-12", "myapp", "preview").
+    """
+    app = DOKPLOY_SUFFIX.sub("", service)
+    if PREVIEW_SUFFIX.search(app):
+        return app, PREVIEW_SUFFIX.sub("", app), "preview"
+    for environment in ENVIRONMENT_SUFFIXES:
+        if app.endswith(f"-{environment}"):
+            return app, app.removesuffix(f"-{environment}"), environment
+    return app, app, "production"
+
+
+def recommend(
+    usage: ServiceUsage,
+    current: Resources | None = None,
+    headroom: float = RIGHTSIZE_HEADROOM,
+    min_samples: int = RIGHTSIZE_MIN_SAMPLES,
+) -> Recommendation:
+    """Propose reservations and limits from a service's usage percentiles.
+
+    Reservations cover the p95 memory / p90 CPU plus headroom; limits sit
+    LIMIT_FACTOR above the p99 and at least twice the reservation.
+    """
+    app, project, environment = split_app_name(usage.service)
+    memory_p95 = usage.memory.percentile(MEMORY_PERCENTILE)
+    cpu_p90 = usage.cpu.percentile(CPU_PERCENTILE) / 1000
+    recommendation = Recommendation(
+        service=usage.service,
+        app=app,
+        project=project,
+        environment=environment,
+        samples=usage.samples,
+        memory_p95=int(memory_p95),
+        cpu_p90=cpu_p90,
+        current=current or Resources(),
+    )
+    if usage.samples < min_samples:
+        return recommendation
+
+    memory = int(max(round_up(memory_p95 * (1 + headroom), MEMORY_STEP), MIN_MEMORY))
+    memory_peak = usage.memory.percentile(MEMORY_PEAK_PERCENTILE)
+    memory_limit = int(max(round_up(memory_peak * LIMIT_FACTOR, MEMORY_STEP), 2 * memory))
+    cpu = max(round_up(cpu_p90 * (1 + headroom), CPU_STEP), MIN_CPU)
+    cpu_peak = usage.cpu.percentile(CPU_PEAK_PERCENTILE) / 1000
+    cpu_limit = max(round_up(cpu_peak * LIMIT_FACTOR, CPU_STEP), 2 * cpu, MIN_CPU_LIMIT)
+    recommendation.proposed = Resources(memory, memory_limit, round(cpu, 2), round(cpu_limit, 2))
+
+    reserved = recommendation.current.memory
+    if reserved and abs(memory - reserved) <= reserved * UNCHANGED_TOLERANCE:
+        recommendation.status = STATUS_UNCHANGED
+    else:
+        recommendation.status = STATUS_GROW if memory > reserved else STATUS_SHRINK
+    return recommendation
+
+
+def current_resources(swarm: SwarmClient, services: list[str]) -> dict[str, Resources]:
+    """Configured reservations/limits of the services (one inspect)."""
+    details = swarm.inspect_services(services)
+    return {name: Resources.from_service(detail.raw) for name, detail in details.items()}
+
+
+@dataclass
+class RightsizingReport:
+    """Recommendations for all observed services."""
+
+    recommendations: list[Recommendation] = field(default_factory=list)
+
+    @property
+    def actionable(self) -> list[Recommendation]:
+        return [r for r in self.recommendations if r.status in (STATUS_SHRINK, STATUS_GROW)]
+
+    @property
+    def memory_saved(self) -> int:
+        return sum(r.memory_saved for r in self.actionable)
+
+    def suggestions(self) -> dict[str, dict[str, dict[str, str | float]]]:
+        """dokploy.toml [environments.<env>] values per project.
+
+        Previews share one [environments.preview]: the largest proposal of
+        any PR app wins, so no preview ends up below its observed usage.
+        """
+        grouped: dict[str, dict[str, Resources]] = {}
+        for r in self.actionable:
+            if r.proposed is None:
+                continue
+            environments = grouped.setdefault(r.project, {})
+            best = environments.get(r.environment)
+            environments[r.environment] = (
+                r.proposed
+                if best is None
+                else Resources(
+                    max(best.memory, r.proposed.memory),
+                    max(best.memory_limit, r.proposed.memory_limit),
+                    max(best.cpu, r.proposed.cpu),
+                    max(best.cpu_limit, r.proposed.cpu_limit),
+                )
+            )
+        return {
+            project: {env: resources.to_toml() for env, resources in sorted(environments.items())}
+            for project, environments in sorted(grouped.items())
+        }
+
+    def suggestion_toml(self, project: str) -> str:
+        """A dokploy.toml fragment with the project's suggested resources."""
+        lines = [f"# Suggested from observed usage ({project})"]
+        for environment, values in self.suggestions().get(project, {}).items():
+            lines += ["", f"[environments.{environment}]"]
+            lines += [f"{key} = {json.dumps(value)}" for key, value in values.items()]
+        return "\n".join(lines) + "\n"
+
+    def write_suggestions(self, directory: str | Path) -> list[Path]:
+        """One <project>.toml fragment per project with actionable proposals."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for project in self.suggestions():
+            path = directory / f"{project}.toml"
+            path.write_text(self.suggestion_toml(project))
+            paths.append(path)
+        return paths
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "services": len(self.recommendations),
+            "actionable": len(self.actionable),
+            "memory_saved": self.memory_saved,
+            "recommendations": [r.to_dict() for r in self.recommendations],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_markdown(self) -> str:
+        lines = [
+            "| Service | Samples | Memory p95 | CPU p90 | Memory (current → proposed) | CPU (current → proposed) | Status |",
+            "|---|---|---|---|---|---|---|",
+        ]
+        for r in sorted(self.recommendations, key=lambda r: -r.memory_saved):
+            current = r.current.to_toml()
+            proposed = r.proposed.to_toml() if r.proposed else None
+            memory = f"{current['memory']} → {proposed['memory']}" if proposed else current["memory"]
+            cpu = f"{current['cpu']} → {proposed['cpu']}" if proposed else current["cpu"]
+            lines.append(
+                f"| `{r.service}` | {round(r.samples)} | {format_memory(r.memory_p95)} | "
+                f"{r.cpu_p90:.2f} | {memory} | {cpu} | {r.status} |"
+            )
+        saved = self.memory_saved
+        lines += [
+            "",
+            f"**{len(self.actionable)}** of {len(self.recommendations)} services would change; "
+            f"reserved memory {'freed' if saved >= 0 else 'added'}: **{format_memory(abs(saved))}** (one replica each).",
+        ]
+        return "\n".join(lines)
+
+
+def recommend_all(
+    store: UsageStore,
+    current: dict[str, Resources] | None = None,
+    headroom: float = RIGHTSIZE_HEADROOM,
+    min_samples: int = RIGHTSIZE_MIN_SAMPLES,
+) -> RightsizingReport:
+    """Recommendations for every service in the store."""
+    current = current or {}
+    return RightsizingReport(
+        [
+            recommend(usage, current.get(name), headroom, min_samples)
+            for name, usage in sorted(store.services.items())
+        ]
+    )
+
@@ -0,0 +1,259 @@
+"""Event-driven watcher for Swarm service updates and rollbacks.
+
+Instead of polling ``docker service inspect`` in a sleep loop, the watcher
+streams ``docker events --filter type=service`` over the SwarmClient's
+connection and returns as soon as the service's update state reaches a
+terminal value. A final batched inspect collects the resulting task states
+with their timings.
+"""
+
+import json
+import re
+import shlex
+import subprocess
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .constants import ROLLOUT_TIMEOUT
+from .swarm import JSON_FORMAT, ServiceDetail, SwarmClient, SwarmError
+
+# UpdateStatus.State values after which nothing changes without a new update
+UPDATE_TERMINAL_STATES = ("completed", "paused", "rollback_completed", "rollback_paused")
+ROLLBACK_TERMINAL_STATES = ("rollback_completed", "rollback_paused")
+SUCCESS_STATES = ("completed", "rollback_completed")
+
+# Event attribute holding the new update state
+EVENT_UPDATE_STATE = "updatestate.new"
+
+_TIMESTAMP = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)$")
+
+
+def parse_timestamp(value: str) -> float | None:
+    """Parse a Docker RFC 3339 timestamp (nanosecond precision) to epoch seconds."""
+    match = _TIMESTAMP.match(value or "")
+    if not match:
+        return None
+    base, fraction, zone = match.groups()
+    zone = "+00:00" if zone == "Z" else zone
+    parsed = datetime.fromisoformat(f"{base}{zone}").timestamp()
+    return parsed + (float(f"0.{fraction}") if fraction else 0.0)
+
+
+@dataclass
+class TaskTiming:
+    """One Swarm task of the service after the rollout."""
+
+    id: str
+    slot: int | None
+    node_id: str
+    image: str
+    state: str
+    desired_state: str
+    message: str = ""
+    error: str = ""
+    created_at: float | None = None
+    state_at: float | None = None
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds from task creation to its current state."""
+        if self.created_at is None or self.state_at is None:
+            return None
+        return max(0.0, self.state_at - self.created_at)
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "TaskTiming":
+        status = data.get("Status", {})
+        return cls(
+            id=data.get("ID", ""),
+            slot=data.get("Slot"),
+            node_id=data.get("NodeID", ""),
+            image=data.get("Spec", {}).get("ContainerSpec", {}).get("Image", ""),
+            state=status.get("State", ""),
+            desired_state=data.get("DesiredState", ""),
+            message=status.get("Message", ""),
+            error=status.get("Err", ""),
+            created_at=parse_timestamp(data.get("CreatedAt", "")),
+            state_at=parse_timestamp(status.get("Timestamp", "")),
+        )
+
+
+@dataclass
+class RolloutResult:
+    """Outcome of waiting for a service update or rollback."""
+
+    service: str
+    state: str
+    message: str
+    elapsed: float
+    timed_out: bool = False
+    image: str = ""
+    events: list[dict[str, Any]] = field(default_factory=list)
+    tasks: list[TaskTiming] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.state in SUCCESS_STATES
+
+    @property
+    def paused(self) -> bool:
+        return self.state.endswith("paused")
+
+
+class RolloutWatcher:
+    """Wait for a Swarm service update to settle by streaming docker events.
+
+    Usage:
+        with SwarmClient.over_ssh("admin-dokploy") as swarm:
+            swarm.rollback("my-app")
+            result = RolloutWatcher(swarm).wait("my-app", ROLLBACK_TERMINAL_STATES)
+            if not result.ok:
+                ...
+    """
+
+    def __init__(
+        self,
+        swarm: SwarmClient,
+        timeout: float = ROLLOUT_TIMEOUT,
+        on_event: Callable[[str, dict[str, Any]], None] | None = None,
+    ):
+        """Initialize watcher.
+
+        Args:
+            swarm: Client whose runner streams the events
+            timeout: Maximum seconds to wait for a terminal state
+            on_event: Called with (update state, raw event) for each service event
+        """
+        self.swarm = swarm
+        self.timeout = timeout
+        self.on_event = on_event
+
+    def events_command(self, service: str, since: int) -> str:
+        """docker events for one service from `since`, bounded by the timeout (manager clock)."""
+        name = shlex.quote(service)
+        return (
+            f"docker events --filter type=service --filter service={name} "
+            f"--since {since} --until {since + int(self.timeout)} --format {JSON_FORMAT}"
+        )
+
+    @staticmethod
+    def tasks_command(service: str) -> str:
+        """Inspect the service's current tasks (prints [] when there are none)."""
+        name = shlex.quote(service)
+        return (
+            f"ids=$(docker service ps -q --filter desired-state=running {name}); "
+            'if [ -n "$ids" ]; then docker inspect $ids; else echo "[]"; fi'
+        )
+
+    def wait(self, service: str, terminal_states: tuple[str, ...] = UPDATE_TERMINAL_STATES) -> RolloutResult:
+        """Block until the service's update state is one of terminal_states.
+
+        The manager's clock is read in the same exec as the current state and
+        before it, and the event stream starts from that time, so an update
+        that settles between the inspect and the stream is replayed, not missed.
+
+        Args:
+            service: Service name
+            terminal_states: Update states that end the wait
+
+        Returns:
+            RolloutResult with the final state, events seen and task timings
+
+        Raises:
+            SwarmError: If the service does not exist or the manager is unreachable
+        """
+        started = time.monotonic()
+        events: list[dict[str, Any]] = []
+
+        clock, inspect = self.swarm.run_batch(["date +%s", self.swarm.inspect_command([service])])
+        try:
+            since = int(clock.stdout.strip())
+        except ValueError as e:
+            raise SwarmError(f"Unexpected output from: {clock.command}", clock) from e
+        current = self.swarm.parse_inspect(inspect).get(service)
+        if current is None:
+            raise SwarmError(f"Service '{service}' not found", inspect)
+
+        state = current.update_state
+        if state not in terminal_states:
+            stream = self.swarm.runner.popen(self.events_command(service, since))
+            try:
+                state = self._read_events(stream, terminal_states, events)
+            finally:
+                _stop(stream)
+
+        return self._result(service, state, events, started, terminal_states)
+
+    def _read_events(
+        self,
+        stream: subprocess.Popen,
+        terminal_states: tuple[str, ...],
+        events: list[dict[str, Any]],
+    ) -> str:
+        """Consume events until a terminal state; returns "" if the stream ends first."""
+        for line in stream.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            attributes = event.get("Actor", {}).get("Attributes", {})
+            new_state = attributes.get(EVENT_UPDATE_STATE, "")
+            events.append(event)
+            if self.on_event:
+                self.on_event(new_state, event)
+            if new_state in terminal_states:
+                return new_state
+        return ""
+
+    def _result(
+        self,
+        service: str,
+        state: str,
+        events: list[dict[str, Any]],
+        started: float,
+        terminal_states: tuple[str, ...],
+    ) -> RolloutResult:
+        """Collect final service state and task timings in one exec.
+
+        When the stream ended without a terminal state, the re-inspected state
+        decides whether the wait timed out.
+        """
+        inspect, tasks = self.swarm.run_batch([self.swarm.inspect_command([service]), self.tasks_command(service)])
+        detail = self.swarm.parse_inspect(inspect).get(service) or ServiceDetail(id="", name=service, image="")
+        try:
+            task_rows = json.loads(tasks.stdout) if tasks.ok else []
+        except ValueError:
+            task_rows = []
+
+        state = state or detail.update_state
+        return RolloutResult(
+            service=service,
+            state=state,
+            message=detail.update_message,
+            elapsed=time.monotonic() - started,
+            timed_out=state not in terminal_states,
+            image=detail.image,
+            events=events,
+            tasks=sorted(
+                (TaskTiming.from_json(row) for row in task_rows),
+                key=lambda task: (task.slot or 0, task.id),
+            ),
+        )
+
+
+def _stop(process: subprocess.Popen) -> None:
+    """Terminate a streaming command (closing the remote session with it)."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
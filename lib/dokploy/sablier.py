@@ -0,0 +1,257 @@
+"""Scale-to-zero for development and preview deployments (Sablier).
+
+[scale_to_zero] and the per-environment scale_to_zero flag were documented
+but never read, so every preview kept its replicas running on the shared
+dev-worker. ScaleToZero resolves those settings for one deployment and
+renders both halves Sablier needs:
+
+- the Swarm side: sablier.enable / sablier.group labels on the application's
+  service (labelsSwarm, synced with the other application settings)
+- the Traefik side: a Sablier plugin middleware on the deployment's routers,
+  added to the Traefik config Dokploy keeps per application, or to the
+  file-provider config of compose-traefik-routing (compose containers carry
+  no labels we control, so the middleware names the routed container; they
+  are plain Docker containers, so only stacks on the Traefik host qualify)
+
+Production never scales to zero, whatever the config says.
+
+    settings = scale_to_zero_settings(config, "preview", "myapp-pr-12")
+    spec = ApplicationSpec(sablier_fields(settings))
+    text = attach_middleware(client.read_traefik_config(app_id), settings)
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .config import get_environment_config
+from .constants import (
+    SABLIER_DEFAULT_THEME,
+    SABLIER_IDLE_TIMEOUT,
+    SABLIER_REFRESH_FREQUENCY,
+    SABLIER_SESSION_DURATION,
+    SABLIER_STARTUP_TIMEOUT,
+    SABLIER_STRATEGY,
+    SABLIER_URL,
+    Environment,
+)
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - optional dependency
+    yaml = None
+
+# Every middleware this module manages is named sablier-<group>
+MIDDLEWARE_PREFIX = "sablier-"
+LABEL_ENABLE = "sablier.enable"
+LABEL_GROUP = "sablier.group"
+
+STRATEGIES = ("dynamic", "blocking")
+THEMES = ("hacker-terminal", "ghost", "shuffle", "matrix")
+
+# Go duration strings as accepted by Sablier ("30m", "1h30m", "90s")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ns|us|µs|ms|s|m|h)")
+DURATION_SECONDS = {"ns": 1e-9, "us": 1e-6, "µs": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600}
+
+
+@dataclass
+class ScaleToZero:
+    """Resolved scale-to-zero settings of one deployment.
+
+    Attributes:
+        enabled: Whether the deployment scales to zero
+        group: Sablier group (the app name); also names the middleware
+        session_duration: Time without requests before scaling to zero
+        startup_timeout: Time a blocked request waits for the app (blocking strategy)
+        theme: Loading page theme (dynamic strategy)
+        strategy: "dynamic" (loading page) or "blocking" (hold the request)
+        sablier_url: Sablier server as reached by the Traefik plugin
+        names: Containers to start instead of the group (compose stacks)
+        reason: Why scale-to-zero is off (empty when enabled)
+    """
+
+    enabled: bool
+    group: str
+    session_duration: str = SABLIER_SESSION_DURATION
+    startup_timeout: str = SABLIER_STARTUP_TIMEOUT
+    theme: str = SABLIER_DEFAULT_THEME
+    strategy: str = SABLIER_STRATEGY
+    sablier_url: str = SABLIER_URL
+    names: list[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def middleware_name(self) -> str:
+        return f"{MIDDLEWARE_PREFIX}{self.group}"
+
+    def labels(self) -> dict[str, str]:
+        """Swarm service labels the Sablier provider discovers the group by."""
+        return {LABEL_ENABLE: "true", LABEL_GROUP: self.group}
+
+    def middleware(self) -> dict[str, Any]:
+        """Traefik middleware definition (Sablier plugin)."""
+        config: dict[str, Any] = {"sablierUrl": self.sablier_url, "sessionDuration": self.session_duration}
+        if self.names:
+            config["names"] = ",".join(self.names)
+        else:
+            config["group"] = self.group
+        if self.strategy == "blocking":
+            config["blocking"] = {"timeout": self.startup_timeout}
+        else:
+            config["dynamic"] = {
+                "displayName": self.group,
+                "theme": self.theme,
+                "refreshFrequency": SABLIER_REFRESH_FREQUENCY,
+                "showDetails": True,
+            }
+        return {"plugin": {"sablier": config}}
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScaleToZero":
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**{"enabled": False, "group": "", **known})
+
+
+def parse_duration(value: str) -> float:
+    """Seconds in a Go duration string ("30m", "1h30m").
+
+    Raises:
+        ValueError: If the value is not a duration
+    """
+    text = str(value).strip()
+    parts = DURATION_PART.findall(text)
+    if not text or "".join(number + unit for number, unit in parts) != text:
+        raise ValueError(f"Invalid duration: {value!r} (expected e.g. 30m, 1h30m, 90s)")
+    return sum(float(number) * DURATION_SECONDS[unit] for number, unit in parts)
+
+
+def scale_to_zero_settings(config: dict[str, Any], environment: str, group: str) -> ScaleToZero:
+    """Resolve scale-to-zero for a deployment from the merged config.
+
+    [scale_to_zero] enabled is the global switch; [environments.<env>]
+    scale_to_zero turns it on or off per environment (preview falls back to
+    development). Sablier has a single idle window (sessionDuration): it is
+    the longer of idle_timeout and session_duration, so neither setting
+    scales an app down earlier than configured.
+
+    Args:
+        config: Merged configuration (defaults + project dokploy.toml)
+        environment: Target environment name
+        group: Sablier group, normally the app name
+
+    Returns:
+        ScaleToZero (disabled with a reason when it does not apply)
+
+    Raises:
+        ValueError: On invalid durations, theme or strategy
+    """
+    section = config.get("scale_to_zero", {})
+    idle_timeout = str(section.get("idle_timeout", SABLIER_IDLE_TIMEOUT))
+    session_duration = str(section.get("session_duration", SABLIER_SESSION_DURATION))
+    startup_timeout = str(section.get("startup_timeout", SABLIER_STARTUP_TIMEOUT))
+    theme = str(section.get("theme", SABLIER_DEFAULT_THEME))
+    strategy = str(section.get("strategy", SABLIER_STRATEGY))
+
+    parse_duration(startup_timeout)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Invalid scale_to_zero strategy: {strategy!r} (expected one of {', '.join(STRATEGIES)})")
+    if theme not in THEMES:
+        raise ValueError(f"Invalid scale_to_zero theme: {theme!r} (expected one of {', '.join(THEMES)})")
+    window = max((idle_timeout, session_duration), key=parse_duration)
+
+    settings = ScaleToZero(
+        enabled=False,
+        group=group,
+        session_duration=window,
+        startup_timeout=startup_timeout,
+        theme=theme,
+        strategy=strategy,
+        sablier_url=str(section.get("sablier_url") or SABLIER_URL),
+    )
+    if environment == Environment.PRODUCTION.value:
+        settings.reason = "production is always available"
+    elif not _as_bool(section.get("enabled", True)):
+        settings.reason = "[scale_to_zero] enabled = false"
+    elif not _as_bool(get_environment_config(config, environment).get("scale_to_zero", False)):
+        settings.reason = f"scale_to_zero is off for {environment}"
+    else:
+        settings.enabled = True
+    return settings
+
+
+def sablier_fields(settings: ScaleToZero) -> dict[str, Any]:
+    """Application fields for the Swarm labels (cleared when scale-to-zero is off).
+
+    labelsSwarm is managed as a whole for dev/preview applications: disabling
+    scale-to-zero removes the labels so Sablier stops touching the service.
+    """
+    return {"labelsSwarm": settings.labels() if settings.enabled else None}
+
+
+# =============================================================================
+# Traefik configuration
+# =============================================================================
+
+
+def attach_middleware(traefik_config: str, settings: ScaleToZero) -> str:
+    """Add (or remove) the Sablier middleware in a Traefik dynamic config.
+
+    Every router of the config gets the middleware appended (after e.g. the
+    HTTPS redirect, which needs no running app); the definition goes under
+    http.middlewares. When scale-to-zero is off, managed middlewares are
+    removed again. Other routers, middlewares and services are left alone.
+
+    Args:
+        traefik_config: YAML text of the dynamic config (e.g. Dokploy's per-app file)
+        settings: Resolved settings of the deployment
+
+    Returns:
+        The updated YAML text (unchanged input when nothing differs)
+
+    Raises:
+        RuntimeError: If PyYAML is not installed
+        ValueError: If the config is not a YAML mapping
+    """
+    if yaml is None:
+        raise RuntimeError("PyYAML is required to edit Traefik configs (pip install pyyaml)")
+    document = yaml.safe_load(traefik_config) if traefik_config.strip() else {}
+    if not isinstance(document, dict):
+        raise ValueError("Traefik config is not a YAML mapping")
+
+    http = document.get("http") or {}
+    before = repr(http)
+    routers = http.get("routers") or {}
+    middlewares = {
+        name: definition
+        for name, definition in (http.get("middlewares") or {}).items()
+        if not name.startswith(MIDDLEWARE_PREFIX)
+    }
+    for router in routers.values():
+        if not isinstance(router, dict):
+            continue
+        chain = [m for m in router.get("middlewares") or [] if not m.split("@")[0].startswith(MIDDLEWARE_PREFIX)]
+        if settings.enabled:
+            chain.append(settings.middleware_name)
+        if chain or "middlewares" in router:
+            router["middlewares"] = chain
+
+    if settings.enabled and routers:
+        middlewares[settings.middleware_name] = settings.middleware()
+    if middlewares:
+        http["middlewares"] = middlewares
+    else:
+        http.pop("middlewares", None)
+
+    if repr(http) == before:
+        return traefik_config
+    document["http"] = http
+    return yaml.safe_dump(document, sort_keys=False)
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
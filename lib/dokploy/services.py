@@ -0,0 +1,356 @@
+"""Multi-service (monorepo) deploys from a [services.*] table.
+
+A project with several deployable services declares each one with a path:
+
+    [services.web]
+    path = "apps/web"
+    subdomain = ""            # served on project.domain
+
+    [services.api]
+    path = "apps/api"
+    subdomain = "api"         # api.{project.domain}
+    port = 4000
+    [services.api.resources]
+    memory = "256Mi"
+
+Entries without a path (such as the postgres/redis placeholders in the
+defaults) are not deployable services and are ignored.
+
+ServiceDeployer syncs all services of a project concurrently in one
+process: one client, one project snapshot for the application lookups, one
+resolved server and a shared Cloudflare zone cache, with a result per
+service instead of one full deploy job per service.
+"""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .appspec import build_application_spec, sync_application
+from .client import DokployClient, DokployError
+from .cloudflare import CloudflareClient, CloudflareError
+from .config import deep_merge, get_domain_aliases
+from .constants import DEFAULT_APP_PORT, DEFAULT_DOCKERFILE, Endpoints
+from .domain import compute_app_name, compute_domain
+from .domainsync import DomainReconciler, desired_domains
+from .port import detect_port
+
+SERVICE_MAX_WORKERS = 4
+
+# Per-service tables that override the project-wide ones
+SERVICE_OVERRIDE_KEYS = ("build", "resources", "healthcheck", "environments")
+
+
+@dataclass
+class ServiceTarget:
+    """A deployable service resolved for one environment."""
+
+    name: str
+    app_name: str
+    path: str
+    dockerfile: str
+    context: str = "."
+    port: int = DEFAULT_APP_PORT
+    domain: str = ""
+    aliases: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ServiceTarget":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+@dataclass
+class ServiceResult:
+    """Outcome of syncing one service."""
+
+    name: str
+    app_name: str
+    application_id: str = ""
+    created: bool = False
+    settings_changed: list[str] = field(default_factory=list)
+    domains: dict[str, str] = field(default_factory=dict)  # host -> domainId
+    dns: dict[str, str] = field(default_factory=dict)  # host -> created/updated/unchanged
+    deployment_id: str = ""
+    error: str = ""
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class ServiceReport:
+    """Results of a multi-service sync, in declaration order."""
+
+    results: list[ServiceResult]
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.results)
+
+    def get(self, name: str) -> ServiceResult | None:
+        return next((r for r in self.results if r.name == name), None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "elapsed": round(self.elapsed, 3),
+            "services": [{**asdict(r), "ok": r.ok} for r in self.results],
+        }
+
+    def to_markdown(self) -> str:
+        lines = [
+            "| Service | Status | Application | Domains | Changed | Duration |",
+            "|---------|--------|-------------|---------|---------|----------|",
+        ]
+        for r in self.results:
+            error = r.error.replace("|", "\\|").replace("\n", " ")
+            status = "✅" if r.ok else f"❌ {error}"
+            domains = ", ".join(r.domains) or "-"
+            changed = ", ".join(r.settings_changed) or "-"
+            lines.append(f"| {r.name} | {status} | `{r.app_name}` | {domains} | {changed} | {r.duration:.1f}s |")
+        lines.append("")
+        lines.append(f"_{len(self.results)} services in {self.elapsed:.1f}s_")
+        return "\n".join(lines)
+
+
+# =============================================================================
+# Config
+# =============================================================================
+
+
+def service_config(config: dict[str, Any], name: str) -> dict[str, Any]:
+    """Project config with the service's build/resources/healthcheck/environments overrides."""
+    service = config.get("services", {}).get(name, {})
+    overrides = {key: service[key] for key in SERVICE_OVERRIDE_KEYS if key in service}
+    return deep_merge(config, overrides)
+
+
+def resolve_services(
+    config: dict[str, Any],
+    environment: str,
+    project_name: str,
+    pr_number: str = "",
+) -> list[ServiceTarget]:
+    """Resolve the deployable [services.*] entries for an environment.
+
+    Per service:
+    - app_name: compute_app_name("{project}-{service}", environment, pr_number)
+    - domain: compute_domain() of `domain`, or of "{subdomain}.{project.domain}"
+      (`subdomain = ""` means the project domain itself); none if neither is set
+    - aliases: like get_domain_aliases(), from the service's aliases/environments
+    - port: `port`, else detected from the service's .env/Dockerfile
+
+    Args:
+        config: Merged configuration
+        environment: Target environment
+        project_name: Project name
+        pr_number: PR number for preview environments
+
+    Returns:
+        Services in declaration order (empty if the project has none)
+    """
+    project_domain = config.get("project", {}).get("domain", "")
+    targets = []
+    for name, service in config.get("services", {}).items():
+        if not isinstance(service, dict) or "path" not in service or not service.get("enabled", True):
+            continue
+
+        path = service["path"].rstrip("/") or "."
+        dockerfile = service.get("dockerfile", f"{path}/{DEFAULT_DOCKERFILE}")
+
+        if "domain" in service:
+            base_domain = service["domain"]
+        elif "subdomain" in service and project_domain:
+            base_domain = f"{service['subdomain']}.{project_domain}" if service["subdomain"] else project_domain
+        else:
+            base_domain = ""
+        domain = compute_domain(base_domain, environment, pr_number)
+
+        alias_config = {
+            "project": {"aliases": service.get("aliases", [])},
+            "environments": service.get("environments", {}),
+        }
+        aliases = [a for a in get_domain_aliases(alias_config, environment) if a != domain] if domain else []
+
+        port = service.get("port") or detect_port(f"{path}/.env", dockerfile)[0] or DEFAULT_APP_PORT
+
+        targets.append(
+            ServiceTarget(
+                name=name,
+                app_name=compute_app_name(f"{project_name}-{name}", environment, pr_number),
+                path=path,
+                dockerfile=dockerfile,
+                context=service.get("context", "."),
+                port=int(port),
+                domain=domain,
+                aliases=aliases,
+            )
+        )
+    return targets
+
+
+# =============================================================================
+# Deploy
+# =============================================================================
+
+
+class ServiceDeployer:
+    """Sync and deploy several services of one project concurrently.
+
+    Usage:
+        deployer = ServiceDeployer(client, project_id, environment_id, "production", config, server_id)
+        report = deployer.deploy(resolve_services(config, "production", "shop"), images)
+        print(report.to_markdown())
+    """
+
+    def __init__(
+        self,
+        client: DokployClient,
+        project_id: str,
+        environment_id: str,
+        environment: str,
+        config: dict[str, Any],
+        server_id: str = "",
+        cloudflare: CloudflareClient | None = None,
+        dns_ip: str = "",
+        exposure: str = "external",
+        prune_domains: bool = True,
+        max_workers: int = SERVICE_MAX_WORKERS,
+        log: Callable[[str], None] = print,
+    ):
+        """Initialize deployer.
+
+        Args:
+            client: Dokploy client shared by all services
+            project_id: Dokploy project ID
+            environment_id: Dokploy environment ID
+            environment: Environment name (resources, aliases)
+            config: Merged configuration
+            server_id: Resolved Dokploy server ID (shared by all services)
+            cloudflare: Cloudflare client for DNS records (None skips DNS)
+            dns_ip: Record content for service domains
+            exposure: external (proxied, except .dev. hosts) or internal (never proxied)
+            prune_domains: Remove domains that are neither a service domain nor an alias
+            max_workers: Maximum services synced at once
+            log: Line logger (lines are prefixed with the service name)
+        """
+        self.client = client
+        self.project_id = project_id
+        self.environment_id = environment_id
+        self.environment = environment
+        self.config = config
+        self.server_id = server_id
+        self.cloudflare = cloudflare
+        self.dns_ip = dns_ip
+        self.exposure = exposure
+        self.prune_domains = prune_domains
+        self.max_workers = max_workers
+        self.log = log
+        self._applications: dict[str, str] | None = None
+
+    def applications(self) -> dict[str, str]:
+        """Application name -> ID for the whole project (one streamed read, cached)."""
+        if self._applications is None:
+            items = self.client.iter_items(
+                Endpoints.PROJECT_ONE,
+                prefixes=("applications.item", "environments.item.applications.item"),
+                fields=("applicationId", "name"),
+                params={"projectId": self.project_id},
+            )
+            self._applications = {item.get("name"): item.get("applicationId") for item in items}
+        return self._applications
+
+    def deploy(
+        self,
+        targets: list[ServiceTarget],
+        images: dict[str, str],
+        skip_deploy: bool = False,
+    ) -> ServiceReport:
+        """Sync every service (create, settings, domains, DNS, deploy) concurrently.
+
+        Args:
+            targets: Resolved services
+            images: Service name -> image reference
+            skip_deploy: Sync settings but don't trigger deployments
+
+        Returns:
+            ServiceReport; failures of one service don't stop the others
+
+        Raises:
+            DokployError: If the project snapshot cannot be read
+        """
+        started = time.monotonic()
+        self.applications()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="service") as executor:
+            results = list(
+                executor.map(lambda target: self._deploy_one(target, images.get(target.name, ""), skip_deploy), targets)
+            )
+        return ServiceReport(results, time.monotonic() - started)
+
+    def _deploy_one(self, target: ServiceTarget, image: str, skip_deploy: bool) -> ServiceResult:
+        started = time.monotonic()
+        result = ServiceResult(target.name, target.app_name)
+
+        def log(message: str) -> None:
+            self.log(f"[{target.name}] {message}")
+
+        try:
+            if not image:
+                raise ValueError("no image built for this service")
+
+            result.application_id = self.applications().get(target.app_name, "")
+            if not result.application_id:
+                created = self.client.create_application(
+                    target.app_name, self.project_id, self.environment_id, self.server_id
+                )
+                result.application_id = created.get("applicationId", "")
+                result.created = True
+                log(f"Created application {target.app_name} ({result.application_id})")
+            if not result.application_id:
+                raise DokployError(f"No application ID for {target.app_name}")
+
+            spec = build_application_spec(
+                service_config(self.config, target.name),
+                self.environment,
+                port=target.port,
+                docker_image=image,
+            )
+            result.settings_changed = sync_application(self.client, result.application_id, spec).changed
+            log(f"Settings: {', '.join(result.settings_changed) or 'unchanged'}")
+
+            if target.domain:
+                reconciler = DomainReconciler(self.client, application_id=result.application_id)
+                reconciled = reconciler.reconcile(
+                    desired_domains(target.domain, target.aliases, target.port),
+                    prune=self.prune_domains,
+                )
+                result.domains = reconciled.domain_ids
+                log(f"Domains: {reconciled.plan.summary()}")
+                if not reconciled.ok:
+                    failed = ", ".join(f"{c.action} {c.host}: {c.error}" for c in reconciled.failed)
+                    raise DokployError(f"Domain changes failed: {failed}")
+
+                if self.cloudflare and self.dns_ip:
+                    for host in [target.domain, *target.aliases]:
+                        proxied = self.exposure == "external" and ".dev." not in host
+                        result.dns[host] = self.cloudflare.upsert_record(host, self.dns_ip, proxied=proxied)
+                    log(f"DNS: {', '.join(f'{h} {a}' for h, a in result.dns.items())}")
+
+            if not skip_deploy:
+                result.deployment_id = self.client.deploy_application(result.application_id)
+                log(f"Deployment triggered: {result.deployment_id or '(no id)'}")
+
+        except (DokployError, CloudflareError, ValueError) as e:
+            result.error = str(e)
+            log(f"Failed: {e}")
+
+        result.duration = time.monotonic() - started
+        return result
@@ -0,0 +1,268 @@
+"""Slack deploy notifications built in-process, one message per deployment.
+
+slack-deploy used to assemble its Block Kit payload with a chain of jq
+calls and post a new webhook message for every phase (started, approval
+pending, result). SlackNotifier builds the payload in Python and, with a
+bot token and channel, posts the first phase with chat.postMessage and
+then updates that same message (chat.update) or replies in its thread.
+The message timestamp is carried between jobs as an action output.
+
+Without a bot token it falls back to the incoming webhook, which can
+only post new messages.
+
+    notifier = SlackNotifier(token=token, channel="C0123456789")
+    ts = notifier.notify(DeployMessage.from_env("started", "shop", "production")).ts
+    notifier.notify(DeployMessage.from_env("success", "shop", "production"), ts=ts)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+
+from .broker import api_request
+from .constants import (
+    CONNECT_TIMEOUT,
+    CONTENT_TYPE_JSON,
+    DEFAULT_TIMEOUT,
+    HEADER_AUTHORIZATION,
+    HEADER_CONTENT_TYPE,
+    SLACK_API_URL,
+)
+
+STATUS_STARTED = "started"
+STATUS_SUCCESS = "success"
+STATUS_FAILURE = "failure"
+STATUS_PENDING_APPROVAL = "pending-approval"
+STATUS_CLEANUP = "cleanup"
+
+# status -> (color, title, emoji)
+STATUS_STYLES = {
+    STATUS_STARTED: ("#3498db", "Deployment Started", ":rocket:"),
+    STATUS_SUCCESS: ("#2ecc71", "Deployment Successful", ":white_check_mark:"),
+    STATUS_FAILURE: ("#e74c3c", "Deployment Failed", ":x:"),
+    STATUS_PENDING_APPROVAL: ("#f39c12", "Production Deployment Awaiting Approval", ":hourglass_flowing_sand:"),
+    STATUS_CLEANUP: ("#9b59b6", "Preview Environment Cleaned Up", ":broom:"),
+}
+DEFAULT_STYLE = ("#95a5a6", "Deployment Notification", ":bell:")
+
+# How later phases relate to the first message
+REPLY_UPDATE = "update"  # replace the message in place
+REPLY_THREAD = "thread"  # keep the message, reply in its thread
+REPLY_MODES = (REPLY_UPDATE, REPLY_THREAD)
+
+
+class SlackError(Exception):
+    """Slack request failed or the API returned ok: false."""
+
+
+@dataclass
+class DeployMessage:
+    """Everything shown in a deploy notification."""
+
+    status: str
+    project_name: str
+    environment: str
+    domain: str = ""
+    url: str = ""
+    docker_image: str = ""
+    create_tag: str = ""
+    pr_number: str = ""
+    cleanup_deleted: bool = False
+    server_url: str = "https://github.com"
+    repository: str = ""
+    run_id: str = ""
+    actor: str = ""
+    sha: str = ""
+
+    @classmethod
+    def from_env(cls, status: str, project_name: str, environment: str, **kwargs: Any) -> "DeployMessage":
+        """Message with the run details (repository, run, actor, commit) from GITHUB_* variables."""
+        return cls(
+            status,
+            project_name,
+            environment,
+            server_url=os.environ.get("GITHUB_SERVER_URL") or "https://github.com",
+            repository=os.environ.get("GITHUB_REPOSITORY", ""),
+            run_id=os.environ.get("GITHUB_RUN_ID", ""),
+            actor=os.environ.get("GITHUB_ACTOR", ""),
+            sha=os.environ.get("GITHUB_SHA", ""),
+            **kwargs,
+        )
+
+    @property
+    def workflow_url(self) -> str:
+        return f"{self.server_url}/{self.repository}/actions/runs/{self.run_id}"
+
+    @property
+    def text(self) -> str:
+        """Plain-text fallback (notifications, screen readers)."""
+        _, title, emoji = STATUS_STYLES.get(self.status, DEFAULT_STYLE)
+        return f"{emoji} {title}: {self.project_name} ({self.environment})"
+
+    def fields(self) -> list[dict[str, str]]:
+        fields = [("Project", self.project_name)]
+
+        environment = self.environment
+        if self.pr_number and self.environment == "preview":
+            environment = f"preview (PR #{self.pr_number})"
+        fields.append(("Environment", environment))
+
+        if self.status != STATUS_CLEANUP and self.sha:
+            commit_url = f"{self.server_url}/{self.repository}/commit/{self.sha}"
+            fields.append(("Commit", f"<{commit_url}|{self.sha[:7]}>"))
+        fields.append(("Triggered by", self.actor))
+        if self.create_tag:
+            fields.append(("Tag", f"`{self.create_tag}`"))
+        if self.status == STATUS_SUCCESS and self.url:
+            fields.append(("URL", f"<{self.url}|{self.domain or self.url}>"))
+        if self.status == STATUS_CLEANUP:
+            fields.append(("Status", "Deleted" if self.cleanup_deleted else "Not found (already deleted)"))
+
+        return [{"type": "mrkdwn", "text": f"*{name}:*\n{value}"} for name, value in fields]
+
+    def buttons(self) -> list[dict[str, Any]]:
+        def button(text: str, url: str, primary: bool = False) -> dict[str, Any]:
+            element: dict[str, Any] = {
+                "type": "button",
+                "text": {"type": "plain_text", "text": text, "emoji": True},
+                "url": url,
+            }
+            if primary:
+                element["style"] = "primary"
+            return element
+
+        buttons = []
+        if self.status == STATUS_SUCCESS and self.url:
+            buttons.append(button("View Site", self.url, primary=True))
+        if self.status == STATUS_PENDING_APPROVAL:
+            buttons.append(button("Review & Approve", self.workflow_url, primary=True))
+        buttons.append(button("View Logs" if self.status == STATUS_FAILURE else "View Workflow", self.workflow_url))
+        return buttons
+
+    def attachments(self) -> list[dict[str, Any]]:
+        color, title, emoji = STATUS_STYLES.get(self.status, DEFAULT_STYLE)
+        return [
+            {
+                "color": color,
+                "blocks": [
+                    {"type": "header", "text": {"type": "plain_text", "text": f"{emoji} {title}", "emoji": True}},
+                    {"type": "section", "fields": self.fields()},
+                    {"type": "actions", "elements": self.buttons()},
+                ],
+            }
+        ]
+
+
+@dataclass
+class SlackResult:
+    """Where the notification ended up (ts/channel are empty for webhooks)."""
+
+    ts: str = ""
+    channel: str = ""
+    updated: bool = False
+
+
+class SlackNotifier:
+    """Post deploy messages via the Web API (updatable) or an incoming webhook.
+
+    Usage:
+        notifier = SlackNotifier.from_env()
+        result = notifier.notify(message, ts=previous_ts)
+    """
+
+    def __init__(
+        self,
+        webhook_url: str = "",
+        token: str = "",
+        channel: str = "",
+        api_url: str = SLACK_API_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """Initialize notifier.
+
+        Args:
+            webhook_url: Incoming webhook URL (used when token/channel are not set)
+            token: Bot token with chat:write
+            channel: Channel ID to post to
+            api_url: Web API base URL (a local stand-in in tests)
+            timeout: Read timeout per request in seconds
+
+        Raises:
+            ValueError: If neither a webhook nor a token and channel are given
+        """
+        if not webhook_url and not (token and channel):
+            raise ValueError("A webhook URL or a bot token and channel are required")
+        self.webhook_url = webhook_url
+        self.token = token
+        self.channel = channel
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "SlackNotifier":
+        """Create notifier from SLACK_WEBHOOK_URL, SLACK_BOT_TOKEN, SLACK_CHANNEL and SLACK_API_URL."""
+        return cls(
+            webhook_url=os.environ.get("SLACK_WEBHOOK_URL", ""),
+            token=os.environ.get("SLACK_BOT_TOKEN", ""),
+            channel=os.environ.get("SLACK_CHANNEL", ""),
+            api_url=os.environ.get("SLACK_API_URL") or SLACK_API_URL,
+        )
+
+    @property
+    def updatable(self) -> bool:
+        """Whether messages can be updated or threaded (Web API, not webhook)."""
+        return bool(self.token and self.channel)
+
+    def notify(self, message: DeployMessage, ts: str = "", reply_mode: str = REPLY_UPDATE) -> SlackResult:
+        """Send a message, updating or threading under ts when possible.
+
+        Args:
+            message: Notification content
+            ts: Timestamp of the deployment's first message (empty posts a new one)
+            reply_mode: REPLY_UPDATE (edit the message) or REPLY_THREAD (reply under it)
+
+        Returns:
+            SlackResult with the timestamp later phases should target
+
+        Raises:
+            SlackError: On network errors or API errors
+        """
+        payload: dict[str, Any] = {"text": message.text, "attachments": message.attachments()}
+
+        if not self.updatable:
+            self._post(self.webhook_url, payload, expect_json=False)
+            return SlackResult()
+
+        payload["channel"] = self.channel
+        if ts and reply_mode == REPLY_UPDATE:
+            body = self._post(f"{self.api_url}/chat.update", {**payload, "ts": ts})
+            return SlackResult(ts=body.get("ts", ts), channel=body.get("channel", self.channel), updated=True)
+        if ts:
+            payload["thread_ts"] = ts
+
+        body = self._post(f"{self.api_url}/chat.postMessage", payload)
+        # Thread replies keep pointing later phases at the parent message
+        return SlackResult(ts=ts or body.get("ts", ""), channel=body.get("channel", self.channel))
+
+    def _post(self, url: str, payload: dict[str, Any], expect_json: bool = True) -> dict[str, Any]:
+        headers = {HEADER_CONTENT_TYPE: f"{CONTENT_TYPE_JSON}; charset=utf-8"}
+        if expect_json:
+            headers[HEADER_AUTHORIZATION] = f"Bearer {self.token}"
+        try:
+            response = api_request("POST", url, json=payload, headers=headers, timeout=(CONNECT_TIMEOUT, self.timeout))
+        except requests.RequestException as e:
+            raise SlackError(f"Slack request failed: {e}") from e
+
+        if not response.ok:
+            raise SlackError(f"Slack request failed (HTTP {response.status_code}): {response.text[:200]}")
+        if not expect_json:
+            return {}
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise SlackError(f"Invalid Slack API response: {response.text[:200]}") from e
+        if not body.get("ok"):
+            raise SlackError(f"Slack API error: {body.get('error', 'unknown')}")
+        return body
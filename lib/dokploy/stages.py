@@ -0,0 +1,235 @@
+"""Dependency-graph executor for multi-stage operations.
+
+Composite action steps always run one after another, even when they do not
+depend on each other. StageGraph runs callables by declared dependencies
+instead: every stage starts as soon as the stages it needs have finished,
+independent stages overlap, and the report shows when each one started
+and how long it took.
+
+Stage states:
+- ok: ran and returned
+- failed: raised; stages needing it are blocked
+- skipped: disabled up front; stages needing it still run (value is None)
+- blocked: not run because a dependency failed or was blocked
+"""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+STAGE_OK = "ok"
+STAGE_FAILED = "failed"
+STAGE_SKIPPED = "skipped"
+STAGE_BLOCKED = "blocked"
+
+STAGE_ICONS = {STAGE_OK: "✅", STAGE_FAILED: "❌", STAGE_SKIPPED: "⏭️", STAGE_BLOCKED: "⛔"}
+
+STAGE_MAX_WORKERS = 8
+
+# A stage receives the values returned by all finished stages (None for skipped ones)
+StageFunc = Callable[[dict[str, Any]], Any]
+
+
+class StageGraphError(Exception):
+    """The graph is invalid (unknown dependency, duplicate name or cycle)."""
+
+
+@dataclass
+class Stage:
+    """One node of the graph."""
+
+    name: str
+    run: StageFunc
+    needs: tuple[str, ...] = ()
+    enabled: bool = True
+
+
+@dataclass
+class StageResult:
+    """Outcome and timing of one stage."""
+
+    name: str
+    status: str
+    needs: tuple[str, ...] = ()
+    value: Any = None
+    error: str = ""
+    started: float = 0.0  # seconds since the graph started
+    duration: float = 0.0
+
+    @property
+    def finished(self) -> float:
+        return self.started + self.duration
+
+
+@dataclass
+class StageReport:
+    """All stage results, in declaration order."""
+
+    results: list[StageResult]
+    elapsed: float
+    values: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status in (STAGE_OK, STAGE_SKIPPED) for r in self.results)
+
+    def get(self, name: str) -> StageResult | None:
+        return next((r for r in self.results if r.name == name), None)
+
+    def status(self, name: str) -> str:
+        result = self.get(name)
+        return result.status if result else ""
+
+    @property
+    def serial_time(self) -> float:
+        """Time the stages would have taken run one after another."""
+        return sum(r.duration for r in self.results)
+
+    def to_markdown(self) -> str:
+        """Timeline table: start offset and duration per stage."""
+        lines = [
+            "| Stage | Status | Start | Duration | Needs | Detail |",
+            "|-------|--------|-------|----------|-------|--------|",
+        ]
+        for r in self.results:
+            ran = r.status in (STAGE_OK, STAGE_FAILED)
+            start = f"+{r.started:.1f}s" if ran else "-"
+            duration = f"{r.duration:.1f}s" if ran else "-"
+            needs = ", ".join(r.needs) or "-"
+            detail = r.error.replace("|", "\\|").replace("\n", " ")
+            lines.append(f"| {r.name} | {STAGE_ICONS.get(r.status, r.status)} | {start} | {duration} | {needs} | {detail} |")
+        lines.append("")
+        lines.append(f"_Wall time {self.elapsed:.1f}s (stages sum to {self.serial_time:.1f}s)_")
+        return "\n".join(lines)
+
+
+class StageGraph:
+    """Run stages concurrently, each as soon as its dependencies are done.
+
+    Usage:
+        graph = StageGraph()
+        graph.add("apply", lambda ctx: terraform_apply())
+        graph.add("lookup", lambda ctx: lookup_manager_ip())
+        graph.add("label", lambda ctx: label(ctx["apply"], ctx["lookup"]), needs=("apply", "lookup"))
+        report = graph.run()
+        print(report.to_markdown())
+    """
+
+    def __init__(self, max_workers: int = STAGE_MAX_WORKERS, on_event: Callable[[str, str], None] | None = None):
+        """Initialize graph.
+
+        Args:
+            max_workers: Maximum stages running at once
+            on_event: Called with (stage name, "started"/status) as stages progress
+        """
+        self.max_workers = max_workers
+        self.on_event = on_event
+        self.stages: dict[str, Stage] = {}
+
+    def add(self, name: str, run: StageFunc, needs: tuple[str, ...] = (), enabled: bool = True) -> None:
+        """Declare a stage.
+
+        Raises:
+            StageGraphError: If the name is already used
+        """
+        if name in self.stages:
+            raise StageGraphError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, run, tuple(needs), enabled)
+
+    def validate(self) -> None:
+        """Check that dependencies exist and contain no cycle.
+
+        Raises:
+            StageGraphError: On unknown dependencies or cycles
+        """
+        for stage in self.stages.values():
+            unknown = [d for d in stage.needs if d not in self.stages]
+            if unknown:
+                raise StageGraphError(f"Stage '{stage.name}' needs unknown stage(s): {', '.join(unknown)}")
+
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str, path: list[str]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise StageGraphError(f"Dependency cycle: {' -> '.join([*path, name])}")
+            visiting.add(name)
+            for dep in self.stages[name].needs:
+                visit(dep, [*path, name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    def _emit(self, name: str, event: str) -> None:
+        if self.on_event:
+            self.on_event(name, event)
+
+    def run(self) -> StageReport:
+        """Run every stage and return the report.
+
+        Raises:
+            StageGraphError: If the graph is invalid (nothing is run)
+        """
+        self.validate()
+        started = time.monotonic()
+        results: dict[str, StageResult] = {}
+        values: dict[str, Any] = {}
+        running: dict[Future, tuple[str, float]] = {}
+        pending = list(self.stages)
+
+        def execute(stage: Stage, context: dict[str, Any]) -> Any:
+            return stage.run(context)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        stage = self.stages[name]
+                        if not all(dep in results for dep in stage.needs):
+                            continue
+                        pending.remove(name)
+                        progressed = True
+
+                        broken = [d for d in stage.needs if results[d].status in (STAGE_FAILED, STAGE_BLOCKED)]
+                        if broken:
+                            results[name] = StageResult(
+                                name, STAGE_BLOCKED, stage.needs, error=f"needs {', '.join(broken)}"
+                            )
+                            self._emit(name, STAGE_BLOCKED)
+                        elif not stage.enabled:
+                            values[name] = None
+                            results[name] = StageResult(name, STAGE_SKIPPED, stage.needs)
+                            self._emit(name, STAGE_SKIPPED)
+                        else:
+                            self._emit(name, "started")
+                            future = executor.submit(execute, stage, dict(values))
+                            running[future] = (name, time.monotonic())
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, stage_started = running.pop(future)
+                    offset = stage_started - started
+                    duration = time.monotonic() - stage_started
+                    error = future.exception()
+                    needs = self.stages[name].needs
+                    if error is None:
+                        values[name] = future.result()
+                        results[name] = StageResult(name, STAGE_OK, needs, values[name], "", offset, duration)
+                    else:
+                        message = f"{type(error).__name__}: {error}"
+                        results[name] = StageResult(name, STAGE_FAILED, needs, None, message, offset, duration)
+                    self._emit(name, results[name].status)
+
+        ordered = [results[name] for name in self.stages]
+        return StageReport(ordered, time.monotonic() - started, values)
@@ -0,0 +1,71 @@
+"""Runner-wide state files shared between action steps.
+
+Each composite action step runs in its own Python process. State that must
+outlive a single step (rate limiter bucket, circuit breaker) is kept in small
+JSON files under RUNNER_TEMP, read and written under an exclusive ``flock``.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+def state_dir() -> Path:
+    """Directory for shared state files.
+
+    Priority: DOKPLOY_STATE_DIR > RUNNER_TEMP > system temp dir
+    """
+    return Path(
+        os.environ.get("DOKPLOY_STATE_DIR")
+        or os.environ.get("RUNNER_TEMP")
+        or tempfile.gettempdir()
+    )
+
+
+class SharedState:
+    """JSON document guarded by a lock file (``<path>.lock``).
+
+    Usage:
+        shared = SharedState(state_dir() / "example.json")
+        with shared.locked() as state:
+            state["count"] = state.get("count", 0) + 1
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @contextmanager
+    def locked(self) -> Iterator[dict[str, Any]]:
+        """Load the state under an exclusive lock and write it back on exit.
+
+        A missing or corrupt file yields an empty dict. If the block raises,
+        nothing is written.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                state = self._load()
+                yield state
+                self._save(state)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            state = json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save(self, state: dict[str, Any]) -> None:
+        """Atomically replace the state file."""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.path)
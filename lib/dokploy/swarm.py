@@ -0,0 +1,598 @@
+"""Docker Swarm access over one multiplexed SSH connection.
+
+Workflows used to open a fresh ``tailscale ssh`` session for every docker
+command. SwarmClient instead runs commands through a CommandRunner:
+
+- SSHRunner: OpenSSH with ControlMaster, so the first command opens one
+  master connection and every later command reuses it.
+- LocalRunner: runs commands in a local shell (on the manager itself, or
+  against a fake ``docker`` script in tests).
+
+Several docker commands can be sent in one exec with run_batch(), and all
+list commands use ``--format '{{json .}}'`` so output parses into typed
+objects instead of being scraped with grep/cut.
+"""
+
+import json
+import re
+import shlex
+import subprocess
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from .constants import (
+    DEFAULT_SSH_PORT,
+    DEFAULT_SSH_USER,
+    SSH_COMMAND_TIMEOUT,
+    SSH_CONNECT_TIMEOUT,
+    SSH_CONTROL_PERSIST,
+)
+from .state import state_dir
+
+JSON_FORMAT = "'{{json .}}'"
+
+# OpenSSH exits with 255 when the connection itself failed
+SSH_CONNECTION_ERROR = 255
+
+# Swarm task containers are named <service>.<slot or node id>.<task id>
+TASK_CONTAINER_NAME = re.compile(r"^(?P<service>.+)\.(?:\d+|[a-z0-9]{25})\.[a-z0-9]{25}$")
+
+# docker stats sizes ("6.02MiB", "1.2GB", "512B")
+SIZE_UNITS = {
+    "b": 1,
+    "kb": 1000,
+    "kib": 1024,
+    "mb": 1000**2,
+    "mib": 1024**2,
+    "gb": 1000**3,
+    "gib": 1024**3,
+    "tb": 1000**4,
+    "tib": 1024**4,
+}
+
+
+class SwarmError(Exception):
+    """A Swarm command could not be run or returned unusable output."""
+
+    def __init__(self, message: str, result: "CommandResult | None" = None):
+        super().__init__(message)
+        self.result = result
+
+
+# =============================================================================
+# Command runners
+# =============================================================================
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one shell command."""
+
+    command: str
+    stdout: str
+    stderr: str = ""
+    returncode: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def lines(self) -> list[str]:
+        """Non-empty stdout lines."""
+        return [line for line in self.stdout.splitlines() if line.strip()]
+
+
+class CommandRunner(Protocol):
+    """Anything that can run a shell command string and capture its output."""
+
+    def run(self, command: str, timeout: float | None = None) -> CommandResult: ...
+
+    def popen(self, command: str) -> subprocess.Popen: ...
+
+    def close(self) -> None: ...
+
+
+class LocalRunner:
+    """Run commands with the local ``bash``."""
+
+    def __init__(self, env: dict[str, str] | None = None):
+        self.env = env
+
+    def run(self, command: str, timeout: float | None = SSH_COMMAND_TIMEOUT) -> CommandResult:
+        proc = subprocess.run(
+            ["bash", "-c", command],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=self.env,
+        )
+        return CommandResult(command, proc.stdout, proc.stderr, proc.returncode)
+
+    def popen(self, command: str) -> subprocess.Popen:
+        """Start a long-running command with line-buffered text stdout."""
+        return subprocess.Popen(
+            ["bash", "-c", command],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class SSHRunner:
+    """Run commands on a remote host over a multiplexed OpenSSH connection.
+
+    Works with Tailscale SSH hosts (plain ``ssh`` to the tailnet name or IP).
+    The control socket lives under RUNNER_TEMP and the master exits after
+    SSH_CONTROL_PERSIST idle seconds, or when close() is called.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str = DEFAULT_SSH_USER,
+        port: int = DEFAULT_SSH_PORT,
+        control_dir: str | Path | None = None,
+        connect_timeout: int = SSH_CONNECT_TIMEOUT,
+        persist: int = SSH_CONTROL_PERSIST,
+    ):
+        self.host = host
+        self.user = user
+        self.port = port
+        self.control_dir = Path(control_dir) if control_dir else state_dir()
+        self.connect_timeout = connect_timeout
+        self.persist = persist
+
+    @property
+    def _ssh_args(self) -> list[str]:
+        # %C is a hash of host/port/user - keeps the socket path short
+        control_path = self.control_dir / "ssh-mux-%C"
+        return [
+            "ssh",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={control_path}",
+            "-o", f"ControlPersist={self.persist}",
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "UserKnownHostsFile=/dev/null",
+            "-o", "LogLevel=ERROR",
+            "-o", "BatchMode=yes",
+            "-o", f"ConnectTimeout={self.connect_timeout}",
+            "-p", str(self.port),
+            f"{self.user}@{self.host}",
+        ]  # fmt: skip
+
+    def run(self, command: str, timeout: float | None = SSH_COMMAND_TIMEOUT) -> CommandResult:
+        proc = subprocess.run(
+            [*self._ssh_args, command],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        return CommandResult(command, proc.stdout, proc.stderr, proc.returncode)
+
+    def popen(self, command: str) -> subprocess.Popen:
+        """Start a long-running remote command (e.g., ``docker events``) on the shared connection."""
+        return subprocess.Popen(
+            [*self._ssh_args, command],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+
+    def close(self) -> None:
+        """Stop the master connection (no-op if none is running)."""
+        subprocess.run(
+            [*self._ssh_args[:-1], "-O", "exit", self._ssh_args[-1]],
+            capture_output=True,
+            timeout=self.connect_timeout,
+        )
+
+
+# =============================================================================
+# Typed Swarm objects
+# =============================================================================
+
+
+def parse_replicas(value: str) -> tuple[int, int]:
+    """Parse ``docker service ls`` replicas ("2/3" or "1/1 (max 1 per node)")."""
+    running, _, desired = value.split(" ", 1)[0].partition("/")
+    try:
+        return int(running), int(desired)
+    except ValueError:
+        return 0, 0
+
+
+@dataclass
+class SwarmNode:
+    """One row of ``docker node ls``."""
+
+    id: str
+    hostname: str
+    status: str
+    availability: str
+    manager_status: str = ""
+    engine_version: str = ""
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "Ready"
+
+    @property
+    def is_manager(self) -> bool:
+        return self.manager_status in ("Leader", "Reachable")
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "SwarmNode":
+        return cls(
+            id=data.get("ID", ""),
+            hostname=data.get("Hostname", ""),
+            status=data.get("Status", ""),
+            availability=data.get("Availability", ""),
+            manager_status=data.get("ManagerStatus", ""),
+            engine_version=data.get("EngineVersion", ""),
+        )
+
+
+@dataclass
+class SwarmService:
+    """One row of ``docker service ls``."""
+
+    id: str
+    name: str
+    mode: str
+    running: int
+    desired: int
+    image: str
+
+    @property
+    def healthy(self) -> bool:
+        return self.desired > 0 and self.running >= self.desired
+
+    @property
+    def replicas(self) -> str:
+        return f"{self.running}/{self.desired}"
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "SwarmService":
+        running, desired = parse_replicas(data.get("Replicas", ""))
+        return cls(
+            id=data.get("ID", ""),
+            name=data.get("Name", ""),
+            mode=data.get("Mode", ""),
+            running=running,
+            desired=desired,
+            image=data.get("Image", ""),
+        )
+
+
+@dataclass
+class ServiceDetail:
+    """Relevant fields of one ``docker service inspect`` entry."""
+
+    id: str
+    name: str
+    image: str
+    previous_image: str = ""
+    update_state: str = ""
+    update_message: str = ""
+    labels: dict[str, str] = field(default_factory=dict)
+    raw: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ServiceDetail":
+        spec = data.get("Spec", {})
+        previous = data.get("PreviousSpec") or {}
+        update = data.get("UpdateStatus") or {}
+        return cls(
+            id=data.get("ID", ""),
+            name=spec.get("Name", ""),
+            image=spec.get("TaskTemplate", {}).get("ContainerSpec", {}).get("Image", ""),
+            previous_image=previous.get("TaskTemplate", {}).get("ContainerSpec", {}).get("Image", ""),
+            update_state=update.get("State", ""),
+            update_message=update.get("Message", ""),
+            labels=spec.get("Labels") or {},
+            raw=data,
+        )
+
+
+@dataclass
+class ContainerStatus:
+    """One row of ``docker ps``."""
+
+    id: str
+    name: str
+    image: str
+    state: str
+    status: str
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ContainerStatus":
+        return cls(
+            id=data.get("ID", ""),
+            name=data.get("Names", ""),
+            image=data.get("Image", ""),
+            state=data.get("State", ""),
+            status=data.get("Status", ""),
+        )
+
+
+def parse_size(value: str) -> int:
+    """Bytes in a docker size string ("6.02MiB", "1.2GB"); 0 if unparseable."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]+)\s*", value)
+    if not match or match.group(2).lower() not in SIZE_UNITS:
+        return 0
+    try:
+        return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+    except ValueError:
+        return 0
+
+
+@dataclass
+class ContainerStats:
+    """One row of ``docker stats --no-stream``."""
+
+    id: str
+    name: str
+    cpu: float  # cores (docker reports 100% per core)
+    memory: int  # bytes in use
+    memory_limit: int
+
+    @property
+    def service(self) -> str:
+        """Swarm service of a task container ("" for plain containers)."""
+        match = TASK_CONTAINER_NAME.match(self.name)
+        return match.group("service") if match else ""
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ContainerStats":
+        used, _, limit = data.get("MemUsage", "").partition("/")
+        try:
+            cpu = float(data.get("CPUPerc", "0").rstrip("%") or 0) / 100
+        except ValueError:
+            cpu = 0.0
+        return cls(
+            id=data.get("ID", "") or data.get("Container", ""),
+            name=data.get("Name", ""),
+            cpu=cpu,
+            memory=parse_size(used),
+            memory_limit=parse_size(limit),
+        )
+
+
+def parse_json_lines(result: CommandResult) -> list[dict[str, Any]]:
+    """Parse ``--format '{{json .}}'`` output (one object per line)."""
+    try:
+        return [json.loads(line) for line in result.lines()]
+    except ValueError as e:
+        raise SwarmError(f"Unexpected output from: {result.command}", result) from e
+
+
+# =============================================================================
+# Swarm client
+# =============================================================================
+
+
+class SwarmClient:
+    """Typed access to a Swarm manager through a single CommandRunner.
+
+    Usage:
+        with SwarmClient.over_ssh("admin-dokploy") as swarm:
+            nodes, services = swarm.nodes(), swarm.services()
+
+            # One exec for several commands
+            results = swarm.run_batch(["docker node ls", "docker service ls"])
+
+        # In tests
+        swarm = SwarmClient(LocalRunner(env={"PATH": "/path/to/fake-docker"}))
+    """
+
+    def __init__(self, runner: CommandRunner):
+        self.runner = runner
+
+    @classmethod
+    def over_ssh(cls, host: str, user: str = DEFAULT_SSH_USER) -> "SwarmClient":
+        """Create client for a manager reachable over (Tailscale) SSH."""
+        return cls(SSHRunner(host, user=user))
+
+    def __enter__(self) -> "SwarmClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.runner.close()
+
+    def connect(self) -> None:
+        """Open the connection up front so concurrent commands all share it.
+
+        Raises:
+            SwarmError: If the manager is unreachable
+        """
+        self.run("true")
+
+    # =========================================================================
+    # Command execution
+    # =========================================================================
+
+    def run(self, command: str, check: bool = True) -> CommandResult:
+        """Run one command.
+
+        Raises:
+            SwarmError: If the connection failed, or the command failed and check=True
+        """
+        result = self.runner.run(command)
+        if result.returncode == SSH_CONNECTION_ERROR:
+            raise SwarmError(f"Connection failed: {result.stderr.strip()}", result)
+        if check and not result.ok:
+            raise SwarmError(f"Command failed ({result.returncode}): {command}: {result.stderr.strip()}", result)
+        return result
+
+    def run_batch(self, commands: list[str]) -> list[CommandResult]:
+        """Run several commands in one exec and split their outputs.
+
+        Each command's stdout, stderr and exit code are captured separately;
+        one failing command does not stop the others.
+
+        Raises:
+            SwarmError: If the connection failed or the output could not be split
+        """
+        marker = f"__SWARM_{uuid.uuid4().hex}__"
+        script = ['_err=$(mktemp)']
+        for i, command in enumerate(commands):
+            script += [
+                f"printf '%s\\n' '{marker}:out:{i}'",
+                f"{{ {command} ; }} 2>\"$_err\"",
+                "_rc=$?",
+                f"printf '\\n%s\\n' '{marker}:err:{i}'",
+                'cat "$_err"',
+                f"printf '\\n%s\\n' \"{marker}:end:{i}:$_rc\"",
+            ]
+        script.append('rm -f "$_err"')
+
+        combined = self.run("\n".join(script), check=False)
+        results = self._split_batch(commands, combined, marker)
+        if len(results) != len(commands):
+            raise SwarmError(f"Batch output incomplete ({len(results)}/{len(commands)} commands)", combined)
+        return results
+
+    @staticmethod
+    def _split_batch(commands: list[str], combined: CommandResult, marker: str) -> list[CommandResult]:
+        results: list[CommandResult] = []
+        section: list[str] = []
+        stdout = ""
+        for line in combined.stdout.split("\n"):
+            if not line.startswith(marker):
+                section.append(line)
+                continue
+            kind, _, rest = line[len(marker) + 1 :].partition(":")
+            # printf adds one newline before each marker - drop it
+            text = "\n".join(section).removesuffix("\n")
+            section = []
+            if kind == "err":
+                stdout = text
+            elif kind == "end":
+                index, _, code = rest.partition(":")
+                results.append(CommandResult(commands[int(index)], stdout, text, int(code)))
+        return results
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    @staticmethod
+    def nodes_command() -> str:
+        return f"docker node ls --format {JSON_FORMAT}"
+
+    @staticmethod
+    def services_command(name_filter: str = "") -> str:
+        name_arg = f" --filter name={shlex.quote(name_filter)}" if name_filter else ""
+        return f"docker service ls{name_arg} --format {JSON_FORMAT}"
+
+    @staticmethod
+    def inspect_command(names: list[str]) -> str:
+        return "docker service inspect " + " ".join(shlex.quote(n) for n in names)
+
+    @staticmethod
+    def containers_command(name_filter: str = "") -> str:
+        name_arg = f" --filter name={shlex.quote(name_filter)}" if name_filter else ""
+        return f"docker ps -a{name_arg} --format {JSON_FORMAT}"
+
+    @staticmethod
+    def stats_command() -> str:
+        return f"docker stats --no-stream --format {JSON_FORMAT}"
+
+    @staticmethod
+    def parse_nodes(result: CommandResult) -> list[SwarmNode]:
+        return [SwarmNode.from_json(row) for row in parse_json_lines(result)]
+
+    @staticmethod
+    def parse_services(result: CommandResult) -> list[SwarmService]:
+        return [SwarmService.from_json(row) for row in parse_json_lines(result)]
+
+    @staticmethod
+    def parse_inspect(result: CommandResult) -> dict[str, ServiceDetail]:
+        """Parse multi-service inspect output, keyed by service name.
+
+        Docker still prints the found services when some names are missing
+        (and exits non-zero), so missing services are simply absent.
+        """
+        if not result.stdout.strip():
+            return {}
+        try:
+            entries = json.loads(result.stdout)
+        except ValueError as e:
+            raise SwarmError(f"Unexpected output from: {result.command}", result) from e
+        details = [ServiceDetail.from_json(entry) for entry in entries]
+        return {detail.name: detail for detail in details}
+
+    @staticmethod
+    def parse_containers(result: CommandResult) -> list[ContainerStatus]:
+        return [ContainerStatus.from_json(row) for row in parse_json_lines(result)]
+
+    @staticmethod
+    def parse_stats(result: CommandResult) -> list[ContainerStats]:
+        return [ContainerStats.from_json(row) for row in parse_json_lines(result)]
+
+    def nodes(self) -> list[SwarmNode]:
+        """List Swarm nodes."""
+        return self.parse_nodes(self.run(self.nodes_command()))
+
+    def services(self, name_filter: str = "") -> list[SwarmService]:
+        """List Swarm services, optionally filtered by name."""
+        return self.parse_services(self.run(self.services_command(name_filter)))
+
+    def inspect_services(self, names: list[str]) -> dict[str, ServiceDetail]:
+        """Inspect several services in one command."""
+        if not names:
+            return {}
+        return self.parse_inspect(self.run(self.inspect_command(names), check=False))
+
+    def containers(self, name_filter: str = "") -> list[ContainerStatus]:
+        """List containers on the manager, optionally filtered by name."""
+        return self.parse_containers(self.run(self.containers_command(name_filter)))
+
+    def stats(self) -> list[ContainerStats]:
+        """CPU and memory usage of the running containers on this host (one sample)."""
+        return self.parse_stats(self.run(self.stats_command()))
+
+    def service_state(self, names: list[str]) -> tuple[dict[str, ServiceDetail], list[SwarmService]]:
+        """Inspect services and list their replica counts in one exec."""
+        inspect, listing = self.run_batch(
+            [self.inspect_command(names), self.services_command()]
+        )
+        wanted = set(names)
+        services = [s for s in self.parse_services(listing) if s.name in wanted]
+        return self.parse_inspect(inspect), services
+
+    # =========================================================================
+    # Mutations
+    # =========================================================================
+
+    def node_labels(self, node: str) -> dict[str, str]:
+        """Labels of one node (empty if it has none)."""
+        result = self.run(f"docker node inspect {shlex.quote(node)} --format '{{{{json .Spec.Labels}}}}'")
+        try:
+            return json.loads(result.stdout) or {}
+        except ValueError as e:
+            raise SwarmError(f"Unexpected output from: {result.command}", result) from e
+
+    def add_node_label(self, node: str, key: str, value: str) -> CommandResult:
+        """Add or replace a node label (used by placement constraints)."""
+        label = shlex.quote(f"{key}={value}")
+        return self.run(f"docker node update --label-add {label} {shlex.quote(node)}")
+
+    def rollback(self, name: str) -> CommandResult:
+        """Start a rollback to the service's previous spec without waiting for it."""
+        return self.run(f"docker service update --rollback --detach {shlex.quote(name)}")
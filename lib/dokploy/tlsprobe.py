@@ -0,0 +1,417 @@
+"""Concurrent TLS certificate probes and certificate-based SSL strategy.
+
+ssl-strategy used to pick wildcard / auto-cert / http-only purely from the
+shape of the domain, without ever looking at what is served. TLSProbe does
+a real TLS handshake (with SNI) against each host, concurrently and with a
+per-host timeout, and records what came back: SAN coverage of the host,
+issuer, expiry and whether the chain is trusted. Results are cached per
+host in a runner-wide state file, so ssl-check, ssl-strategy and the fleet
+probe of the same job share one handshake per host.
+
+    states = TLSProbe().probe(["example.com", "dev.example.com"])
+    strategy = ssl_strategy("dev.example.com", states["dev.example.com"])
+    print(tls_report(states.values()).to_markdown())
+
+Certificates that fail verification are re-read without verification so
+their SANs, issuer and expiry can still be reported; decoding them needs
+the optional ``cryptography`` package (without it only the error is kept).
+"""
+
+import socket
+import ssl
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from datetime import timezone
+from pathlib import Path
+from typing import Any
+
+from .constants import TLS_CACHE_TTL, TLS_PROBE_TIMEOUT
+from .domain import get_root_domain, is_preview_domain
+from .probe import STATUS_FAIL, STATUS_OK, STATUS_WARN, InfraProbe, Outcome, ProbeReport, ProbeResult
+from .state import SharedState, state_dir
+
+try:
+    from cryptography import x509
+except ImportError:  # pragma: no cover - optional dependency
+    x509 = None
+
+TLS_PORT = 443
+TLS_MAX_WORKERS = 16
+TLS_CACHE_FILE = "tls-probe.json"
+
+# Days before expiry at which a certificate is reported as warn / fail
+TLS_EXPIRY_WARN_DAYS = 14
+TLS_EXPIRY_CRITICAL_DAYS = 3
+
+GROUP_TLS = "tls"
+
+SSL_WILDCARD = "wildcard"
+SSL_NEW_WILDCARD = "new_wildcard"
+SSL_HTTP_ONLY = "http_only"
+SSL_AUTO_CERT = "auto_cert"
+
+SOURCE_CERTIFICATE = "certificate"
+SOURCE_DOMAIN = "domain"
+
+# Labels above which a host is a sub-subdomain no *.root wildcard can cover
+WILDCARD_MAX_LABELS = 3
+
+
+@dataclass
+class CertificateState:
+    """What a host served on its TLS port."""
+
+    host: str
+    port: int = TLS_PORT
+    reachable: bool = False  # TCP connect and TLS handshake completed
+    trusted: bool = False  # chain verified against the system CA store
+    covers: bool = False  # a SAN (or the CN) matches the host
+    wildcard: bool = False  # ... and the match is a wildcard SAN
+    subject: str = ""
+    issuer: str = ""
+    sans: list[str] = field(default_factory=list)
+    not_after: float | None = None  # epoch seconds
+    error: str = ""
+    latency: float = 0.0
+    probed_at: float = 0.0
+    cached: bool = False
+
+    @property
+    def days_left(self) -> float | None:
+        if self.not_after is None:
+            return None
+        return (self.not_after - time.time()) / 86400
+
+    @property
+    def valid(self) -> bool:
+        """Trusted, covers the host and not expired."""
+        days_left = self.days_left
+        return self.reachable and self.trusted and self.covers and days_left is not None and days_left > 0
+
+    @property
+    def status(self) -> str:
+        """ok, warn (expires within TLS_EXPIRY_WARN_DAYS) or fail."""
+        if not self.valid:
+            return STATUS_FAIL
+        if self.days_left < TLS_EXPIRY_CRITICAL_DAYS:
+            return STATUS_FAIL
+        if self.days_left < TLS_EXPIRY_WARN_DAYS:
+            return STATUS_WARN
+        return STATUS_OK
+
+    @property
+    def problem(self) -> str:
+        """Why the certificate is not valid for the host (empty if it is)."""
+        if self.error:
+            return self.error
+        if not self.covers:
+            return f"does not cover {self.host} (SANs: {', '.join(self.sans) or 'none'})"
+        if self.days_left is not None and self.days_left <= 0:
+            return f"expired {-self.days_left:.0f} days ago"
+        return ""
+
+    def describe(self) -> str:
+        """One-line summary for logs and reports."""
+        if not self.reachable or (not self.sans and not self.issuer):
+            return self.problem or "no certificate"
+        parts = [f"issuer {self.issuer or 'unknown'}"]
+        if self.days_left is not None:
+            parts.append(f"expires in {self.days_left:.0f} days")
+        if self.problem:
+            parts.append(self.problem)
+        elif self.wildcard:
+            parts.append("wildcard")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CertificateState":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+# =============================================================================
+# Certificates
+# =============================================================================
+
+
+def host_matches(host: str, pattern: str) -> bool:
+    """RFC 6125 matching: a wildcard only stands for the single leftmost label."""
+    host = host.lower().rstrip(".")
+    pattern = pattern.lower().rstrip(".")
+    if not pattern.startswith("*."):
+        return host == pattern
+    label, _, rest = host.partition(".")
+    return bool(label) and rest == pattern[2:]
+
+
+def _name(rdns: Iterable[Any]) -> str:
+    """CN (or O) of a getpeercert() subject/issuer."""
+    attributes = dict(attribute for rdn in rdns for attribute in rdn)
+    return attributes.get("commonName") or attributes.get("organizationName") or ""
+
+
+def _apply_coverage(state: CertificateState) -> None:
+    match = next((san for san in state.sans if host_matches(state.host, san)), None)
+    state.covers = match is not None
+    state.wildcard = bool(match and match.startswith("*."))
+
+
+def _from_peercert(state: CertificateState, cert: dict[str, Any]) -> None:
+    state.subject = _name(cert.get("subject", ()))
+    state.issuer = _name(cert.get("issuer", ()))
+    state.sans = [value for kind, value in cert.get("subjectAltName", ()) if kind == "DNS"]
+    if not state.sans and state.subject:
+        state.sans = [state.subject]
+    if cert.get("notAfter"):
+        state.not_after = float(ssl.cert_time_to_seconds(cert["notAfter"]))
+
+
+def _from_der(state: CertificateState, der: bytes) -> None:
+    """Fill details from an unverified DER certificate (needs cryptography)."""
+    if x509 is None or not der:
+        return
+    cert = x509.load_der_x509_certificate(der)
+
+    def common_name(name: Any) -> str:
+        attributes = name.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
+        return str(attributes[0].value) if attributes else name.rfc4514_string()
+
+    state.subject = common_name(cert.subject)
+    state.issuer = common_name(cert.issuer)
+    try:
+        extension = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+        state.sans = extension.value.get_values_for_type(x509.DNSName)
+    except x509.ExtensionNotFound:
+        state.sans = [state.subject] if state.subject else []
+    not_after = getattr(cert, "not_valid_after_utc", None) or cert.not_valid_after
+    if not_after.tzinfo is None:
+        not_after = not_after.replace(tzinfo=timezone.utc)
+    state.not_after = not_after.timestamp()
+
+
+def _handshake(host: str, port: int, timeout: float, verify: bool) -> tuple[dict[str, Any], bytes]:
+    """TLS handshake with SNI; returns (parsed cert or {}, DER bytes)."""
+    context = ssl.create_default_context()
+    # Coverage is checked against the SANs ourselves, so a mismatch is reported, not raised
+    context.check_hostname = False
+    if not verify:
+        context.verify_mode = ssl.CERT_NONE
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls:
+            return tls.getpeercert() or {}, tls.getpeercert(binary_form=True) or b""
+
+
+def probe_certificate(host: str, port: int = TLS_PORT, timeout: float = TLS_PROBE_TIMEOUT) -> CertificateState:
+    """Handshake with the host and record the certificate it serves. Never raises."""
+    state = CertificateState(host=host.lower().rstrip("."), port=port, probed_at=time.time())
+    started = time.monotonic()
+    try:
+        cert, _ = _handshake(state.host, port, timeout, verify=True)
+        state.reachable = True
+        state.trusted = True
+        _from_peercert(state, cert)
+    except ssl.SSLCertVerificationError as e:
+        state.error = f"untrusted certificate: {e.verify_message or e.reason}"
+        try:
+            _, der = _handshake(state.host, port, timeout, verify=False)
+            state.reachable = True
+            _from_der(state, der)
+        except (OSError, ValueError) as retry_error:
+            state.error = f"{state.error} ({retry_error})"
+    except ssl.SSLError as e:
+        state.error = f"TLS handshake failed: {e.reason or e}"
+    except OSError as e:
+        state.error = f"unreachable: {e.strerror or e}"
+    state.latency = time.monotonic() - started
+    _apply_coverage(state)
+    return state
+
+
+# =============================================================================
+# Fleet probe
+# =============================================================================
+
+
+class TLSProbe:
+    """Probe many hosts at once, reusing recent results from the runner-wide cache.
+
+    Usage:
+        probe = TLSProbe(timeout=5)
+        states = probe.probe(["example.com", "dev.example.com"])
+        expiring = [s for s in states.values() if s.status != "ok"]
+    """
+
+    def __init__(
+        self,
+        timeout: float = TLS_PROBE_TIMEOUT,
+        max_workers: int = TLS_MAX_WORKERS,
+        cache_ttl: float = TLS_CACHE_TTL,
+        cache_path: str | Path | None = None,
+    ):
+        """Initialize probe.
+
+        Args:
+            timeout: Connect + handshake timeout per host in seconds
+            max_workers: Maximum handshakes in flight
+            cache_ttl: Seconds a probed certificate is reused (0 disables the cache)
+            cache_path: Cache file (default: TLS_CACHE_FILE in the state dir)
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.cache = SharedState(cache_path or state_dir() / TLS_CACHE_FILE) if cache_ttl > 0 else None
+
+    def probe(self, hosts: Iterable[str], port: int = TLS_PORT, refresh: bool = False) -> dict[str, CertificateState]:
+        """Certificate state per host (in input order, duplicates probed once).
+
+        Args:
+            hosts: Hostnames to probe
+            port: TLS port
+            refresh: Ignore cached results
+        """
+        names = list(dict.fromkeys(h.strip().lower().rstrip(".") for h in hosts if h.strip()))
+        states: dict[str, CertificateState] = {}
+
+        if self.cache and not refresh:
+            # Read under the lock, but don't hold it across handshakes
+            with self.cache.locked() as cache:
+                cutoff = time.time() - self.cache_ttl
+                for name in names:
+                    entry = cache.get(f"{name}:{port}")
+                    if entry and entry.get("probed_at", 0) >= cutoff:
+                        states[name] = CertificateState.from_dict({**entry, "cached": True})
+
+        missing = [name for name in names if name not in states]
+        if missing:
+            workers = max(1, min(self.max_workers, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tls-probe") as executor:
+                probed = list(executor.map(lambda name: probe_certificate(name, port, self.timeout), missing))
+            states.update(zip(missing, probed))
+
+            if self.cache:
+                with self.cache.locked() as cache:
+                    cutoff = time.time() - self.cache_ttl
+                    for key in [k for k, v in cache.items() if v.get("probed_at", 0) < cutoff]:
+                        del cache[key]
+                    for state in probed:
+                        cache[f"{state.host}:{port}"] = state.to_dict()
+
+        return {name: states[name] for name in names}
+
+
+def _report_data(state: CertificateState) -> dict[str, Any]:
+    return {
+        "issuer": state.issuer,
+        "sans": state.sans,
+        "days_left": None if state.days_left is None else round(state.days_left, 1),
+        "trusted": state.trusted,
+        "covers": state.covers,
+        "cached": state.cached,
+    }
+
+
+def tls_report(states: Iterable[CertificateState], budget: float = TLS_PROBE_TIMEOUT) -> ProbeReport:
+    """Render probe results as a ProbeReport (JSON / markdown like the infra probe)."""
+    states = list(states)
+    results = [
+        ProbeResult(
+            name=state.host,
+            group=GROUP_TLS,
+            status=state.status,
+            latency=state.latency,
+            detail=state.describe(),
+            data=_report_data(state),
+        )
+        for state in states
+    ]
+    elapsed = max((state.latency for state in states if not state.cached), default=0.0)
+    return ProbeReport(results, elapsed, budget)
+
+
+def add_tls_checks(probe: InfraProbe, hosts: Iterable[str], tls: TLSProbe | None = None) -> None:
+    """Register one certificate check per host, sharing the probe's pool and budget."""
+    tls = tls or TLSProbe(timeout=min(TLS_PROBE_TIMEOUT, probe.budget))
+
+    def check(host: str) -> Outcome:
+        state = tls.probe([host])[host]
+        return Outcome(state.status, state.describe(), data=_report_data(state))
+
+    for host in dict.fromkeys(h.strip().lower().rstrip(".") for h in hosts if h.strip()):
+        probe.add(host, lambda host=host: check(host), GROUP_TLS)
+
+
+# =============================================================================
+# SSL strategy
+# =============================================================================
+
+
+@dataclass
+class SSLStrategy:
+    """How a domain gets HTTPS (outputs of ssl-strategy)."""
+
+    ssl_type: str
+    root_domain: str
+    wildcard_domain: str
+    is_preview: bool = False
+    is_covered: bool = True
+    use_https: bool = True
+    source: str = SOURCE_DOMAIN  # certificate: decided from what is served
+    summary: str = ""
+    warnings: list[str] = field(default_factory=list)
+
+
+def ssl_strategy(domain: str, cert: CertificateState | None = None) -> SSLStrategy:
+    """Decide the SSL strategy from the served certificate, falling back to the domain shape.
+
+    - preview domains (pr-N.dev.*) stay HTTP-only (Let's Encrypt rate limits)
+    - a valid served certificate decides: wildcard SAN -> wildcard, exact SAN -> auto_cert
+    - otherwise sub-subdomains get a per-host cert (auto_cert); other hosts need
+      the *.root wildcard, which is new_wildcard when the probe showed it missing
+
+    Args:
+        domain: Full domain
+        cert: Probe result for the domain (None: decide from the domain shape only)
+    """
+    domain = domain.strip().lower()
+    root_domain = get_root_domain(domain)
+    strategy = SSLStrategy(SSL_WILDCARD, root_domain, f"*.{root_domain}")
+
+    if is_preview_domain(domain):
+        strategy.ssl_type = SSL_HTTP_ONLY
+        strategy.is_preview = True
+        strategy.is_covered = False
+        strategy.use_https = False
+        strategy.summary = f"Preview environment ({domain}) - using HTTP only"
+        strategy.warnings.append("Preview environment uses HTTP only to avoid Let's Encrypt rate limits")
+        return strategy
+
+    if cert is not None and cert.valid:
+        strategy.source = SOURCE_CERTIFICATE
+        strategy.ssl_type = SSL_WILDCARD if cert.wildcard else SSL_AUTO_CERT
+        match = "wildcard" if cert.wildcard else "per-host certificate"
+        strategy.summary = f"{domain} serves a valid {match} from {cert.issuer} ({cert.days_left:.0f} days left)"
+        if cert.status != STATUS_OK:
+            strategy.warnings.append(f"Certificate for {domain} expires in {cert.days_left:.0f} days")
+        return strategy
+
+    if cert is not None and cert.reachable:
+        strategy.source = SOURCE_CERTIFICATE
+        strategy.warnings.append(f"Served certificate for {domain}: {cert.problem}")
+
+    if domain.count(".") + 1 > WILDCARD_MAX_LABELS:
+        strategy.ssl_type = SSL_AUTO_CERT
+        strategy.is_covered = False
+        strategy.summary = f"Sub-subdomain ({domain}) - using per-host auto-cert"
+        strategy.warnings.append("Sub-subdomain not covered by wildcard certificate")
+    elif strategy.source == SOURCE_CERTIFICATE:
+        strategy.ssl_type = SSL_NEW_WILDCARD
+        strategy.is_covered = False
+        strategy.summary = f"{domain} is not served a valid certificate - issuing {strategy.wildcard_domain}"
+    else:
+        strategy.summary = f"{domain} - covered by {strategy.wildcard_domain}"
+    return strategy
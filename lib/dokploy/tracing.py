@@ -0,0 +1,473 @@
+"""Deploy timeline tracing across steps and jobs.
+
+app-deploy.yml spreads a deploy over several jobs of many steps, and the
+Actions UI only shows per-step durations of one run at a time. Spans give
+a timeline that can be compared across runs:
+
+- each job records a job span, and stage spans between marks placed in
+  the workflow (open_stage() closes the previous stage)
+- Python code records step spans with ``with span("sync-application"):``
+- bash steps record a span through the CLI (see main()), e.g. the image
+  build of docker-build-push
+- every span counts the API requests made through api_request() while it
+  was open
+
+Spans are appended as JSON lines to the file named by DOKPLOY_TRACE_FILE,
+one file per job, uploaded as an artifact when the job ends. A final job
+merges them and renders a waterfall for the step summary, a Prometheus
+textfile and an OTLP/JSON export. Without DOKPLOY_TRACE_FILE nothing is
+recorded, so untraced callers pay nothing.
+
+    with span("zone-reconcile", zone=zone_id) as current:
+        result = reconciler.reconcile(plan)
+        current.attributes["writes"] = result.writes
+"""
+
+import atexit
+import contextvars
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+from .state import SharedState
+
+TRACE_FILE_VAR = "DOKPLOY_TRACE_FILE"
+TRACE_SERVICE_NAME = "app-deploy"
+
+KIND_JOB = "job"
+KIND_STAGE = "stage"
+KIND_STEP = "step"
+
+# Same vocabulary as GitHub's job.status / steps.<id>.outcome
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"
+OUTCOME_CANCELLED = "cancelled"
+
+WATERFALL_WIDTH = 30
+
+# Run labels kept on Prometheus series (run_id would make every run a new series)
+PROMETHEUS_LABELS = ("repository", "workflow")
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+_api_lock = threading.Lock()
+_api_calls = 0  # made by this process
+_api_flushed = 0  # of which already added to the job total
+_flush_registered = False
+
+
+@dataclass
+class Span:
+    """One timed operation of a deploy."""
+
+    name: str
+    start: float  # epoch seconds
+    duration: float = 0.0
+    kind: str = KIND_STEP
+    outcome: str = OUTCOME_SUCCESS
+    job: str = ""
+    api_calls: int = 0
+    span_id: str = field(default_factory=lambda: os.urandom(8).hex())
+    parent_id: str = ""
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Span":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+
+def trace_file() -> Path | None:
+    """The job's span file, or None when tracing is off."""
+    path = os.environ.get(TRACE_FILE_VAR)
+    return Path(path) if path else None
+
+
+def _state() -> SharedState | None:
+    path = trace_file()
+    return SharedState(path.with_name(f"{path.name}.state.json")) if path else None
+
+
+def _open_span_id() -> str:
+    """ID of the job's open stage (or the job span): the parent of top-level step spans."""
+    state = _state()
+    if state is None:
+        return ""
+    with state.locked() as data:
+        return (data.get("stage") or data.get("job") or {}).get("span_id", "")
+
+
+def _job_name() -> str:
+    return os.environ.get("GITHUB_JOB", "")
+
+
+def _flush_api_calls() -> None:
+    """Add this process's uncounted API calls to the job total."""
+    global _api_flushed
+    state = _state()
+    with _api_lock:
+        pending = _api_calls - _api_flushed
+        _api_flushed = _api_calls
+    if state and pending:
+        with state.locked() as data:
+            data["api_calls"] = data.get("api_calls", 0) + pending
+
+
+def count_api_call() -> None:
+    """Called by api_request() for every request (no-op when tracing is off)."""
+    global _api_calls, _flush_registered
+    if trace_file() is None:
+        return
+    with _api_lock:
+        _api_calls += 1
+        if not _flush_registered:
+            _flush_registered = True
+            atexit.register(_flush_api_calls)
+
+
+def process_api_calls() -> int:
+    """API calls made by this process so far."""
+    return _api_calls
+
+
+def job_api_calls() -> int:
+    """API calls made by all steps of the job so far."""
+    _flush_api_calls()
+    state = _state()
+    if state is None:
+        return _api_calls
+    with state.locked() as data:
+        return data.get("api_calls", 0)
+
+
+def record(span_: Span) -> None:
+    """Append a span to the job's trace file (no-op when tracing is off)."""
+    path = trace_file()
+    if path is None:
+        return
+    if not span_.job:
+        span_.job = _job_name()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(span_.to_dict(), default=str) + "\n"
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(line)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def span(name: str, kind: str = KIND_STEP, **attributes: Any) -> Iterator[Span]:
+    """Time the block as a span; an exception escaping it marks the span failed.
+
+    Spans nest: a span opened inside another one records it as its parent.
+    """
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        start=time.time(),
+        kind=kind,
+        parent_id=parent.span_id if parent else _open_span_id(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    calls_before = _api_calls
+    started = time.monotonic()
+    try:
+        yield current
+    except BaseException as e:
+        # sys.exit(0) inside a step is not a failure
+        if not (isinstance(e, SystemExit) and not e.code):
+            current.outcome = OUTCOME_FAILURE
+        raise
+    finally:
+        _current_span.reset(token)
+        current.duration = time.monotonic() - started
+        current.api_calls = _api_calls - calls_before
+        record(current)
+
+
+# =============================================================================
+# Jobs and stages (state kept between the steps of a job)
+# =============================================================================
+
+
+def start_job(name: str = "", **attributes: Any) -> None:
+    """Open the job span (first traced step of the job)."""
+    state = _state()
+    if state is None:
+        return
+    with state.locked() as data:
+        data["job"] = {
+            "name": name or _job_name(),
+            "start": time.time(),
+            "span_id": os.urandom(8).hex(),
+            "attributes": attributes,
+        }
+        data.pop("stage", None)
+
+
+def close_stage(outcome: str = OUTCOME_SUCCESS) -> Span | None:
+    """Record the open stage, if any."""
+    state = _state()
+    if state is None:
+        return None
+    calls = job_api_calls()
+    with state.locked() as data:
+        stage = data.pop("stage", None)
+        job = data.get("job") or {}
+    if not stage:
+        return None
+    closed = Span(
+        name=stage["name"],
+        start=stage["start"],
+        duration=time.time() - stage["start"],
+        kind=KIND_STAGE,
+        outcome=outcome,
+        api_calls=calls - stage.get("api_calls", 0),
+        span_id=stage["span_id"],
+        parent_id=job.get("span_id", ""),
+    )
+    record(closed)
+    return closed
+
+
+def open_stage(name: str, previous_outcome: str = OUTCOME_SUCCESS) -> Span | None:
+    """Start a stage, closing the previous one. Returns the closed stage."""
+    closed = close_stage(previous_outcome)
+    state = _state()
+    if state is not None:
+        calls = job_api_calls()
+        with state.locked() as data:
+            data["stage"] = {"name": name, "start": time.time(), "api_calls": calls, "span_id": os.urandom(8).hex()}
+    return closed
+
+
+def finish_job(outcome: str = OUTCOME_SUCCESS) -> Span | None:
+    """Close the open stage and record the job span (last step of the job, if: always())."""
+    state = _state()
+    if state is None:
+        return None
+    close_stage(outcome)
+    calls = job_api_calls()
+    with state.locked() as data:
+        job = data.pop("job", None)
+    if not job:
+        return None
+    finished = Span(
+        name=job["name"],
+        start=job["start"],
+        duration=time.time() - job["start"],
+        kind=KIND_JOB,
+        outcome=outcome,
+        api_calls=calls,
+        span_id=job["span_id"],
+        attributes=job.get("attributes", {}),
+    )
+    record(finished)
+    return finished
+
+
+# =============================================================================
+# Merging and export
+# =============================================================================
+
+
+def load_spans(paths: Iterable[str | Path]) -> list[Span]:
+    """Spans of several trace files, ordered by start time. Malformed lines are skipped."""
+    spans = []
+    for path in paths:
+        try:
+            lines = Path(path).read_text().splitlines()
+        except FileNotFoundError:
+            continue
+        for line in lines:
+            try:
+                spans.append(Span.from_dict(json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+    return sorted(spans, key=lambda s: (s.start, -s.duration))
+
+
+def _ordered(spans: list[Span]) -> list[tuple[int, Span]]:
+    """Spans depth-first under their parents, with their depth."""
+    ids = {s.span_id for s in spans}
+    children: dict[str, list[Span]] = {}
+    for s in spans:
+        children.setdefault(s.parent_id if s.parent_id in ids else "", []).append(s)
+
+    ordered: list[tuple[int, Span]] = []
+
+    def visit(parent_id: str, depth: int) -> None:
+        for child in children.get(parent_id, []):
+            ordered.append((depth, child))
+            visit(child.span_id, depth + 1)
+
+    visit("", 0)
+    return ordered
+
+
+def waterfall(spans: list[Span], width: int = WATERFALL_WIDTH) -> str:
+    """Markdown waterfall: one row per span, bars on a shared timeline."""
+    if not spans:
+        return "_No spans recorded_"
+    origin = min(s.start for s in spans)
+    total = max(s.end for s in spans) - origin or 1.0
+    lines = [
+        "| Span | Start | Duration | API calls | Timeline |",
+        "|------|------:|---------:|----------:|----------|",
+    ]
+    for depth, s in _ordered(spans):
+        offset = min(round((s.start - origin) / total * width), width - 1)
+        length = max(1, min(round(s.duration / total * width), width - offset))
+        bar = "·" * offset + "█" * length
+        label = f"**{s.name}**" if s.kind == KIND_JOB else f"{'  ' * depth}↳ {s.name}"
+        if s.outcome != OUTCOME_SUCCESS:
+            label += f" ({s.outcome})"
+        lines.append(
+            f"| {label} | +{s.start - origin:.0f}s | {s.duration:.1f}s | {s.api_calls or ''} | `{bar}` |"
+        )
+    lines.append("")
+    lines.append(f"_{len(spans)} spans over {total:.0f}s_")
+    return "\n".join(lines)
+
+
+def run_labels() -> dict[str, str]:
+    """Labels identifying the run (repository, workflow, run id)."""
+    return {
+        "repository": os.environ.get("GITHUB_REPOSITORY", ""),
+        "workflow": os.environ.get("GITHUB_WORKFLOW", ""),
+        "run_id": os.environ.get("GITHUB_RUN_ID", ""),
+    }
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_textfile(spans: list[Span], labels: dict[str, str] | None = None) -> str:
+    """node_exporter textfile: duration and API calls per span, plus the trace length."""
+    if labels is None:
+        labels = {k: v for k, v in run_labels().items() if k in PROMETHEUS_LABELS}
+    labels = {k: v for k, v in labels.items() if v}
+
+    def series(metric: str, s: Span | None, value: float) -> str:
+        values = dict(labels)
+        if s is not None:
+            values.update(job=s.job, kind=s.kind, name=s.name, outcome=s.outcome)
+        rendered = ",".join(f'{k}="{_label_value(v)}"' for k, v in values.items())
+        return f"{metric}{{{rendered}}} {value:g}"
+
+    lines = [
+        "# HELP deploy_span_duration_seconds Duration of a deploy job, stage or step",
+        "# TYPE deploy_span_duration_seconds gauge",
+        *(series("deploy_span_duration_seconds", s, round(s.duration, 3)) for s in spans),
+        "# HELP deploy_span_api_calls API requests made during a deploy job, stage or step",
+        "# TYPE deploy_span_api_calls gauge",
+        *(series("deploy_span_api_calls", s, s.api_calls) for s in spans),
+        "# HELP deploy_trace_duration_seconds Wall time from the first to the last span of the run",
+        "# TYPE deploy_trace_duration_seconds gauge",
+    ]
+    total = max(s.end for s in spans) - min(s.start for s in spans) if spans else 0
+    lines.append(series("deploy_trace_duration_seconds", None, round(total, 3)))
+    return "\n".join(lines) + "\n"
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_json(spans: list[Span], service_name: str = TRACE_SERVICE_NAME, labels: dict[str, str] | None = None) -> dict[str, Any]:
+    """OTLP/JSON (ExportTraceServiceRequest) with all spans under one trace per run."""
+    labels = run_labels() if labels is None else labels
+    run_key = f"{labels.get('repository', '')}/{labels.get('run_id', '')}/{os.environ.get('GITHUB_RUN_ATTEMPT', '1')}"
+    trace_id = hashlib.sha256(run_key.encode()).hexdigest()[:32]
+
+    def otlp_span(s: Span) -> dict[str, Any]:
+        attributes = {"deploy.kind": s.kind, "deploy.job": s.job, "deploy.api_calls": s.api_calls, **s.attributes}
+        return {
+            "traceId": trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int(s.end * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            # STATUS_CODE_OK / STATUS_CODE_ERROR
+            "status": {"code": 1 if s.outcome == OUTCOME_SUCCESS else 2, "message": s.outcome},
+        }
+
+    resource = {"service.name": service_name, **{f"github.{k}": v for k, v in labels.items() if v}}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": k, "value": _otlp_value(v)} for k, v in resource.items()]},
+                "scopeSpans": [{"scope": {"name": "lib.dokploy.tracing"}, "spans": [otlp_span(s) for s in spans]}],
+            }
+        ]
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Record a span from a bash step.
+
+        START=$(date +%s.%N)
+        ... work ...
+        python -c "from lib.dokploy.tracing import main; main()" --name docker-build --start "$START" --outcome success
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Append a span to the job's trace file")
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--start", type=float, required=True, help="epoch seconds (date +%%s.%%N)")
+    parser.add_argument("--end", type=float, default=None, help="epoch seconds (default: now)")
+    parser.add_argument("--outcome", default=OUTCOME_SUCCESS)
+    parser.add_argument("--api-calls", type=int, default=0)
+    parser.add_argument("--kind", default=KIND_STEP)
+    args = parser.parse_args(argv)
+
+    end = time.time() if args.end is None else args.end
+    record(
+        Span(
+            name=args.name,
+            start=args.start,
+            duration=max(0.0, end - args.start),
+            kind=args.kind,
+            outcome=args.outcome,
+            api_calls=args.api_calls,
+            parent_id=_open_span_id(),
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Adaptive waiting for readiness conditions.
+
+Fixed ``sleep $INTERVAL`` loops waste up to one full interval after the
+condition is already true. wait_until() polls with short early intervals
+that grow exponentially (with jitter) up to a cap, and never sleeps past
+the deadline. wait_all() watches several conditions concurrently under one
+shared deadline, so a host counts as ready as soon as its last condition
+holds.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from .constants import (
+    WAIT_BACKOFF_FACTOR,
+    WAIT_INITIAL_INTERVAL,
+    WAIT_JITTER,
+    WAIT_MAX_INTERVAL,
+)
+
+# check() returns a truthy value when ready; anything falsy means "not yet"
+Check = Callable[[], Any]
+
+# on_attempt(name, attempt, elapsed, error) - error is the exception raised by check, if any
+AttemptCallback = Callable[[str, int, float, Exception | None], None]
+
+
+class WaitTimeout(Exception):
+    """A condition did not become true before the deadline."""
+
+    def __init__(self, message: str, pending: list[str], last_errors: dict[str, Exception | None] | None = None):
+        super().__init__(message)
+        self.pending = pending
+        self.last_errors = last_errors or {}
+
+
+@dataclass
+class WaitResult:
+    """A condition that became true."""
+
+    name: str
+    value: Any
+    elapsed: float
+    attempts: int
+
+
+def backoff_delays(
+    initial: float = WAIT_INITIAL_INTERVAL,
+    max_interval: float = WAIT_MAX_INTERVAL,
+    factor: float = WAIT_BACKOFF_FACTOR,
+    jitter: float = WAIT_JITTER,
+) -> Iterator[float]:
+    """Yield exponentially growing delays, capped, each randomized by ±jitter."""
+    delay = initial
+    while True:
+        yield max(0.0, delay * random.uniform(1 - jitter, 1 + jitter))
+        delay = min(max_interval, delay * factor)
+
+
+def wait_until(
+    check: Check,
+    timeout: float,
+    name: str = "condition",
+    initial: float = WAIT_INITIAL_INTERVAL,
+    max_interval: float = WAIT_MAX_INTERVAL,
+    factor: float = WAIT_BACKOFF_FACTOR,
+    jitter: float = WAIT_JITTER,
+    fatal: tuple[type[Exception], ...] = (),
+    on_attempt: AttemptCallback | None = None,
+    deadline: float | None = None,
+    cancelled: threading.Event | None = None,
+) -> WaitResult:
+    """Poll check() until it returns a truthy value.
+
+    Exceptions raised by check() count as "not ready" (the last one is kept
+    for the timeout error) unless they are instances of ``fatal``, which
+    propagate immediately (e.g., authentication errors).
+
+    Args:
+        check: Returns a truthy value when the condition holds
+        timeout: Seconds to wait (ignored if deadline is given)
+        name: Condition name for messages and callbacks
+        initial: First delay between attempts
+        max_interval: Upper bound for the delay
+        factor: Delay growth factor
+        jitter: Relative randomization of each delay (0.2 = ±20%)
+        fatal: Exception types that abort the wait
+        on_attempt: Called after each unsuccessful attempt
+        deadline: Absolute time.monotonic() deadline (shared by wait_all)
+        cancelled: Stops waiting early when set (used by wait_all)
+
+    Returns:
+        WaitResult with the value returned by check()
+
+    Raises:
+        WaitTimeout: If the condition did not hold before the deadline
+    """
+    started = time.monotonic()
+    deadline = deadline if deadline is not None else started + timeout
+    delays = backoff_delays(initial, max_interval, factor, jitter)
+    last_error: Exception | None = None
+    attempt = 0
+
+    while True:
+        attempt += 1
+        try:
+            value = check()
+            last_error = None
+        except fatal:
+            raise
+        except Exception as e:  # noqa: BLE001 - not ready yet
+            value, last_error = None, e
+
+        now = time.monotonic()
+        if value:
+            return WaitResult(name, value, now - started, attempt)
+        if on_attempt:
+            on_attempt(name, attempt, now - started, last_error)
+
+        remaining = deadline - now
+        if remaining <= 0 or (cancelled is not None and cancelled.is_set()):
+            detail = f": {last_error}" if last_error else ""
+            raise WaitTimeout(
+                f"{name} not ready after {now - started:.0f}s ({attempt} attempts){detail}",
+                pending=[name],
+                last_errors={name: last_error},
+            )
+
+        # Always take a final attempt right at the deadline
+        delay = min(next(delays), remaining)
+        if cancelled is not None:
+            cancelled.wait(delay)
+        else:
+            time.sleep(delay)
+
+
+def wait_all(
+    conditions: dict[str, Check],
+    timeout: float,
+    fail_fast: bool = True,
+    **kwargs: Any,
+) -> dict[str, WaitResult]:
+    """Wait for several conditions concurrently under one shared deadline.
+
+    Args:
+        conditions: Condition name -> check callable
+        timeout: Seconds for all conditions together
+        fail_fast: Stop the other waits as soon as one raises a fatal error
+        **kwargs: Passed to wait_until (intervals, jitter, fatal, on_attempt)
+
+    Returns:
+        Condition name -> WaitResult, once every condition holds
+
+    Raises:
+        WaitTimeout: If any condition did not hold (pending lists them all)
+        Exception: The first fatal error raised by a check
+    """
+    deadline = time.monotonic() + timeout
+    cancelled = threading.Event()
+    results: dict[str, WaitResult] = {}
+    timeouts: dict[str, WaitTimeout] = {}
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def watch(name: str, check: Check) -> None:
+        try:
+            result = wait_until(check, timeout, name=name, deadline=deadline, cancelled=cancelled, **kwargs)
+        except WaitTimeout as e:
+            with lock:
+                timeouts[name] = e
+        except BaseException as e:  # noqa: BLE001 - re-raised in the caller's thread
+            with lock:
+                errors.append(e)
+            if fail_fast:
+                cancelled.set()
+        else:
+            with lock:
+                results[name] = result
+
+    threads = [
+        threading.Thread(target=watch, args=(name, check), name=f"wait-{name}", daemon=True)
+        for name, check in conditions.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    if timeouts:
+        pending = [name for name in conditions if name in timeouts]
+        raise WaitTimeout(
+            f"Not ready after {timeout:.0f}s: {', '.join(pending)}",
+            pending=pending,
+            last_errors={name: timeouts[name].last_errors.get(name) for name in pending},
+        )
+    return results
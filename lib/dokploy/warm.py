@@ -0,0 +1,374 @@
+"""Post-deploy cache warming from the sitemap or a route list.
+
+After a deploy (and more so after a cache purge) the first visitors pay
+for cold Next.js/ISR caches and cold Cloudflare edges. CacheWarmer
+requests every discovered URL twice - the cold request fills the caches,
+the warm one measures what visitors get next - across a bounded thread
+pool and under one time budget; URLs not reached within the budget are
+reported as skipped instead of delaying the deploy.
+
+URLs come from the sitemaps listed in robots.txt (else /sitemap.xml,
+sitemap indexes followed) and/or explicit routes. Sitemap URLs are
+rebased onto the warmed origin, so a preview deployment warms its own
+pages even though its sitemap names the production domain.
+
+    discovery = discover_urls("https://pr-12.example.com", routes=["/pricing"])
+    report = CacheWarmer(budget=120).run(discovery.urls)
+    print(report.to_markdown())
+"""
+
+import gzip
+import http.cookiejar
+import json
+import math
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .constants import CONNECT_TIMEOUT, HTTP_OK, WARM_BUDGET, WARM_TIMEOUT
+
+WARM_MAX_WORKERS = 8
+WARM_MAX_URLS = 500
+SITEMAP_MAX_FILES = 20  # sitemap index fan-out
+
+# Browsers negotiate br/gzip; Cloudflare caches a variant per encoding
+WARM_HEADERS = {
+    "User-Agent": "nextnode-cache-warmer",
+    "Accept": "text/html,application/xhtml+xml,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+}
+
+# cf-cache-status values served from the edge (DYNAMIC/BYPASS are not cacheable)
+CF_HIT_STATUSES = ("HIT", "STALE", "UPDATING", "REVALIDATED")
+CF_UNCACHEABLE_STATUSES = ("DYNAMIC", "BYPASS", "NONE", "UNKNOWN")
+
+
+@dataclass
+class Discovery:
+    """URLs to warm and where they came from."""
+
+    urls: list[str]
+    sitemaps: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class WarmResult:
+    """Cold and warm request of one URL (latencies in seconds)."""
+
+    url: str
+    status: int = 0
+    cold: float | None = None
+    warm: float | None = None
+    cold_cache: str = ""  # cf-cache-status of the cold request
+    warm_cache: str = ""
+    origin_cache: str = ""  # x-nextjs-cache of the warm request
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and HTTP_OK <= self.status < 400
+
+
+@dataclass
+class WarmReport:
+    """All URL results plus overall timing."""
+
+    results: list[WarmResult]
+    skipped: list[str]
+    elapsed: float
+    budget: float
+
+    @property
+    def warmed(self) -> list[WarmResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> list[WarmResult]:
+        return [r for r in self.results if not r.ok]
+
+    def latencies(self, which: str) -> list[float]:
+        """Sorted "cold" or "warm" latencies of the warmed URLs."""
+        return sorted(v for v in (getattr(r, which) for r in self.warmed) if v is not None)
+
+    def percentile(self, which: str, q: float) -> float | None:
+        values = self.latencies(which)
+        if not values:
+            return None
+        return values[min(len(values) - 1, math.ceil(q * len(values)) - 1)]
+
+    def hit_ratio(self, which: str = "warm") -> float | None:
+        """Share of cacheable responses served by the Cloudflare edge.
+
+        None when no response carried a cacheable cf-cache-status (site not
+        proxied, or every page is DYNAMIC).
+        """
+        statuses = [getattr(r, f"{which}_cache") for r in self.warmed]
+        cacheable = [s for s in statuses if s and s not in CF_UNCACHEABLE_STATUSES]
+        if not cacheable:
+            return None
+        return sum(s in CF_HIT_STATUSES for s in cacheable) / len(cacheable)
+
+    def cache_statuses(self, which: str = "warm") -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for result in self.warmed:
+            status = getattr(result, f"{which}_cache") or "none"
+            counts[status] = counts.get(status, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "warmed": len(self.warmed),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "elapsed": round(self.elapsed, 3),
+            "budget": self.budget,
+            "latency": {
+                which: {f"p{int(q * 100)}": self.percentile(which, q) for q in (0.5, 0.9, 0.99)}
+                for which in ("cold", "warm")
+            },
+            "hit_ratio": {"cold": self.hit_ratio("cold"), "warm": self.hit_ratio("warm")},
+            "cache_statuses": {"cold": self.cache_statuses("cold"), "warm": self.cache_statuses("warm")},
+            "results": [asdict(r) for r in self.results],
+            "skipped_urls": self.skipped,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_markdown(self) -> str:
+        """Latency distribution, edge hit ratio and the slowest/failed URLs."""
+        lines = [
+            "| Request | p50 | p90 | p99 | Edge hit ratio | cf-cache-status |",
+            "|---------|-----|-----|-----|----------------|-----------------|",
+        ]
+        for which in ("cold", "warm"):
+            cells = [_ms(self.percentile(which, q)) for q in (0.5, 0.9, 0.99)]
+            ratio = self.hit_ratio(which)
+            statuses = ", ".join(f"{k} {v}" for k, v in self.cache_statuses(which).items())
+            lines.append(
+                f"| {which.capitalize()} | {' | '.join(cells)} | {'—' if ratio is None else f'{ratio:.0%}'} | {statuses or '—'} |"
+            )
+
+        slowest = sorted(self.warmed, key=lambda r: r.cold or 0.0, reverse=True)[:10]
+        if slowest:
+            lines += ["", "| Slowest (cold) | Status | Cold | Warm | Edge | Next.js |", "|---|---|---|---|---|---|"]
+            for r in slowest:
+                lines.append(
+                    f"| {r.url} | {r.status} | {_ms(r.cold)} | {_ms(r.warm)} | "
+                    f"{r.cold_cache or '—'} → {r.warm_cache or '—'} | {r.origin_cache or '—'} |"
+                )
+        if self.failed:
+            lines += ["", "| Failed | Status | Error |", "|---|---|---|"]
+            for r in self.failed[:20]:
+                error = r.error.replace("|", "\\|")
+                lines.append(f"| {r.url} | {r.status or '—'} | {error or '—'} |")
+
+        lines.append("")
+        lines.append(
+            f"_{len(self.warmed)} warmed, {len(self.failed)} failed, {len(self.skipped)} skipped "
+            f"in {self.elapsed:.1f}s (budget {self.budget:.0f}s)_"
+        )
+        return "\n".join(lines)
+
+
+def _ms(seconds: float | None) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+def _session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    # Set-Cookie would make later requests bypass the edge cache
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(WARM_HEADERS)
+    return session
+
+
+# =============================================================================
+# Discovery
+# =============================================================================
+
+
+def rebase_url(url: str, base_url: str) -> str:
+    """Move a URL's path and query onto the base origin."""
+    parts, base = urlsplit(url), urlsplit(base_url)
+    return urlunsplit((base.scheme, base.netloc, parts.path or "/", parts.query, ""))
+
+
+def parse_sitemap(content: bytes) -> tuple[list[str], list[str]]:
+    """(page URLs, child sitemap URLs) of a urlset or sitemapindex document.
+
+    Raises:
+        ValueError: If the document is not XML
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid sitemap XML: {e}") from e
+    # Namespace-agnostic: <loc> under <url> or <sitemap>
+    locs = [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+    if root.tag.rsplit("}", 1)[-1] == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+def sitemap_urls(base_url: str, session: requests.Session) -> list[str]:
+    """Sitemaps listed in robots.txt, else <base>/sitemap.xml."""
+    try:
+        resp = session.get(urljoin(base_url, "/robots.txt"), timeout=(CONNECT_TIMEOUT, WARM_TIMEOUT))
+        if resp.ok:
+            listed = [
+                line.split(":", 1)[1].strip()
+                for line in resp.text.splitlines()
+                if line.lower().startswith("sitemap:")
+            ]
+            if listed:
+                return [rebase_url(url, base_url) for url in listed]
+    except requests.RequestException:
+        pass
+    return [urljoin(base_url, "/sitemap.xml")]
+
+
+def discover_urls(
+    base_url: str,
+    routes: list[str] | None = None,
+    sitemap: bool = True,
+    max_urls: int = WARM_MAX_URLS,
+    session: requests.Session | None = None,
+) -> Discovery:
+    """URLs to warm: the site root, explicit routes, then sitemap pages.
+
+    Args:
+        base_url: Origin of the deployment (e.g. https://pr-12.example.com)
+        routes: Paths or URLs to warm in addition to (or instead of) the sitemap
+        sitemap: Whether to read the sitemaps
+        max_urls: Cap on the number of URLs returned
+        session: Session to reuse (default: a new one)
+
+    Returns:
+        Discovery; sitemap failures are recorded in errors, never raised
+    """
+    session = session or _session(1)
+    base_url = base_url.rstrip("/")
+    candidates = [base_url + "/"] + [rebase_url(urljoin(base_url + "/", r.strip()), base_url) for r in routes or [] if r.strip()]
+    discovery = Discovery(urls=[])
+
+    if sitemap:
+        queue = sitemap_urls(base_url, session)
+        while queue and len(discovery.sitemaps) < SITEMAP_MAX_FILES and len(candidates) < max_urls:
+            url = queue.pop(0)
+            discovery.sitemaps.append(url)
+            try:
+                resp = session.get(url, timeout=(CONNECT_TIMEOUT, WARM_TIMEOUT))
+                resp.raise_for_status()
+                pages, children = parse_sitemap(resp.content)
+            except (requests.RequestException, ValueError, OSError) as e:
+                discovery.errors.append(f"{url}: {e}")
+                continue
+            candidates += [rebase_url(page, base_url) for page in pages]
+            queue += [rebase_url(child, base_url) for child in children if child not in discovery.sitemaps]
+
+    discovery.urls = list(dict.fromkeys(candidates))[:max_urls]
+    return discovery
+
+
+# =============================================================================
+# Warming
+# =============================================================================
+
+
+class CacheWarmer:
+    """Request URLs cold then warm, concurrently, under one time budget.
+
+    Usage:
+        warmer = CacheWarmer(budget=120, max_workers=8)
+        report = warmer.run(["https://example.com/", "https://example.com/pricing"])
+    """
+
+    def __init__(
+        self,
+        budget: float = WARM_BUDGET,
+        max_workers: int = WARM_MAX_WORKERS,
+        timeout: float = WARM_TIMEOUT,
+        headers: dict[str, str] | None = None,
+    ):
+        """Initialize warmer.
+
+        Args:
+            budget: Seconds the whole run may take; URLs not reached are skipped
+            max_workers: Maximum URLs in flight at once
+            timeout: Read timeout per request
+            headers: Extra request headers (e.g. a bypass token for protected previews)
+        """
+        self.budget = budget
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = _session(max_workers)
+        self.session.headers.update(headers or {})
+        self._deadline = 0.0
+
+    def _fetch(self, url: str) -> tuple[requests.Response, float]:
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("budget exhausted")
+        started = time.monotonic()
+        resp = self.session.get(url, timeout=(CONNECT_TIMEOUT, min(self.timeout, remaining)), allow_redirects=True)
+        resp.content  # noqa: B018 - read the full body so the edge caches all of it
+        return resp, time.monotonic() - started
+
+    def warm(self, url: str) -> WarmResult:
+        """Cold request (fills the caches) then warm request (what visitors get)."""
+        result = WarmResult(url)
+        try:
+            cold, result.cold = self._fetch(url)
+            result.status = cold.status_code
+            result.cold_cache = cold.headers.get("cf-cache-status", "").upper()
+            if not cold.ok:
+                result.error = f"HTTP {cold.status_code}"
+                return result
+            warm, result.warm = self._fetch(url)
+            result.status = warm.status_code
+            result.warm_cache = warm.headers.get("cf-cache-status", "").upper()
+            result.origin_cache = warm.headers.get("x-nextjs-cache", "").upper()
+        except (requests.RequestException, TimeoutError) as e:
+            result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    def run(self, urls: list[str]) -> WarmReport:
+        """Warm all URLs and return the report (in input order)."""
+        started = time.monotonic()
+        self._deadline = started + self.budget
+        results: dict[str, WarmResult] = {}
+
+        def task(url: str) -> None:
+            results[url] = self.warm(url)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="warm")
+        futures = [executor.submit(task, url) for url in urls]
+        wait(futures, timeout=self.budget)
+        # Queued URLs are dropped; in-flight requests are capped by the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        done = [results[url] for url in urls if url in results]
+        skipped = [url for url in urls if url not in results]
+        return WarmReport(done, skipped, time.monotonic() - started, self.budget)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "CacheWarmer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,450 @@
+"""Reconcile Cloudflare zone settings, transform rules and redirects in one pass.
+
+The SEO actions each talked to the zone on their own: robots and headers
+each read and rewrote the response-headers ruleset (headers appended a
+new rule on every run), optimizations PATCHed four settings one by one,
+and redirects listed the page rules again. ZoneReconciler reads everything
+a ZonePlan touches once (concurrently):
+
+- all zone settings (one GET of the bulk settings endpoint)
+- the entry-point ruleset of each phase with desired rules
+- the page rules, if the plan has redirects
+
+It then merges the desired rules into each phase and writes only what
+differs: one bulk settings PATCH, one PUT per changed phase, one call per
+missing redirect. A plan that matches the zone costs only the reads.
+
+Desired rules carry a stable ref. Rules created by the old bash actions
+(no ref, same action and expression) are adopted instead of duplicated,
+and extra copies of an owned rule are dropped.
+
+    plan = ZonePlan(settings=optimization_settings(), page_rules=[www_redirect("example.com")])
+    plan.add_rule(robots_rule("app.dev.example.com", ["dev", "staging"]))
+    result = ZoneReconciler(cloudflare, zone_id).reconcile(plan)
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from .cloudflare import CloudflareClient, CloudflareError
+from .constants import HTTP_NOT_FOUND
+from .domain import get_root_domain
+
+ZONE_READ_MAX_WORKERS = 4
+
+PHASE_RESPONSE_HEADERS = "http_response_headers_transform"
+
+RULE_REF_PREFIX = "nextnode_"
+RULE_ACTION_REWRITE = "rewrite"
+# Returned by the API but rejected or meaningless when a ruleset is written back
+READ_ONLY_RULE_FIELDS = ("version", "last_updated")
+
+ROBOTS_NOINDEX = "noindex, nofollow"
+SECURITY_LEVELS = ("off", "essentially_off", "low", "medium", "high", "under_attack")
+
+
+@dataclass
+class ZoneRule:
+    """A desired rule of a phase entry-point ruleset."""
+
+    ref: str
+    expression: str
+    description: str
+    action_parameters: dict[str, Any]
+    action: str = RULE_ACTION_REWRITE
+    enabled: bool = True
+    phase: str = PHASE_RESPONSE_HEADERS
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "ref": self.ref,
+            "expression": self.expression,
+            "description": self.description,
+            "action": self.action,
+            "action_parameters": self.action_parameters,
+            "enabled": self.enabled,
+        }
+
+    def matches(self, existing: dict[str, Any]) -> bool:
+        """Same ref, or an unreferenced rule with the same action and expression."""
+        if existing.get("ref") == self.ref:
+            return True
+        return (
+            not str(existing.get("ref", "")).startswith(RULE_REF_PREFIX)
+            and existing.get("action") == self.action
+            and existing.get("expression") == self.expression
+        )
+
+    def differs(self, existing: dict[str, Any]) -> bool:
+        """Whether an existing rule needs rewriting (an adopted rule keeps its own ref)."""
+        defaults = {"enabled": True}
+        return any(
+            existing.get(key, defaults.get(key)) != value for key, value in self.payload().items() if key != "ref"
+        )
+
+
+@dataclass
+class PageRule:
+    """A desired forwarding page rule (URL pattern -> target)."""
+
+    pattern: str
+    forward_url: str
+    status_code: int = 301
+
+    def payload(self) -> dict[str, Any]:
+        return {
+            "targets": [{"target": "url", "constraint": {"operator": "matches", "value": self.pattern}}],
+            "actions": [
+                {"id": "forwarding_url", "value": {"url": self.forward_url, "status_code": self.status_code}}
+            ],
+            "priority": 1,
+            "status": "active",
+        }
+
+    def matches(self, existing: dict[str, Any]) -> bool:
+        targets = existing.get("targets") or [{}]
+        return targets[0].get("constraint", {}).get("value") == self.pattern
+
+    def differs(self, existing: dict[str, Any]) -> bool:
+        return existing.get("actions") != self.payload()["actions"] or existing.get("status") != "active"
+
+
+@dataclass
+class ZonePlan:
+    """Desired state of the parts of a zone the SEO actions manage."""
+
+    settings: dict[str, Any] = field(default_factory=dict)  # setting id -> value
+    rules: list[ZoneRule] = field(default_factory=list)
+    page_rules: list[PageRule] = field(default_factory=list)
+
+    def add_rule(self, rule: ZoneRule | None) -> None:
+        if rule is not None:
+            self.rules.append(rule)
+
+    def add_page_rule(self, page_rule: PageRule | None) -> None:
+        if page_rule is not None:
+            self.page_rules.append(page_rule)
+
+    @property
+    def phases(self) -> list[str]:
+        return list(dict.fromkeys(rule.phase for rule in self.rules))
+
+
+@dataclass
+class PhaseChange:
+    """Rule changes in one phase."""
+
+    ruleset_id: str = ""
+    added: list[str] = field(default_factory=list)  # refs
+    updated: list[str] = field(default_factory=list)
+    removed: int = 0  # duplicate copies of owned rules
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+@dataclass
+class ZoneResult:
+    """What the reconciler found and changed."""
+
+    settings_changed: list[str] = field(default_factory=list)
+    settings_unavailable: list[str] = field(default_factory=list)  # unknown or read-only on this zone
+    phases: dict[str, PhaseChange] = field(default_factory=dict)
+    page_rules_created: list[str] = field(default_factory=list)  # page rule IDs (empty in dry runs)
+    page_rules_updated: list[str] = field(default_factory=list)
+    api_calls: int = 0
+    writes: int = 0
+    dry_run: bool = False
+
+    @property
+    def rules_created(self) -> int:
+        return sum(len(change.added) for change in self.phases.values())
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.settings_changed
+            or any(change.changed for change in self.phases.values())
+            or self.page_rules_created
+            or self.page_rules_updated
+        )
+
+
+# =============================================================================
+# Desired state builders (the behavior of the individual SEO actions)
+# =============================================================================
+
+
+def _ref(kind: str, key: str) -> str:
+    return f"{RULE_REF_PREFIX}{kind}_{hashlib.sha256(key.encode()).hexdigest()[:12]}"
+
+
+def robots_rule(domain: str, blocked: list[str], allowed: list[str] | None = None) -> ZoneRule | None:
+    """X-Robots-Tag noindex for every host under the domain's environment subdomain.
+
+    pr-56.dev.example.com -> all of *.dev.example.com when "dev" is blocked.
+
+    Returns:
+        The rule, or None if the subdomain is allowed, not blocked, or the domain is a root
+    """
+    domain = domain.lower()
+    root = get_root_domain(domain)
+    if domain == root:
+        return None
+    subdomain = domain[: -len(root) - 1].rsplit(".", 1)[-1]
+    if subdomain in (allowed or []) or subdomain not in blocked:
+        return None
+
+    suffix = f".{subdomain}.{root}"
+    return ZoneRule(
+        ref=_ref("robots", suffix),
+        expression=f'http.host ends_with "{suffix}"',
+        description=f"Block *{suffix} from search engines (SEO protection)",
+        action_parameters={"headers": {"X-Robots-Tag": {"operation": "set", "value": ROBOTS_NOINDEX}}},
+    )
+
+
+def headers_rule(headers: dict[str, str], expression: str = "true") -> ZoneRule:
+    """Response headers set on every request matching expression (one rule per expression)."""
+    return ZoneRule(
+        ref=_ref("headers", expression),
+        expression=expression,
+        description="Custom headers rule",
+        action_parameters={
+            "headers": {name: {"operation": "set", "value": str(value)} for name, value in headers.items()}
+        },
+    )
+
+
+def www_redirect(domain: str) -> PageRule | None:
+    """301 from www.<domain>/* to https://<domain>/$1 (None for subdomains)."""
+    domain = domain.lower()
+    if domain != get_root_domain(domain):
+        return None
+    return PageRule(pattern=f"www.{domain}/*", forward_url=f"https://{domain}/$1")
+
+
+def optimization_settings(
+    minify: bool = True,
+    brotli: bool = True,
+    always_use_https: bool = True,
+    security_level: str = "medium",
+) -> dict[str, Any]:
+    """Zone settings enabled by the optimizations action.
+
+    Raises:
+        ValueError: If security_level is not a Cloudflare security level
+    """
+    if security_level not in SECURITY_LEVELS:
+        raise ValueError(f"Invalid security level '{security_level}' (expected one of {', '.join(SECURITY_LEVELS)})")
+    settings: dict[str, Any] = {"security_level": security_level}
+    if minify:
+        settings["minify"] = {"css": "on", "html": "on", "js": "on"}
+    if brotli:
+        settings["brotli"] = "on"
+    if always_use_https:
+        settings["always_use_https"] = "on"
+    return settings
+
+
+# =============================================================================
+# Reconciliation
+# =============================================================================
+
+
+def merge_rules(existing: list[dict[str, Any]], desired: list[ZoneRule]) -> tuple[list[dict[str, Any]], PhaseChange]:
+    """Merge desired rules into a phase's rules, keeping unrelated rules and their order.
+
+    Returns:
+        (rules to write, change summary); nothing needs writing if not change.changed
+    """
+    change = PhaseChange()
+    merged: list[dict[str, Any]] = []
+    placed: set[str] = set()
+
+    for rule in existing:
+        kept = {key: value for key, value in rule.items() if key not in READ_ONLY_RULE_FIELDS}
+        match = next((d for d in desired if d.matches(rule)), None)
+        if match is None:
+            merged.append(kept)
+        elif match.ref in placed:
+            change.removed += 1
+        else:
+            placed.add(match.ref)
+            if match.differs(rule):
+                change.updated.append(match.ref)
+                kept.update({key: value for key, value in match.payload().items() if key != "ref" or "ref" not in rule})
+            merged.append(kept)
+
+    for rule in desired:
+        if rule.ref not in placed:
+            placed.add(rule.ref)
+            change.added.append(rule.ref)
+            merged.append(rule.payload())
+    return merged, change
+
+
+class ZoneReconciler:
+    """Bring one zone's settings, phase rules and page rules to a ZonePlan.
+
+    Usage:
+        reconciler = ZoneReconciler(CloudflareClient.from_env(), zone_id)
+        result = reconciler.reconcile(plan, dry_run=True)
+        print(result.settings_changed, result.rules_created, result.api_calls)
+    """
+
+    def __init__(
+        self,
+        client: CloudflareClient,
+        zone_id: str,
+        on_change: Callable[[str], None] | None = None,
+    ):
+        """Initialize reconciler.
+
+        Args:
+            client: Cloudflare client (shared by the concurrent reads)
+            zone_id: Zone to reconcile
+            on_change: Called with a description of each write (or planned write in dry runs)
+        """
+        self.client = client
+        self.zone_id = zone_id
+        self.on_change = on_change or (lambda message: None)
+        self._calls = 0
+
+    def _request(self, method: str, path: str, json: dict[str, Any] | None = None) -> Any:
+        self._calls += 1
+        return self.client.request(method, f"/zones/{self.zone_id}{path}", json=json)
+
+    # =========================================================================
+    # Reads
+    # =========================================================================
+
+    def settings(self) -> dict[str, dict[str, Any]]:
+        """All zone settings by id (one call)."""
+        result = self._request("GET", "/settings")
+        return {s["id"]: s for s in result or [] if isinstance(s, dict) and "id" in s}
+
+    def entrypoint(self, phase: str) -> dict[str, Any] | None:
+        """The zone's entry-point ruleset of a phase, or None if it doesn't exist yet."""
+        try:
+            return self._request("GET", f"/rulesets/phases/{phase}/entrypoint")
+        except CloudflareError as e:
+            if e.status_code == HTTP_NOT_FOUND:
+                return None
+            raise
+
+    def page_rules(self) -> list[dict[str, Any]]:
+        result = self._request("GET", "/pagerules")
+        return result if isinstance(result, list) else []
+
+    # =========================================================================
+    # Reconcile
+    # =========================================================================
+
+    def reconcile(self, plan: ZonePlan, dry_run: bool = False) -> ZoneResult:
+        """Read what the plan touches once, then write only the differences.
+
+        Raises:
+            CloudflareError: If a read or a write fails
+        """
+        self._calls = 0
+        reads: dict[str, Callable[[], Any]] = {}
+        if plan.settings:
+            reads["settings"] = self.settings
+        for phase in plan.phases:
+            reads[f"phase:{phase}"] = lambda phase=phase: self.entrypoint(phase)
+        if plan.page_rules:
+            reads["page_rules"] = self.page_rules
+
+        with ThreadPoolExecutor(max_workers=ZONE_READ_MAX_WORKERS, thread_name_prefix="zone") as executor:
+            futures = {name: executor.submit(read) for name, read in reads.items()}
+            current = {name: future.result() for name, future in futures.items()}
+
+        result = ZoneResult(dry_run=dry_run)
+        if plan.settings:
+            self._reconcile_settings(plan.settings, current["settings"], result, dry_run)
+        for phase in plan.phases:
+            desired = [rule for rule in plan.rules if rule.phase == phase]
+            self._reconcile_phase(phase, desired, current[f"phase:{phase}"], result, dry_run)
+        if plan.page_rules:
+            self._reconcile_page_rules(plan.page_rules, current["page_rules"], result, dry_run)
+
+        result.api_calls = self._calls
+        return result
+
+    def _reconcile_settings(
+        self,
+        desired: dict[str, Any],
+        current: dict[str, dict[str, Any]],
+        result: ZoneResult,
+        dry_run: bool,
+    ) -> None:
+        items = []
+        for setting_id, value in desired.items():
+            setting = current.get(setting_id)
+            if setting is None or setting.get("editable") is False:
+                result.settings_unavailable.append(setting_id)
+            elif setting.get("value") != value:
+                items.append({"id": setting_id, "value": value})
+                result.settings_changed.append(setting_id)
+        if not items:
+            return
+
+        changes = ", ".join(f"{item['id']}={json.dumps(item['value'])}" for item in items)
+        self.on_change(f"settings: {changes}")
+        if not dry_run:
+            self._request("PATCH", "/settings", json={"items": items})
+            result.writes += 1
+
+    def _reconcile_phase(
+        self,
+        phase: str,
+        desired: list[ZoneRule],
+        ruleset: dict[str, Any] | None,
+        result: ZoneResult,
+        dry_run: bool,
+    ) -> None:
+        rules, change = merge_rules((ruleset or {}).get("rules") or [], desired)
+        change.ruleset_id = (ruleset or {}).get("id", "")
+        result.phases[phase] = change
+        if not change.changed:
+            return
+
+        self.on_change(
+            f"{phase}: {len(change.added)} added, {len(change.updated)} updated, {change.removed} duplicates removed"
+        )
+        if not dry_run:
+            # PUT on the entry point creates the ruleset if the phase has none
+            written = self._request("PUT", f"/rulesets/phases/{phase}/entrypoint", json={"rules": rules})
+            change.ruleset_id = (written or {}).get("id", change.ruleset_id)
+            result.writes += 1
+
+    def _reconcile_page_rules(
+        self,
+        desired: list[PageRule],
+        current: list[dict[str, Any]],
+        result: ZoneResult,
+        dry_run: bool,
+    ) -> None:
+        for page_rule in desired:
+            existing = next((r for r in current if page_rule.matches(r)), None)
+            if existing is not None and not page_rule.differs(existing):
+                continue
+
+            verb = "create" if existing is None else "update"
+            self.on_change(f"page rule: {verb} {page_rule.pattern} -> {page_rule.forward_url}")
+            if dry_run:
+                (result.page_rules_created if existing is None else result.page_rules_updated).append("")
+                continue
+            if existing is None:
+                created = self._request("POST", "/pagerules", json=page_rule.payload())
+                result.page_rules_created.append((created or {}).get("id", ""))
+            else:
+                self._request("PUT", f"/pagerules/{existing['id']}", json=page_rule.payload())
+                result.page_rules_updated.append(existing["id"])
+            result.writes += 1